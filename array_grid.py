@@ -0,0 +1,468 @@
+"""
+Module for the array backed grid.
+
+The ArrayGrid keeps the state of every cell in one contiguous uint8 array
+and the values used by the pathfinding algorithms in parallel int32
+arrays, all indexed by the flat index of the cell (row * width + col).
+ArrayNode, RowView and ColumnView are thin adapters which give the grid
+the same interface as the numpy array of Node objects, so the maze
+generators, run.py and the renderer work with both grids.
+"""
+import numpy as np
+from constants import (
+    WIDTH,
+    HEIGHT,
+    INFINITY,
+    GLYPHS,
+    EMPTY_STATE,
+    WALL_STATE,
+    START_STATE,
+    END_STATE,
+    PATH_STATE,
+    VISITED_STATE,
+    ACTIVE_STATE
+)
+
+# Value stored in the int32 arrays instead of infinity or None
+UNSET = -1
+
+
+def to_array_value(value):
+    """
+    Converts infinity to the UNSET value stored in the int32 arrays.
+    """
+    return UNSET if value == INFINITY else value
+
+
+def from_array_value(value):
+    """
+    Converts the UNSET value stored in the int32 arrays to infinity.
+    """
+    return INFINITY if value == UNSET else int(value)
+
+
+class ArrayGrid:
+    """
+    Grid that stores cell states and search values in flat numpy arrays.
+    """
+
+    # Neighbors are computed from the cells array on demand,
+    # so they never need to be rebuilt by update_all_neighbors()
+    neighbors_dirty = False
+
+    def __init__(self, height=HEIGHT, width=WIDTH):
+        self.height = height
+        self.width = width
+        self.shape = (height, width)
+        size = height * width
+        # State code of every cell. Cells are empty by default.
+        self.cells = np.full(size, EMPTY_STATE, dtype=np.uint8)
+        # Distance from the start node. UNSET means infinity.
+        self.distance = np.full(size, UNSET, dtype=np.int32)
+        # Index of the previous cell in the path. UNSET means None.
+        self.parent = np.full(size, UNSET, dtype=np.int32)
+        # Index of the next cell in the path, used in bidirectional BFS.
+        self.child = np.full(size, UNSET, dtype=np.int32)
+        # Manhattan distance to the end node, used in A* algorithm.
+        self.manhattan_distance = np.full(size, UNSET, dtype=np.int32)
+        # Total cost of traveling through the cell, used in A* algorithm.
+        self.total_cost = np.full(size, UNSET, dtype=np.int32)
+        # List of (flat index, new state) of the state changes.
+        # None unless something collects them, like the animation pipeline.
+        self.change_log = None
+        # ComponentLabels told about the walls placed and removed.
+        # None until something asks for the components of the grid.
+        self.components = None
+        # EmptyCells told about the cells which become empty or stop
+        # being empty. None until something asks for the empty cells.
+        self.empty_cells = None
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield RowView(self, row)
+
+    @property
+    def states(self):
+        """
+        Returns the cells array as a 2D (height, width) view.
+        """
+        return self.cells.reshape(self.shape)
+
+    def __getitem__(self, key):
+        # grid[row] returns a row, grid[row, col] returns a node
+        # and grid[:, col] returns a column, like the numpy array does.
+        if isinstance(key, tuple):
+            row, col = key
+            if isinstance(row, slice) and row == slice(None):
+                return ColumnView(self, col)
+            return RowView(self, row)[col]
+        return RowView(self, key)
+
+    def state_changed(self, index, previous_state):
+        """
+        Called by the node adapter after the state of the cell has changed.
+        """
+        state = int(self.cells[index])
+        if self.change_log is not None:
+            self.change_log.append((index, state))
+        if (
+            self.empty_cells is not None and
+            (previous_state == EMPTY_STATE) != (state == EMPTY_STATE)
+        ):
+            self.empty_cells.state_changed(index, state == EMPTY_STATE)
+        if (
+            self.components is not None and
+            (previous_state == WALL_STATE) != (state == WALL_STATE)
+        ):
+            self.components.wall_changed(index, state == WALL_STATE)
+
+    def set_states(self, mask, state):
+        """
+        Changes the state of all cells selected by the 2D boolean mask
+        at once, without a display step.
+        """
+        if self.components is not None:
+            self.components.invalidate()
+        if self.empty_cells is not None:
+            self.empty_cells.invalidate()
+        if self.change_log is None:
+            self.cells[mask.ravel()] = state
+            return
+        changed = np.flatnonzero(mask.ravel() & (self.cells != state))
+        self.cells[changed] = state
+        self.change_log.extend((int(index), state) for index in changed)
+
+    def index(self, row, col):
+        """
+        Returns the flat index of the cell.
+        """
+        return row * self.width + col
+
+    def node(self, index):
+        """
+        Returns the node adapter of the cell with the given flat index.
+        """
+        return ArrayNode(self, index)
+
+    def neighbor_indices(self, index):
+        """
+        Returns the flat indices of the neighbors of the cell
+        skipping the walls, in the same order as Node.update_neighbors.
+        """
+        cells = self.cells
+        width = self.width
+        row, col = divmod(index, width)
+        indices = []
+        # Cell to the top of the current cell
+        if row > 0 and cells[index - width] != WALL_STATE:
+            indices.append(index - width)
+        # Cell to the bottom of the current cell
+        if row < self.height - 1 and cells[index + width] != WALL_STATE:
+            indices.append(index + width)
+        # Cell to the left of the current cell
+        if col > 0 and cells[index - 1] != WALL_STATE:
+            indices.append(index - 1)
+        # Cell to the right of the current cell
+        if col < width - 1 and cells[index + 1] != WALL_STATE:
+            indices.append(index + 1)
+        return indices
+
+    def reset_search(self):
+        """
+        Resets the search values of all cells at once.
+        """
+        self.distance.fill(UNSET)
+        self.parent.fill(UNSET)
+        self.child.fill(UNSET)
+        self.manhattan_distance.fill(UNSET)
+        self.total_cost.fill(UNSET)
+
+
+class RowView:
+    """
+    Adapter for one row of the ArrayGrid.
+    """
+
+    def __init__(self, grid, row):
+        if row < 0:
+            row += grid.height
+        if not 0 <= row < grid.height:
+            raise IndexError("row index out of range")
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.width
+
+    def __iter__(self):
+        start = self.row * self.grid.width
+        for index in range(start, start + self.grid.width):
+            yield ArrayNode(self.grid, index)
+
+    def __getitem__(self, col):
+        if col < 0:
+            col += self.grid.width
+        if not 0 <= col < self.grid.width:
+            raise IndexError("column index out of range")
+        return ArrayNode(self.grid, self.grid.index(self.row, col))
+
+
+class ColumnView:
+    """
+    Adapter for one column of the ArrayGrid.
+    """
+
+    def __init__(self, grid, col):
+        if col < 0:
+            col += grid.width
+        if not 0 <= col < grid.width:
+            raise IndexError("column index out of range")
+        self.grid = grid
+        self.col = col
+
+    def __len__(self):
+        return self.grid.height
+
+    def __iter__(self):
+        for row in range(self.grid.height):
+            yield ArrayNode(self.grid, self.grid.index(row, self.col))
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.grid.height
+        if not 0 <= row < self.grid.height:
+            raise IndexError("row index out of range")
+        return ArrayNode(self.grid, self.grid.index(row, self.col))
+
+
+class ArrayNode:
+    """
+    Adapter that gives one cell of the ArrayGrid the interface of Node.
+    Two adapters of the same cell are equal and have the same hash.
+    """
+
+    __slots__ = ("grid", "index", "row", "col")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+        self.row, self.col = divmod(index, grid.width)
+
+    def __str__(self):
+        return GLYPHS[self.grid.cells[self.index]]
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ArrayNode) and
+            self.index == other.index and
+            self.grid is other.grid
+        )
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def color(self):
+        """
+        Returns the string used to display the cell.
+        """
+        return GLYPHS[self.grid.cells[self.index]]
+
+    @property
+    def neighbors(self):
+        """
+        Returns the neighbors of the cell skipping the walls.
+        They are computed from the cells array every time.
+        """
+        grid = self.grid
+        return [
+            ArrayNode(grid, index)
+            for index in grid.neighbor_indices(self.index)
+        ]
+
+    def set_state(self, state):
+        """
+        Changes the state of the node to the given state code
+        and lets the grid know about the change.
+        """
+        cells = self.grid.cells
+        previous_state = cells[self.index]
+        cells[self.index] = state
+        self.grid.state_changed(self.index, previous_state)
+
+    def get_position(self):
+        """
+        Returns the position of the node as a tuple.
+        """
+        return self.row, self.col
+
+    def update_neighbors(self, grid):
+        """
+        Does nothing, neighbors are computed from the cells array.
+        """
+
+    # Search values are stored in the int32 arrays of the grid
+
+    @property
+    def distance(self):
+        """
+        Distance from the start node to the current node.
+        """
+        return from_array_value(self.grid.distance[self.index])
+
+    @distance.setter
+    def distance(self, value):
+        self.grid.distance[self.index] = to_array_value(value)
+
+    @property
+    def manhattan_distance(self):
+        """
+        Manhattan distance to the end node.
+        """
+        return from_array_value(self.grid.manhattan_distance[self.index])
+
+    @manhattan_distance.setter
+    def manhattan_distance(self, value):
+        self.grid.manhattan_distance[self.index] = to_array_value(value)
+
+    @property
+    def total_cost(self):
+        """
+        Total cost of traveling through this node.
+        """
+        return from_array_value(self.grid.total_cost[self.index])
+
+    @total_cost.setter
+    def total_cost(self, value):
+        self.grid.total_cost[self.index] = to_array_value(value)
+
+    @property
+    def previous(self):
+        """
+        Previous node in the path.
+        """
+        index = self.grid.parent[self.index]
+        return None if index == UNSET else ArrayNode(self.grid, int(index))
+
+    @previous.setter
+    def previous(self, node):
+        self.grid.parent[self.index] = UNSET if node is None else node.index
+
+    @property
+    def next(self):
+        """
+        Next node in the path.
+        """
+        index = self.grid.child[self.index]
+        return None if index == UNSET else ArrayNode(self.grid, int(index))
+
+    @next.setter
+    def next(self, node):
+        self.grid.child[self.index] = UNSET if node is None else node.index
+
+    def is_end(self):
+        """
+        Returns True if the node is the end node.
+        """
+        return self.grid.cells[self.index] == END_STATE
+
+    def is_start(self):
+        """
+        Returns True if the node is the start node.
+        """
+        return self.grid.cells[self.index] == START_STATE
+
+    def is_wall(self):
+        """
+        Returns True if the node is a wall.
+        """
+        return self.grid.cells[self.index] == WALL_STATE
+
+    def is_empty(self):
+        """
+        Returns True if the node is empty.
+        """
+        return self.grid.cells[self.index] == EMPTY_STATE
+
+    def is_visited(self):
+        """
+        Returns True if the node has been visited.
+        """
+        return self.grid.cells[self.index] == VISITED_STATE
+
+    def is_path(self):
+        """
+        Returns True if the node is a path.
+        """
+        return self.grid.cells[self.index] == PATH_STATE
+
+    def is_active(self):
+        """
+        Returns True if the node is the active node.
+        """
+        return self.grid.cells[self.index] == ACTIVE_STATE
+
+    def make_start(self):
+        """
+        Makes the node the start node.
+        """
+        self.set_state(START_STATE)
+
+    def make_end(self):
+        """
+        Makes the node the end node.
+        """
+        self.set_state(END_STATE)
+
+    def make_wall(self):
+        """
+        Makes the node a wall.
+        """
+        self.set_state(WALL_STATE)
+
+    def make_empty(self):
+        """
+        Makes the node empty.
+        """
+        self.set_state(EMPTY_STATE)
+
+    def make_visited(self):
+        """
+        Makes the node visited.
+        """
+        self.set_state(VISITED_STATE)
+
+    def make_active(self):
+        """
+        Makes the node active.
+        """
+        self.set_state(ACTIVE_STATE)
+
+    def make_path(self):
+        """
+        Makes the node a path.
+        """
+        self.set_state(PATH_STATE)
+
+    def reset(self):
+        """
+        Resets the node to its initial state.
+        """
+        self.set_state(EMPTY_STATE)
+        self.reset_search()
+
+    def reset_search(self):
+        """
+        Resets the values used by the pathfinding algorithms
+        without changing the state of the node.
+        """
+        index = self.index
+        grid = self.grid
+        grid.distance[index] = UNSET
+        grid.parent[index] = UNSET
+        grid.child[index] = UNSET
+        grid.manhattan_distance[index] = UNSET
+        grid.total_cost[index] = UNSET
@@ -0,0 +1,267 @@
+"""
+Module for the non-interactive batch mode of run.py.
+
+Generates one grid, places the start and end nodes and runs the chosen
+searches from the command line arguments, without the menus and without
+waiting for the keyboard. Returns a summary with the path length, the
+number of expanded nodes and the timings of every search, which run.py
+prints as JSON on stdout. The rendered grids are written to stderr,
+so stdout stays valid JSON in every render mode. Used for load testing,
+scheduled regression checks and comparison sweeps where there is
+no terminal to interact with.
+
+Usage:
+    python3 run.py --batch --generator recursive_division --seed 7
+    python3 run.py --generator spiral --algorithm dijkstra,a_star \
+        --start random --end 17,23 --render final
+"""
+import random
+from time import perf_counter
+from grid_functions import (
+    display_disabled,
+    display_grid,
+    generate_grid,
+    reset_grid_partially,
+    update_all_neighbors
+)
+from maze_functions import GENERATORS, generate_pattern
+from pathfinding_algorithms import SEARCH_FUNCTIONS, replay_search
+from pipeline import run_animated
+from recording import TraceRecorder
+from grid_files import load_grid, save_grid
+from components import (
+    grid_components,
+    random_connected_node,
+    random_connected_nodes
+)
+from empty_cells import random_empty_node
+
+# Ways of showing the run: nothing at all, only the final grid,
+# or every step animated like in the menu
+RENDER_MODES = ("none", "final", "animated")
+# Names of the generators, "empty" only draws the border walls
+GENERATOR_NAMES = ("empty",) + tuple(GENERATORS)
+
+
+def parse_placement(text):
+    """
+    Parses the placement of a node: "default", "random"
+    or an explicit "ROW,COL" position.
+    """
+    if text in ("default", "random"):
+        return text
+    row, col = text.split(",")
+    return int(row), int(col)
+
+
+def parse_algorithms(text):
+    """
+    Parses a comma separated list of algorithms, or "all".
+    """
+    if text == "all":
+        return list(SEARCH_FUNCTIONS)
+    algorithms = text.split(",")
+    for algorithm in algorithms:
+        if algorithm not in SEARCH_FUNCTIONS:
+            raise ValueError(f"Unknown algorithm {algorithm}.")
+    return algorithms
+
+
+def place_node(grid, placement, default_position, other_node=None):
+    """
+    Returns the node chosen by the placement. Random nodes are chosen
+    from the empty nodes in the component of the other node if it has
+    any, explicit positions must be inside the grid and must not be
+    a wall or the other node.
+    Like in the menu, the default position is used even on a wall.
+    """
+    height, width = grid.shape
+    if placement == "default":
+        row, col = default_position
+        return grid[row][col]
+    if placement == "random":
+        if other_node is not None:
+            node = random_connected_node(grid, other_node)
+            if node is not None:
+                return node
+        node = random_empty_node(grid)
+        if node is None:
+            raise ValueError("No empty node left to place the node on.")
+        return node
+    row, col = placement
+    if not (0 <= row < height and 0 <= col < width):
+        raise ValueError(f"Position {row},{col} is outside the grid.")
+    node = grid[row][col]
+    if not node.is_empty():
+        raise ValueError(f"Position {row},{col} is not an empty node.")
+    return node
+
+
+def place_nodes(grid, start, end, default_start, default_end):
+    """
+    Places the start and the end node chosen by their placements
+    and returns them. A random node is placed in the component
+    of the other node, and two random nodes in the same component,
+    so there is a path between them whenever the grid allows it.
+    """
+    if start == end == "random":
+        nodes = random_connected_nodes(grid)
+        if nodes is None:
+            raise ValueError(
+                "No connected empty nodes to place the nodes on."
+            )
+        start_node, end_node = nodes
+        start_node.make_start()
+        end_node.make_end()
+        return start_node, end_node
+    if start == "random":
+        end_node = place_node(grid, end, default_end)
+        end_node.make_end()
+        start_node = place_node(grid, start, default_start, end_node)
+        if start_node == end_node:
+            raise ValueError(
+                "The start and the end node must be different."
+            )
+        start_node.make_start()
+    else:
+        start_node = place_node(grid, start, default_start)
+        start_node.make_start()
+        end_node = place_node(grid, end, default_end, start_node)
+        if end_node == start_node:
+            raise ValueError(
+                "The start and the end node must be different."
+            )
+        end_node.make_end()
+    return start_node, end_node
+
+
+def generate(grid, generator, render):
+    """
+    Draws the border walls and the pattern of the generator
+    on the grid, animated only in the animated render mode.
+    """
+    function = None if generator == "empty" else GENERATORS[generator]
+    if render == "animated":
+        generate_pattern(grid, function)
+        return
+    with display_disabled():
+        generate_pattern(grid, function)
+
+
+def show_search(grid, result, render):
+    """
+    Applies the recorded events of the search to the grid,
+    animated only in the animated render mode.
+    """
+    if render == "animated":
+        run_animated(grid, replay_search, grid, result)
+    else:
+        with display_disabled():
+            replay_search(grid, result)
+
+
+def run_batch(arguments):
+    """
+    Runs the batch mode with the parsed command line arguments
+    of run.py and returns the summary dictionary.
+    Raises ValueError if the nodes can't be placed
+    or the grid file can't be loaded.
+    """
+    render = arguments.render
+    seed = arguments.seed
+    if seed is None:
+        # Batch runs are always seeded, so they can be repeated
+        seed = random.randrange(2 ** 31)
+    random.seed(seed)
+    started = perf_counter()
+    # Default positions of the start and end nodes, the corners
+    # or the nodes saved in the grid file
+    default_start = (1, 1)
+    default_end = None
+    if arguments.load_grid:
+        grid, saved_start, saved_end = load_grid(
+            arguments.load_grid,
+            arguments.backend
+            )
+        if saved_start is not None:
+            default_start = saved_start.get_position()
+            saved_start.reset()
+        if saved_end is not None:
+            default_end = saved_end.get_position()
+            saved_end.reset()
+    else:
+        grid = generate_grid(
+            arguments.height,
+            arguments.width,
+            arguments.backend
+            )
+    recorder = None
+    if arguments.record:
+        recorder = TraceRecorder(grid, seed)
+        recorder.start()
+    if not arguments.load_grid:
+        generate(grid, arguments.generator, render)
+    generate_time = perf_counter() - started
+    height, width = grid.shape
+    if default_end is None:
+        default_end = (height - 2, width - 2)
+    start_node, end_node = place_nodes(
+        grid,
+        arguments.start,
+        arguments.end,
+        default_start,
+        default_end
+        )
+    # Building the neighbors and the components before measuring,
+    # so only the search counts
+    update_all_neighbors(grid)
+    grid_components(grid).refresh()
+    # The events are only needed to show or record the search
+    record_events = render != "none" or recorder is not None
+    searches = []
+    for algorithm in arguments.algorithm:
+        # Resetting the grid from the previous search
+        reset_grid_partially(grid)
+        search_started = perf_counter()
+        result = SEARCH_FUNCTIONS[algorithm](
+            grid,
+            start_node,
+            end_node,
+            record_events
+            )
+        search_time = perf_counter() - search_started
+        if record_events:
+            show_search(grid, result, render)
+        searches.append({
+            "algorithm": algorithm,
+            "path_found": result.path_found,
+            "path_length": result.path_length,
+            "expanded": result.expanded,
+            "peak_frontier": result.peak_frontier,
+            "search_seconds": round(search_time, 6),
+        })
+    # Drawing the final grid, which also ends the last recorded step
+    if render == "none":
+        with display_disabled():
+            display_grid(grid)
+    else:
+        display_grid(grid)
+    if recorder:
+        recorder.stop()
+        recorder.trace().save(arguments.record)
+    if arguments.save_grid:
+        save_grid(grid, arguments.save_grid)
+    return {
+        "width": width,
+        "height": height,
+        "backend": arguments.backend,
+        "generator": (
+            "file" if arguments.load_grid else arguments.generator
+        ),
+        "seed": seed,
+        "start": list(start_node.get_position()),
+        "end": list(end_node.get_position()),
+        "generate_seconds": round(generate_time, 6),
+        "searches": searches,
+        "total_seconds": round(perf_counter() - started, 6),
+    }
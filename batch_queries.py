@@ -0,0 +1,141 @@
+"""
+Module for batch shortest path queries.
+
+A ShortestPathTree is built once with the wavefront engine from one or
+more roots, and answers any number of queries on the same grid without
+searching again. Every move costs 1 and can be made in both directions,
+so the tree gives the paths from its roots as well as the paths back to
+the nearest root, which makes it a flow field towards the roots.
+"""
+import numpy as np
+from constants import WALL_STATE
+from grid_functions import grid_states
+from wavefront import wavefront, DIRECTIONS
+
+
+class ShortestPathTree:
+    """
+    Shortest path tree of the grid grown from one or more roots.
+    Positions are (row, col) tuples.
+    Raises ValueError if a root is outside the grid or on a wall.
+    """
+
+    def __init__(self, grid, roots):
+        states = grid_states(grid)
+        height, width = states.shape
+        self.roots = [tuple(root) for root in roots]
+        for row, col in self.roots:
+            if not (0 <= row < height and 0 <= col < width):
+                raise ValueError(f"Position {row},{col} is outside the grid.")
+            if states[row, col] == WALL_STATE:
+                raise ValueError(f"Position {row},{col} is a wall.")
+        self.field = wavefront(states, self.roots)
+
+    @property
+    def distance(self):
+        """
+        Returns the 2D array with the distance of every cell
+        from the nearest root, -1 for unreachable cells.
+        """
+        return self.field.distance
+
+    def distances(self, positions):
+        """
+        Returns a numpy array with the distances of the positions
+        from the nearest root, -1 for unreachable positions.
+        """
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int32)
+        rows, cols = np.array(positions, dtype=np.intp).T
+        return self.field.distance[rows, cols]
+
+    def is_reachable(self, position):
+        """
+        Returns True if the position can be reached from a root.
+        """
+        return self.field.is_reached(*position)
+
+    def path_from_root(self, position):
+        """
+        Returns the path from the nearest root to the position,
+        or an empty list if it can't be reached.
+        """
+        return self.field.path_to(*position)
+
+    def path_to_root(self, position):
+        """
+        Returns the path from the position to the nearest root,
+        or an empty list if it can't be reached.
+        """
+        path = self.field.path_to(*position)
+        path.reverse()
+        return path
+
+    def paths_from_root(self, positions):
+        """
+        Returns the paths from the nearest root to every position.
+        """
+        return [self.path_from_root(position) for position in positions]
+
+    def paths_to_root(self, positions):
+        """
+        Returns the paths from every position to the nearest root.
+        """
+        return [self.path_to_root(position) for position in positions]
+
+    def next_step(self, position):
+        """
+        Returns the next position on the way from the position
+        to the nearest root, or None for roots and unreachable cells.
+        """
+        row, col = position
+        direction = self.field.direction[row, col]
+        if not direction:
+            return None
+        row_step, col_step = DIRECTIONS[direction - 1]
+        return row - row_step, col - col_step
+
+    def nearest(self, positions):
+        """
+        Returns the position closest to the roots and its distance,
+        or (None, -1) if none of the positions can be reached.
+        """
+        distances = self.distances(positions)
+        reachable = np.flatnonzero(distances >= 0)
+        if not reachable.size:
+            return None, -1
+        closest = reachable[np.argmin(distances[reachable])]
+        return tuple(positions[closest]), int(distances[closest])
+
+
+def one_to_many(grid, source, targets):
+    """
+    Returns the paths from the source to every target,
+    built from one shortest path tree.
+    """
+    return ShortestPathTree(grid, [source]).paths_from_root(targets)
+
+
+def many_to_one(grid, sources, target):
+    """
+    Returns the paths from every source to the target,
+    built from one shortest path tree grown from the target.
+    """
+    return ShortestPathTree(grid, [target]).paths_to_root(sources)
+
+
+def nearest_goal(grid, source, goals):
+    """
+    Returns the path from the source to the nearest of the goals,
+    or an empty list if none of them can be reached.
+    The last position of the path is the goal that was reached.
+    """
+    return ShortestPathTree(grid, goals).path_to_root(source)
+
+
+def flow_field(grid, goal):
+    """
+    Returns a shortest path tree grown from the goal, which gives
+    the next step and the path towards the goal from every cell.
+    """
+    return ShortestPathTree(grid, [goal])
@@ -0,0 +1,381 @@
+"""
+Benchmark of the pathfinding algorithms.
+
+Generates grids with every maze generator at several sizes with fixed
+seeds, runs every algorithm headlessly on them and records the wall
+time, the number of expanded nodes, the peak size of the frontier and
+the peak memory of every run. Grids saved by run.py --save-grid can be
+added to the generated ones. Results are written to a JSON file and
+compared against a stored baseline.
+
+Usage:
+    python3 benchmark.py
+    python3 benchmark.py --sizes 25x19,101x101 --output results.json
+    python3 benchmark.py --update-baseline
+    python3 benchmark.py --grid-files mazes/large.grid,mazes/demo.grid
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from functools import partial
+from statistics import median
+from time import perf_counter
+import numpy as np
+from grid_functions import (
+    display_disabled,
+    generate_grid,
+    reset_grid,
+    update_all_neighbors,
+)
+from maze_functions import GENERATORS
+from grid_files import load_grid, load_grid_map
+from components import grid_components
+from pathfinding_algorithms import SEARCH_FUNCTIONS
+
+# Default location of the stored baseline
+BASELINE_FILE = "benchmarks/baseline.json"
+# Default sizes of the grids as (width, height)
+DEFAULT_SIZES = "25x19,51x51,101x101"
+# Default seeds of the maze generators
+DEFAULT_SEEDS = "1"
+# Wall time and memory may grow by this fraction before it is reported
+DEFAULT_TOLERANCE = 0.5
+# Time differences below this number of seconds are treated as noise,
+# short searches vary by more than the tolerance between runs
+MIN_TIME_DIFFERENCE = 0.005
+# Memory differences below this number of bytes are treated as noise,
+# the allocator of the interpreter keeps a few kB between runs
+MIN_MEMORY_DIFFERENCE = 16 * 1024
+# Default number of timed runs of every case, the median is kept
+DEFAULT_REPEAT = 7
+
+# Values which must not change between runs with the same seed
+EXACT_FIELDS = ("path_length", "expanded", "peak_frontier")
+# Values which may change a little between runs
+MEASURED_FIELDS = ("time_seconds", "peak_memory_bytes")
+
+
+def parse_sizes(text):
+    """
+    Parses sizes like "25x19,51x51" into a list of (width, height).
+    """
+    sizes = []
+    for size in text.split(","):
+        width, height = size.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def build_grid(generator, width, height, seed, backend):
+    """
+    Generates a grid with the generator using the seed
+    and places the start and end nodes in the corners.
+    Returns the grid, the start node and the end node.
+    """
+    random.seed(seed)
+    grid = generate_grid(height, width, backend)
+    reset_grid(grid, animated=False)
+    GENERATORS[generator](grid, animated=False)
+    start_node = grid[1][1]
+    end_node = grid[height - 2][width - 2]
+    start_node.make_start()
+    end_node.make_end()
+    # Building the neighbors and the components before measuring,
+    # so only the search counts
+    update_all_neighbors(grid)
+    grid_components(grid).refresh()
+    return grid, start_node, end_node
+
+
+def run_case(algorithm, build, repeat):
+    """
+    Runs the algorithm on a grid made by the build function, which
+    returns the grid, the start node and the end node, and returns
+    a dictionary with the median wall time of the runs
+    and the search statistics.
+    """
+    search = SEARCH_FUNCTIONS[algorithm]
+    grid, start_node, end_node = build()
+    # Memory is measured in a separate run, tracing slows the search down.
+    # It is the first run on a freshly built grid, so it doesn't depend
+    # on the number of runs or on the algorithms which ran before it.
+    tracemalloc.start()
+    search(grid, start_node, end_node)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        result = search(grid, start_node, end_node)
+        times.append(perf_counter() - started)
+    return {
+        "time_seconds": round(median(times), 6),
+        "peak_memory_bytes": peak_memory,
+        "path_length": result.path_length,
+        "expanded": result.expanded,
+        "peak_frontier": result.peak_frontier,
+    }
+
+
+def load_grid_file(path, backend):
+    """
+    Loads a grid saved by run.py --save-grid and places the start
+    and end nodes in the corners, unless the file has them.
+    Returns the grid, the start node and the end node.
+    """
+    grid, start_node, end_node = load_grid(path, backend)
+    height, width = grid.shape
+    if start_node is None:
+        start_node = grid[1][1]
+        start_node.make_start()
+    if end_node is None:
+        end_node = grid[height - 2][width - 2]
+        end_node.make_end()
+    # Building the neighbors and the components before measuring,
+    # so only the search counts
+    update_all_neighbors(grid)
+    grid_components(grid).refresh()
+    return grid, start_node, end_node
+
+
+def run_algorithms(case, build, algorithms, repeat):
+    """
+    Runs every algorithm on its own grid made by the build function
+    for the case, a dictionary with the generator, the size, the seed
+    and the backend. Returns the list of result dictionaries.
+    """
+    results = []
+    for algorithm in algorithms:
+        record = dict(case, algorithm=algorithm)
+        record.update(run_case(algorithm, build, repeat))
+        results.append(record)
+        print(format_record(record), file=sys.stderr)
+    return results
+
+
+def run_benchmarks(
+    sizes, seeds, generators, algorithms, backend, repeat, grid_files=()
+):
+    """
+    Runs every algorithm on every generated grid
+    and on every saved grid file.
+    Returns the list of result dictionaries.
+    """
+    results = []
+    with display_disabled():
+        for width, height in sizes:
+            for generator in generators:
+                for seed in seeds:
+                    case = {
+                        "generator": generator,
+                        "width": width,
+                        "height": height,
+                        "seed": seed,
+                        "backend": backend,
+                    }
+                    build = partial(
+                        build_grid, generator, width, height, seed, backend
+                    )
+                    results.extend(run_algorithms(
+                        case, build, algorithms, repeat
+                    ))
+        for path in grid_files:
+            build = partial(load_grid_file, path, backend)
+            height, width = load_grid_map(path).shape
+            case = {
+                "generator": f"file:{os.path.basename(path)}",
+                "width": width,
+                "height": height,
+                "seed": 0,
+                "backend": backend,
+            }
+            results.extend(run_algorithms(
+                case, build, algorithms, repeat
+            ))
+    return results
+
+
+def record_key(record):
+    """
+    Returns the tuple which identifies the benchmark case of the record.
+    """
+    return (
+        record["generator"],
+        record["width"],
+        record["height"],
+        record["seed"],
+        record["backend"],
+        record["algorithm"],
+    )
+
+
+def format_record(record):
+    """
+    Returns a short line describing the record.
+    """
+    return (
+        f"{record['algorithm']:<20} {record['generator']:<20} "
+        f"{record['width']}x{record['height']:<6} seed {record['seed']:<4} "
+        f"{record['time_seconds'] * 1000:>10.3f} ms "
+        f"expanded {record['expanded']:<8} "
+        f"frontier {record['peak_frontier']:<6} "
+        f"memory {record['peak_memory_bytes']}"
+    )
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Compares the results with the baseline results.
+    Returns a list of messages about regressions and changes.
+    """
+    baseline_records = {record_key(record): record for record in baseline}
+    problems = []
+    for record in results:
+        expected = baseline_records.get(record_key(record))
+        if expected is None:
+            continue
+        name = " ".join(str(part) for part in record_key(record))
+        for field in EXACT_FIELDS:
+            if record[field] != expected[field]:
+                problems.append(
+                    f"{name}: {field} changed "
+                    f"from {expected[field]} to {record[field]}"
+                )
+        for field in MEASURED_FIELDS:
+            limit = expected[field] * (1 + tolerance)
+            if field == "time_seconds":
+                limit = max(limit, expected[field] + MIN_TIME_DIFFERENCE)
+            else:
+                limit = max(limit, expected[field] + MIN_MEMORY_DIFFERENCE)
+            if record[field] > limit:
+                problems.append(
+                    f"{name}: {field} regressed "
+                    f"from {expected[field]} to {record[field]}"
+                )
+    return problems
+
+
+def parse_arguments():
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the pathfinding algorithms."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help="comma separated grid sizes as WIDTHxHEIGHT "
+        "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--seeds",
+        default=DEFAULT_SEEDS,
+        help="comma separated seeds of the generators (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--generators",
+        default=",".join(GENERATORS),
+        help="comma separated maze generators (default: all)"
+    )
+    parser.add_argument(
+        "--algorithms",
+        default=",".join(SEARCH_FUNCTIONS),
+        help="comma separated algorithms (default: all)"
+    )
+    parser.add_argument(
+        "--grid-files",
+        default="",
+        help="comma separated grid files saved by run.py --save-grid "
+        "to run every algorithm on as well"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["node", "array"],
+        default="node",
+        help="grid backend (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="timed runs of every case, the median time is kept "
+        "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--output",
+        help="file to write the results to as JSON"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=BASELINE_FILE,
+        help="baseline file to compare against (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed growth of time and memory as a fraction "
+        "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing"
+    )
+    arguments = parser.parse_args()
+    if arguments.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return arguments
+
+
+def main(arguments):
+    """
+    Main function. Returns the exit code.
+    """
+    results = run_benchmarks(
+        parse_sizes(arguments.sizes),
+        [int(seed) for seed in arguments.seeds.split(",")],
+        arguments.generators.split(","),
+        arguments.algorithms.split(","),
+        arguments.backend,
+        arguments.repeat,
+        [path for path in arguments.grid_files.split(",") if path],
+    )
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+    if arguments.update_baseline:
+        with open(arguments.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+        print(f"Baseline written to {arguments.baseline}.")
+        return 0
+    try:
+        with open(arguments.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        print(f"No baseline found at {arguments.baseline}.")
+        return 0
+    problems = compare_results(results, baseline, arguments.tolerance)
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} regressions or changes found.")
+        return 1
+    print("No regressions found.")
+    return 0
+
+
+# Checking if we are running this file directly.
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments()))
@@ -0,0 +1,330 @@
+"""
+Module for the connected components of the grid.
+
+Every node which is not a wall gets the label of its component, so
+checking if the end node can be reached from the start node only
+compares two labels, and a search between two components returns
+at once instead of flooding the whole component of the start node.
+
+The labels are computed in one vectorized pass and kept by the grid,
+which reports every node that becomes a wall or stops being one.
+A removed wall joins the components around it without relabeling.
+A placed wall keeps its component in one piece if the open nodes next
+to it are still joined by the ring of 8 nodes around it, which is the
+case for most walls drawn in a line. Only if they are not, and after
+bulk writes like the generators make, the labels are computed again
+the next time they are needed.
+"""
+import random
+import numpy as np
+from constants import EMPTY_STATE, WALL_STATE
+from grid_functions import grid_states
+from empty_cells import grid_empty_cells
+
+# Label of the walls
+NO_COMPONENT = -1
+# Number of random pairs of empty nodes drawn from the index
+# before the random nodes are chosen by scanning all labels
+SAMPLED_PAIRS = 16
+# Row and column steps to the ring of 8 nodes around a node, in order
+# around it. The steps at even positions lead to the 4 neighbors.
+RING = (
+    (-1, 0), (-1, 1), (0, 1), (1, 1),
+    (1, 0), (1, -1), (0, -1), (-1, -1)
+)
+
+
+def label_components(open_cells):
+    """
+    Returns a flat int32 array with the component label of every node
+    of the 2D boolean array of open nodes, NO_COMPONENT for the rest.
+    The label of a component is the smallest flat index in it.
+    """
+    height, width = open_cells.shape
+    # Flat indices of both ends of every edge between two open nodes,
+    # the right neighbors first and the bottom neighbors after them
+    right = np.flatnonzero((open_cells[:, :-1] & open_cells[:, 1:]).ravel())
+    right += right // (width - 1)
+    down = np.flatnonzero((open_cells[:-1] & open_cells[1:]).ravel())
+    first = np.concatenate((right, down))
+    second = np.concatenate((right + 1, down + width))
+    # Every node starts as the root of its own tree
+    parent = np.arange(height * width)
+    while True:
+        first_root = parent[first]
+        second_root = parent[second]
+        crossing = first_root != second_root
+        if not crossing.any():
+            break
+        # Edges inside one tree stay inside it, so they are dropped
+        first = first[crossing]
+        second = second[crossing]
+        first_root = first_root[crossing]
+        second_root = second_root[crossing]
+        # Hooking the larger root of every edge under the smaller one.
+        # When a root is hooked by several edges one of them wins,
+        # the others are hooked in the next rounds.
+        parent[np.maximum(first_root, second_root)] = np.minimum(
+            first_root,
+            second_root
+            )
+        # Jumping to the grandparents until every node
+        # points straight to its root
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return np.where(
+        open_cells.ravel(),
+        parent,
+        NO_COMPONENT
+        ).astype(np.int32)
+
+
+class ComponentLabels:
+    """
+    Class that keeps the component labels of a grid up to date.
+    """
+
+    def __init__(self, grid):
+        self.width = grid.shape[1]
+        # Flat view of the state codes of the grid
+        self.states = grid_states(grid).ravel()
+        # Flat array with the label of every node
+        self.labels = None
+        # Flag to check if the labels must be computed again
+        self.dirty = True
+        # Labels of joined components mapped to the label
+        # of the component they were joined to
+        self.joined = {}
+        # Next label for nodes which open a new component,
+        # larger than every flat index
+        self.next_label = self.states.size
+
+    def invalidate(self):
+        """
+        Marks the labels to be computed again before they are used.
+        """
+        self.dirty = True
+
+    def refresh(self):
+        """
+        Computes the labels again if they are out of date.
+        """
+        if not self.dirty:
+            return
+        self.labels = label_components(
+            self.states.reshape(-1, self.width) != WALL_STATE
+        )
+        self.joined = {}
+        self.next_label = self.states.size
+        self.dirty = False
+
+    def find(self, label):
+        """
+        Returns the label of the component the label was joined to,
+        halving the chain of joined labels on the way.
+        """
+        joined = self.joined
+        while label in joined:
+            grandparent = joined.get(joined[label], joined[label])
+            joined[label] = grandparent
+            label = grandparent
+        return label
+
+    def open_neighbors(self, index):
+        """
+        Returns the flat indices of the open nodes around the node.
+        """
+        states = self.states
+        width = self.width
+        row, col = divmod(index, width)
+        indices = []
+        if row > 0:
+            indices.append(index - width)
+        if index + width < states.size:
+            indices.append(index + width)
+        if col > 0:
+            indices.append(index - 1)
+        if col < width - 1:
+            indices.append(index + 1)
+        return [
+            neighbor for neighbor in indices
+            if states[neighbor] != WALL_STATE
+        ]
+
+    def joined_around(self, index):
+        """
+        Returns True if the open neighbors of the node are joined
+        by open nodes on the ring of 8 nodes around it, so a wall
+        placed on the node doesn't split its component.
+        """
+        states = self.states
+        width = self.width
+        height = states.size // width
+        row, col = divmod(index, width)
+        ring = []
+        for row_step, col_step in RING:
+            ring_row = row + row_step
+            ring_col = col + col_step
+            ring.append(
+                0 <= ring_row < height and 0 <= ring_col < width and
+                states[ring_row * width + ring_col] != WALL_STATE
+            )
+        if all(ring):
+            return True
+        # Finding the first ring node of the run of open nodes
+        # of every open neighbor, they are joined if they share it
+        starts = set()
+        for position in range(0, len(RING), 2):
+            if not ring[position]:
+                continue
+            start = position
+            while ring[start - 1]:
+                start = (start - 1) % len(RING)
+            starts.add(start)
+        return len(starts) <= 1
+
+    def wall_changed(self, index, is_wall):
+        """
+        Called by the grid after the node with the flat index
+        has become a wall or stopped being one.
+        """
+        if self.dirty:
+            return
+        neighbors = self.open_neighbors(index)
+        if is_wall:
+            self.labels[index] = NO_COMPONENT
+            # With only one open node next to the wall, or with open
+            # nodes joined around it, the component stays connected
+            if len(neighbors) > 1 and not self.joined_around(index):
+                self.dirty = True
+            return
+        roots = {self.find(int(self.labels[neighbor]))
+                 for neighbor in neighbors}
+        if not roots:
+            # The node opens a new component on its own
+            self.labels[index] = self.next_label
+            self.next_label += 1
+            return
+        label = roots.pop()
+        for root in roots:
+            self.joined[root] = label
+        self.labels[index] = label
+
+    def component(self, index):
+        """
+        Returns the label of the component of the node,
+        or NO_COMPONENT for a wall.
+        """
+        self.refresh()
+        label = int(self.labels[index])
+        if label == NO_COMPONENT:
+            return label
+        return self.find(label)
+
+    def current_labels(self):
+        """
+        Returns the flat array of the labels with all joins applied.
+        """
+        if self.joined:
+            self.dirty = True
+        self.refresh()
+        return self.labels
+
+
+def grid_components(grid):
+    """
+    Returns the ComponentLabels of the grid,
+    attaching them to the grid the first time.
+    A grid which doesn't report its wall changes, like a plain numpy
+    array of nodes, gets new labels from its states on every call.
+    """
+    if not hasattr(grid, "components"):
+        return ComponentLabels(grid)
+    if grid.components is None:
+        grid.components = ComponentLabels(grid)
+    return grid.components
+
+
+def connected(grid, first_node, second_node):
+    """
+    Returns True if there is a path between the two nodes.
+    """
+    components = grid_components(grid)
+    width = grid.shape[1]
+    first = components.component(first_node.row * width + first_node.col)
+    if first == NO_COMPONENT:
+        return False
+    return first == components.component(
+        second_node.row * width + second_node.col
+    )
+
+
+def random_connected_nodes(grid):
+    """
+    Returns two different random empty nodes from the same component,
+    or None if no component has two empty nodes.
+    """
+    components = grid_components(grid)
+    width = grid.shape[1]
+    # Drawing a few pairs from the index of the empty nodes first,
+    # which almost always finds a connected pair without scanning
+    firsts, seconds = grid_empty_cells(grid).sample_pairs(SAMPLED_PAIRS)
+    for first, second in zip(firsts.tolist(), seconds.tolist()):
+        if components.component(first) == components.component(second):
+            return (
+                grid[first // width][first % width],
+                grid[second // width][second % width]
+            )
+    labels = components.current_labels()
+    empty = np.flatnonzero(grid_states(grid).ravel() == EMPTY_STATE)
+    _, inverse, counts = np.unique(
+        labels[empty],
+        return_inverse=True,
+        return_counts=True
+        )
+    # Empty nodes which have another empty node in their component
+    candidates = empty[counts[inverse] > 1]
+    if not candidates.size:
+        return None
+    first = int(candidates[random.randrange(candidates.size)])
+    others = candidates[
+        (labels[candidates] == labels[first]) & (candidates != first)
+    ]
+    second = int(others[random.randrange(others.size)])
+    return (
+        grid[first // width][first % width],
+        grid[second // width][second % width]
+    )
+
+
+def random_connected_node(grid, node):
+    """
+    Returns a random empty node from the component of the node,
+    other than the node itself, or None if there is none.
+    """
+    components = grid_components(grid)
+    width = grid.shape[1]
+    own = node.row * width + node.col
+    label = components.component(own)
+    if label == NO_COMPONENT:
+        return None
+    # Drawing a few nodes from the index of the empty nodes first
+    empty_cells = grid_empty_cells(grid)
+    for _ in range(SAMPLED_PAIRS):
+        index = empty_cells.sample()
+        if index is None:
+            return None
+        if index != own and components.component(index) == label:
+            return grid[index // width][index % width]
+    labels = components.current_labels()
+    label = labels[own]
+    states = grid_states(grid).ravel()
+    others = np.flatnonzero((labels == label) & (states == EMPTY_STATE))
+    others = others[others != own]
+    if not others.size:
+        return None
+    index = int(others[random.randrange(others.size)])
+    return grid[index // width][index % width]
@@ -1,6 +1,7 @@
 """
 Constants for the project.
 """
+import os
 from blessed import Terminal
 
 # Instance of Terminal to use in the project
@@ -16,5 +17,52 @@ END = "🏁"
 # EMPTY = "　"  # This line should be used when the app is running on desktop
 EMPTY = " "  # This line should be used when the app is running on heroku
 
-WIDTH = 25
-HEIGHT = 19
+# Default size of the grid. Can be changed with the GRID_WIDTH
+# and GRID_HEIGHT variables or the --width and --height flags of run.py.
+WIDTH = int(os.environ.get("GRID_WIDTH", 25))
+HEIGHT = int(os.environ.get("GRID_HEIGHT", 19))
+
+# Grid backend used by generate_grid(): "node" for the numpy array
+# of Node objects, "array" for the ArrayGrid storing cell states
+# in a uint8 array. Can be changed with the GRID_BACKEND variable.
+GRID_BACKEND = os.environ.get("GRID_BACKEND", "node")
+
+# Engine used by dijkstra(): "heap" for the priority queue search,
+# "wavefront" for the vectorized numpy breadth-first search.
+# Can be changed with the DIJKSTRA_BACKEND variable.
+DIJKSTRA_BACKEND = os.environ.get("DIJKSTRA_BACKEND", "heap")
+
+# Settings of the animations: the largest number of frames drawn
+# in one second, the number of steps played in one second ("instant"
+# to skip the animations) and the time limit of one animation in seconds.
+# Can be changed with the FRAME_RATE, ANIMATION_SPEED and
+# ANIMATION_SECONDS variables or the --fps, --speed and
+# --animation-seconds flags of run.py.
+FRAME_RATE = float(os.environ.get("FRAME_RATE", 30))
+ANIMATION_SPEED = os.environ.get("ANIMATION_SPEED", "20")
+ANIMATION_SECONDS = float(os.environ.get("ANIMATION_SECONDS", 15))
+
+# Probability of every node inside the border to become a barrier
+# in the random pattern. Can be changed with the RANDOM_DENSITY variable
+# or the --density flag of run.py.
+RANDOM_DENSITY = float(os.environ.get("RANDOM_DENSITY", 0.14))
+
+# Mode of the viewport used for grids larger than the terminal:
+# "follow" to follow the changed cells, "scroll" to scroll with
+# the W, A, S and D keys, or "overview" to zoom out the whole grid.
+# Can be changed with the VIEW_MODE variable or the --view flag of run.py.
+VIEW_MODE = os.environ.get("VIEW_MODE", "follow")
+
+# Integer codes of the cell states, used by Node and the array backed grid.
+# GLYPHS maps every code to the string used to display it.
+EMPTY_STATE = 0
+WALL_STATE = 1
+START_STATE = 2
+END_STATE = 3
+PATH_STATE = 4
+VISITED_STATE = 5
+ACTIVE_STATE = 6
+GLYPHS = (EMPTY, WALL, START, END, PATH, VISITED, ACTIVE)
+
+# Shared infinity used as the initial distance and cost of the nodes
+INFINITY = float("inf")
@@ -0,0 +1,131 @@
+"""
+Module for the index of the empty nodes of the grid.
+
+The flat indices of the empty nodes are kept in an array, in no order,
+together with the slot of every node in that array. A node which becomes
+empty is appended, a node which stops being empty is replaced by the last
+one, so the grid updates the index in constant time on every state
+change, and a random empty node is drawn in constant time on any size
+of the grid. After bulk writes like the generators make, the index is
+built again from the states the next time it is needed.
+"""
+import random
+import numpy as np
+from constants import EMPTY_STATE
+
+# Slot of the nodes which are not empty
+NO_SLOT = -1
+
+
+class EmptyCells:
+    """
+    Class that keeps the index of the empty nodes of a grid.
+    """
+
+    def __init__(self, grid):
+        # Flat view of the state codes of the grid, which must be
+        # a grid that reports its state changes
+        self.states = grid.states.ravel()
+        # Flat indices of the empty nodes in the first count items
+        self.indices = np.empty(self.states.size, dtype=np.intp)
+        # Slot of every node in the indices, NO_SLOT if it is not empty
+        self.slots = np.full(self.states.size, NO_SLOT, dtype=np.intp)
+        # Number of empty nodes
+        self.count = 0
+        # Flag to check if the index must be built again
+        self.dirty = True
+
+    def __len__(self):
+        self.refresh()
+        return self.count
+
+    def invalidate(self):
+        """
+        Marks the index to be built again before it is used.
+        """
+        self.dirty = True
+
+    def refresh(self):
+        """
+        Builds the index again from the states if it is out of date.
+        """
+        if not self.dirty:
+            return
+        empty = np.flatnonzero(self.states == EMPTY_STATE)
+        self.count = empty.size
+        self.indices[:self.count] = empty
+        self.slots.fill(NO_SLOT)
+        self.slots[empty] = np.arange(self.count)
+        self.dirty = False
+
+    def state_changed(self, index, is_empty):
+        """
+        Called by the grid after the node with the flat index
+        has become empty or stopped being empty.
+        """
+        if self.dirty:
+            return
+        if is_empty:
+            # Appending the node
+            self.indices[self.count] = index
+            self.slots[index] = self.count
+            self.count += 1
+            return
+        # Moving the last node into the slot of the removed node
+        slot = self.slots[index]
+        self.count -= 1
+        last = self.indices[self.count]
+        self.indices[slot] = last
+        self.slots[last] = slot
+        self.slots[index] = NO_SLOT
+
+    def sample(self):
+        """
+        Returns the flat index of a random empty node,
+        or None if there is none.
+        """
+        self.refresh()
+        if not self.count:
+            return None
+        return int(self.indices[random.randrange(self.count)])
+
+    def sample_pairs(self, count, seed=None):
+        """
+        Returns two arrays with the flat indices of count random pairs
+        of different empty nodes, drawn at once with a numpy generator
+        seeded from the random module unless a seed is given.
+        Both arrays are empty if there are less than two empty nodes.
+        """
+        self.refresh()
+        if self.count < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        if seed is None:
+            seed = random.getrandbits(64)
+        generator = np.random.default_rng(seed)
+        first = generator.integers(self.count, size=count)
+        # Drawing the second slot from the other slots
+        second = generator.integers(self.count - 1, size=count)
+        second += second >= first
+        return self.indices[first], self.indices[second]
+
+
+def grid_empty_cells(grid):
+    """
+    Returns the EmptyCells of the grid,
+    attaching them to the grid the first time.
+    """
+    if grid.empty_cells is None:
+        grid.empty_cells = EmptyCells(grid)
+    return grid.empty_cells
+
+
+def random_empty_node(grid):
+    """
+    Returns a random empty node of the grid, or None if there is none.
+    """
+    index = grid_empty_cells(grid).sample()
+    if index is None:
+        return None
+    width = grid.shape[1]
+    return grid[index // width][index % width]
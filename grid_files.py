@@ -0,0 +1,176 @@
+"""
+Module for saving and loading grids.
+
+A grid file stores the walls of a grid and the optional start and end
+nodes: a fixed header with the size of the grid and the flat indices of
+the start and end nodes, followed by one bit for every node, set for the
+walls, packed eight nodes to a byte with the first node in the highest
+bit. A 1000x1000 grid takes about 125 kB.
+
+The bits are opened as a read-only memory map, so opening a file takes
+the same time for any size of the grid, and the pages of a file opened
+by several processes are shared by the operating system.
+"""
+import struct
+import numpy as np
+from constants import WALL_STATE, START_STATE, END_STATE
+from grid_functions import generate_grid, grid_states
+
+# Magic bytes at the start of every grid file
+MAGIC = b"PFGR"
+# Version of the file format
+VERSION = 1
+# Header: magic, version, 3 padding bytes, height, width
+# and flat indices of the start and end nodes, all little-endian
+HEADER = struct.Struct("<4sB3xIIqq")
+# Index stored when the grid has no start or end node
+NO_NODE = -1
+
+
+class GridMap:
+    """
+    Class that gives access to the walls of a grid file.
+    """
+
+    def __init__(self, shape, packed, start=NO_NODE, end=NO_NODE):
+        # (height, width) of the grid
+        self.shape = shape
+        # uint8 array with the packed wall bits, memory mapped
+        # when the map was loaded from a file
+        self.packed = packed
+        # Flat indices of the start and end nodes, or NO_NODE
+        self.start = start
+        self.end = end
+
+    @property
+    def start_position(self):
+        """
+        Returns the (row, col) of the start node, or None.
+        """
+        return self.position(self.start)
+
+    @property
+    def end_position(self):
+        """
+        Returns the (row, col) of the end node, or None.
+        """
+        return self.position(self.end)
+
+    def position(self, index):
+        """
+        Returns the (row, col) of the flat index, or None for NO_NODE.
+        """
+        if index == NO_NODE:
+            return None
+        return divmod(index, self.shape[1])
+
+    def is_wall(self, row, col):
+        """
+        Returns True if the node is a wall,
+        reading only the byte of the node.
+        """
+        index = row * self.shape[1] + col
+        return bool(self.packed[index >> 3] & (0x80 >> (index & 7)))
+
+    def walls(self):
+        """
+        Returns a 2D boolean array with True for the walls.
+        """
+        height, width = self.shape
+        bits = np.unpackbits(self.packed, count=height * width)
+        return bits.view(bool).reshape(self.shape)
+
+
+def grid_map(grid):
+    """
+    Returns the GridMap of the walls and the start and end nodes
+    of the grid.
+    """
+    states = grid_states(grid).ravel()
+    packed = np.packbits(states == WALL_STATE)
+    starts = np.flatnonzero(states == START_STATE)
+    ends = np.flatnonzero(states == END_STATE)
+    return GridMap(
+        grid.shape,
+        packed,
+        int(starts[0]) if starts.size else NO_NODE,
+        int(ends[0]) if ends.size else NO_NODE
+        )
+
+
+def save_grid(grid, path):
+    """
+    Writes the walls and the start and end nodes of the grid to the file.
+    """
+    saved = grid_map(grid)
+    height, width = saved.shape
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(
+            MAGIC,
+            VERSION,
+            height,
+            width,
+            saved.start,
+            saved.end
+            ))
+        file.write(saved.packed.tobytes())
+
+
+def load_grid_map(path):
+    """
+    Opens the grid file and returns its GridMap.
+    Only the header is read, the walls are memory mapped.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        file.seek(0, 2)
+        size = file.tell()
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a grid file.")
+    magic, version, height, width, start, end = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a grid file.")
+    if version != VERSION:
+        raise ValueError(
+            f"{path} has version {version} of the grid format, "
+            f"only version {VERSION} is supported."
+        )
+    count = height * width
+    packed_size = (count + 7) // 8
+    if size < HEADER.size + packed_size:
+        raise ValueError(f"{path} is truncated.")
+    for index in (start, end):
+        if index != NO_NODE and not 0 <= index < count:
+            raise ValueError(f"{path} has a node outside the grid.")
+    packed = np.memmap(
+        path,
+        dtype=np.uint8,
+        mode="r",
+        offset=HEADER.size,
+        shape=(packed_size,)
+        )
+    return GridMap((height, width), packed, start, end)
+
+
+def load_grid(path, backend):
+    """
+    Loads the grid file into a new grid with the backend.
+    The walls are written in one bulk write.
+    Returns the grid, the start node and the end node,
+    the nodes are None if the file has none.
+    """
+    loaded = load_grid_map(path)
+    grid = generate_grid(*loaded.shape, backend)
+    grid.set_states(loaded.walls(), WALL_STATE)
+    nodes = []
+    for position, state in (
+        (loaded.start_position, START_STATE),
+        (loaded.end_position, END_STATE)
+    ):
+        if position is None:
+            nodes.append(None)
+            continue
+        node = grid[position[0]][position[1]]
+        node.set_state(state)
+        nodes.append(node)
+    return grid, nodes[0], nodes[1]
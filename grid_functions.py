@@ -1,46 +1,224 @@
 """
 Module for grid functions.
 """
-from time import sleep
+from contextlib import contextmanager
 import numpy as np
-from constants import WIDTH, HEIGHT, terminal
+from constants import (
+    WIDTH,
+    HEIGHT,
+    GRID_BACKEND,
+    FRAME_RATE,
+    ANIMATION_SPEED,
+    ANIMATION_SECONDS,
+    EMPTY_STATE,
+    WALL_STATE,
+    terminal
+)
 from node_class import Node
+from array_grid import ArrayGrid
+from empty_cells import random_empty_node
+from renderer import TerminalRenderer
+from scheduler import FrameScheduler, parse_speed
 
+# Bulk writes which would update the neighbors of more than this
+# fraction of the nodes don't update them node by node, the next
+# update_all_neighbors() rebuilds all of them at once instead
+MAX_INCREMENTAL_UPDATES = 1 / 4
+# Smallest number of rows and columns of a grid,
+# a wall border around at least one node
+MIN_GRID_SIZE = 3
 
-def generate_grid():
+
+class NodeGrid(np.ndarray):
+    """
+    2D numpy array of nodes which keeps an array with the state codes
+    of its nodes, and the neighbors of its nodes up to date
+    when walls are placed or removed.
+    """
+
+    # Defaults of the attributes, kept on the class, so the row views
+    # made by grid[row] don't set them up again every time.
+    # Only the grid created by generate_grid() sets its own values.
+    # Flag to check if the neighbors of all nodes must be rebuilt.
+    # True until update_all_neighbors() builds them for the first time.
+    neighbors_dirty = True
+    # 2D uint8 array with the state code of every node
+    states = None
+    # List of (flat index, new state) of the state changes.
+    # None unless something collects them, like the animation pipeline.
+    change_log = None
+    # ComponentLabels told about the walls placed and removed.
+    # None until something asks for the components of the grid.
+    components = None
+    # EmptyCells told about the nodes which become empty or stop
+    # being empty. None until something asks for the empty nodes.
+    empty_cells = None
+
+    def state_changed(self, node, previous_state):
+        """
+        Called by the node after its state has changed.
+        """
+        row, col = node.get_position()
+        self.states[row, col] = node.state
+        if self.change_log is not None:
+            self.change_log.append((row * self.shape[1] + col, node.state))
+        if (
+            self.empty_cells is not None and
+            (previous_state == EMPTY_STATE) != (node.state == EMPTY_STATE)
+        ):
+            self.empty_cells.state_changed(
+                row * self.shape[1] + col,
+                node.state == EMPTY_STATE
+            )
+        is_wall = node.state == WALL_STATE
+        if (previous_state == WALL_STATE) == is_wall:
+            return
+        if self.components is not None:
+            self.components.wall_changed(row * self.shape[1] + col, is_wall)
+        if not self.neighbors_dirty:
+            # The node has just become a wall or stopped being one,
+            # so we update the neighbors of the four nodes around it
+            height, width = self.shape
+            if row > 0:
+                self[row - 1, col].update_neighbors(self)
+            if row < height - 1:
+                self[row + 1, col].update_neighbors(self)
+            if col > 0:
+                self[row, col - 1].update_neighbors(self)
+            if col < width - 1:
+                self[row, col + 1].update_neighbors(self)
+
+    def set_states(self, mask, state):
+        """
+        Changes the state of all nodes selected by the 2D boolean mask
+        at once, without a display step. Only the nodes whose state
+        changes are touched, and the neighbors are updated once
+        around all nodes which have become walls or stopped being one,
+        or marked to be rebuilt if that is a large part of the grid.
+        """
+        states = self.states.ravel()
+        changed = np.flatnonzero(mask.ravel() & (states != state))
+        if not changed.size:
+            return
+        if self.empty_cells is not None:
+            self.empty_cells.invalidate()
+        was_wall = states[changed] == WALL_STATE
+        states[changed] = state
+        nodes = np.asarray(self).ravel()
+        for index in changed:
+            nodes[index].state = state
+        if self.change_log is not None:
+            self.change_log.extend((int(index), state) for index in changed)
+        flipped = changed[was_wall != (state == WALL_STATE)]
+        if self.components is not None and flipped.size:
+            self.components.invalidate()
+        if self.neighbors_dirty or not flipped.size:
+            return
+        # Updating the neighbors of the nodes around the flipped nodes,
+        # every node only once
+        height, width = self.shape
+        around = np.zeros((height, width), dtype=bool)
+        rows, cols = np.divmod(flipped, width)
+        around[np.maximum(rows - 1, 0), cols] = True
+        around[np.minimum(rows + 1, height - 1), cols] = True
+        around[rows, np.maximum(cols - 1, 0)] = True
+        around[rows, np.minimum(cols + 1, width - 1)] = True
+        around = np.flatnonzero(around)
+        if around.size > self.size * MAX_INCREMENTAL_UPDATES:
+            # Most of the grid would be updated, so all neighbors
+            # are rebuilt at once when they are needed next
+            self.neighbors_dirty = True
+            return
+        for index in around:
+            nodes[index].update_neighbors(self)
+
+    def reset_search(self):
+        """
+        Resets the search values of all nodes.
+        """
+        for node in self.flat:
+            node.reset_search()
+
+
+def generate_grid(height=HEIGHT, width=WIDTH, backend=GRID_BACKEND):
     """
-    Generates and returns a grid of nodes as a 2D numpy array.
+    Generates and returns a grid of nodes as a 2D numpy array,
+    or an ArrayGrid if the "array" backend is chosen.
+    The size of the grid is a property of the grid itself,
+    all other functions read it from grid.shape.
     """
-    return np.array(
-        [[Node(row, col) for col in range(WIDTH)] for row in range(HEIGHT)]
+    if height < MIN_GRID_SIZE or width < MIN_GRID_SIZE:
+        raise ValueError(
+            f"The grid must be at least {MIN_GRID_SIZE}x{MIN_GRID_SIZE} nodes."
         )
+    if backend == "array":
+        return ArrayGrid(height, width)
+    # Filling an empty object array row by row avoids building
+    # a nested list of all nodes first on large grids
+    grid = np.empty((height, width), dtype=object).view(NodeGrid)
+    for row in range(height):
+        grid[row] = [Node(row, col) for col in range(width)]
+    grid.states = np.full(grid.shape, EMPTY_STATE, dtype=np.uint8)
+    for node in grid.flat:
+        node.grid = grid
+    return grid
+
+
+def grid_states(grid):
+    """
+    Returns a 2D array with the state code of every node on the grid.
+    """
+    states = getattr(grid, "states", None)
+    if states is None:
+        # Plain numpy array of nodes without a state array
+        states = np.array(
+            [[node.state for node in row] for row in grid],
+            dtype=np.uint8
+            )
+    return states
 
 
 def update_all_neighbors(grid):
     """
     Updates neighbors of all nodes on the grid.
+    Does nothing if the grid keeps the neighbors up to date by itself.
     """
+    if not getattr(grid, "neighbors_dirty", True):
+        return
     for row in grid:
         for node in row:
             node.update_neighbors(grid)
+    if isinstance(grid, NodeGrid):
+        # From now on the grid updates the neighbors by itself
+        grid.neighbors_dirty = False
 
 
-def reset_grid(grid):
+def reset_grid(grid, animated=True):
     """
     Resets all nodes on the grid to its initial state.
     After that creates a wall border around the grid.
+    Without the animation all nodes are written in bulk
+    and nothing is displayed.
     """
+    if not animated:
+        grid.set_states(np.ones(grid.shape, dtype=bool), EMPTY_STATE)
+        grid.reset_search()
+        border = np.ones(grid.shape, dtype=bool)
+        border[1:-1, 1:-1] = False
+        grid.set_states(border, WALL_STATE)
+        return
     for row in grid:
         for node in row:
             node.reset()
-    for i in range(HEIGHT):
+    height, width = grid.shape
+    for i in range(height):
         grid[i][0].make_wall()
         grid[i][-1].make_wall()
-        display_grid(grid)
-    for i in range(WIDTH):
+        display_step(grid)
+    for i in range(width):
         grid[0][i].make_wall()
         grid[-1][i].make_wall()
-        display_grid(grid)
+        display_step(grid)
 
 
 def reset_grid_partially(grid):
@@ -60,15 +238,79 @@ def reset_grid_partially(grid):
                 node.reset()
 
 
-def display_grid(grid):
+# Settings of display_grid(), changed by display_disabled()
+display_settings = {"enabled": True}
+# Functions called with the grid on every display_grid()
+# and display_step() call, even when the display is disabled.
+# Used by the trace recorder.
+display_listeners = []
+# Renderer which remembers the last frame drawn by display_grid()
+renderer = TerminalRenderer(terminal)
+# Scheduler which decides which steps of the animations are drawn
+scheduler = FrameScheduler(
+    FRAME_RATE,
+    parse_speed(ANIMATION_SPEED),
+    ANIMATION_SECONDS
+    )
+
+
+@contextmanager
+def display_disabled():
+    """
+    Context manager which turns display_grid() off, so grids can be
+    generated and searched without drawing and waiting.
+    """
+    enabled = display_settings["enabled"]
+    display_settings["enabled"] = False
+    try:
+        yield
+    finally:
+        display_settings["enabled"] = enabled
+
+
+def invalidate_display():
     """
-    Displays the grid in the terminal.
+    Makes the next display_grid() call repaint the whole screen.
+    Must be called after anything else has been drawn over the grid,
+    like the menus.
     """
+    renderer.invalidate()
+    scheduler.reset()
+
+
+def display_grid(grid, full_repaint=False, footer=""):
+    """
+    Displays the grid in the terminal right away
+    and ends the current animation.
+    Only the cells changed since the last call are redrawn,
+    unless a full repaint is asked for.
+    The footer is text displayed under the grid.
+    """
+    for listener in display_listeners:
+        listener(grid)
+    scheduler.reset()
+    if not display_settings["enabled"]:
+        return
     with terminal.hidden_cursor():
-        print(terminal.home + terminal.clear)
-        for row in grid:
-            print(" ".join(str(node) for node in row))
-        sleep(0.15)
+        renderer.draw(grid_states(grid), full_repaint, footer)
+
+
+def display_step(grid):
+    """
+    Displays one step of an animation on the grid.
+    The scheduler waits until the step is due, and draws the grid
+    only when a frame is due too, so the steps in between are merged
+    into the next frame. The animation must be finished
+    with display_grid(), which draws the last steps.
+    """
+    for listener in display_listeners:
+        listener(grid)
+    if not display_settings["enabled"]:
+        return
+    # An animation has at most about one step per cell
+    if scheduler.step(grid_states(grid).size):
+        with terminal.hidden_cursor():
+            renderer.draw(grid_states(grid))
 
 
 def display_prepared_grid(start_node, end_node, grid):
@@ -84,6 +326,17 @@ def place_start_node_manually(grid):
     """
     Allows user to place start node on the grid manually.
     """
+    height, width = grid.shape
+    # Instructions displayed under the grid
+    instructions = (
+        terminal.bold +
+        terminal.yellow +
+        "Place the start node." +
+        terminal.normal +
+        "\nUse ARROW keys to move around the grid." +
+        "\nPress ENTER to place the start node." +
+        "\nPress ESC to cancel the start node placement.\n"
+        )
     # Making sure that the start node is not on the grid
     start_node = None
     # Creating a variable to place temporary start node on the grid,
@@ -93,162 +346,165 @@ def place_start_node_manually(grid):
     # terminal.cbreak() makes the terminal read key presses instantly
     # terminal.hidden_cursor() hides the cursor from the screen
     with terminal.cbreak(), terminal.hidden_cursor():
+        # Displaying the grid with the instructions once,
+        # after that only the cells the node moved between are redrawn.
+        # The viewport follows the node on grids larger than the terminal.
+        renderer.viewport.focus(*temp_start.get_position())
+        display_grid(grid, footer=instructions)
         # While the start node is not placed on the grid
         while not start_node:
-            # Every iteration we clear the screen
-            print(terminal.home + terminal.clear)
-            # And display the grid
-            # The reason why the function display_grid() is not used here
-            # is because it contains sleep() function, which we don't need here
-            for row in grid:
-                print(" ".join(str(node) for node in row))
-            # Displaying the instructions to the user under the grid
-            print(
-                terminal.bold +
-                terminal.yellow +
-                "Place the start node." +
-                terminal.normal
-                )
-            print("Use ARROW keys to move around the grid.")
-            print("Press ENTER to place the start node.")
-            print("Press ESC to cancel the start node placement.")
-            # Variable to store the key pressed by the user
-            key_pressed = terminal.inkey(timeout=0.1)
-            # If the user pressed any of the arrow keys,
-            # we check if the node can be moved there.
-            # If it can, we make the temporary start node EMPTY,
-            # and move the temporary start node to the new position,
-            # coloring it as START.
-            if key_pressed.code == terminal.KEY_UP:
-                if (
-                    temp_start.row > 1 and
-                    grid[temp_start.row - 1][temp_start.col].is_empty()
-                ):
+            # Position of the node before the keys are handled
+            position = temp_start.get_position()
+            # Waiting for the next key without a timeout,
+            # so nothing is redrawn while the user is idle
+            key_pressed = terminal.inkey()
+            # Handling all keys already waiting in the input as well,
+            # so a held arrow key moves the node with a single redraw
+            while key_pressed:
+                # If the user pressed any of the arrow keys,
+                # we check if the node can be moved there.
+                # If it can, we make the temporary start node EMPTY,
+                # and move the temporary start node to the new position,
+                # coloring it as START.
+                if key_pressed.code == terminal.KEY_UP:
+                    if (
+                        temp_start.row > 1 and
+                        grid[temp_start.row - 1][temp_start.col].is_empty()
+                    ):
+                        temp_start.make_empty()
+                        temp_start = grid[temp_start.row - 1][temp_start.col]
+                        temp_start.make_start()
+                elif key_pressed.code == terminal.KEY_DOWN:
+                    if (
+                        temp_start.row < height - 2 and
+                        grid[temp_start.row + 1][temp_start.col].is_empty()
+                    ):
+                        temp_start.make_empty()
+                        temp_start = grid[temp_start.row + 1][temp_start.col]
+                        temp_start.make_start()
+                elif key_pressed.code == terminal.KEY_LEFT:
+                    if (
+                        temp_start.col > 1 and
+                        grid[temp_start.row][temp_start.col - 1].is_empty()
+                    ):
+                        temp_start.make_empty()
+                        temp_start = grid[temp_start.row][temp_start.col - 1]
+                        temp_start.make_start()
+                elif key_pressed.code == terminal.KEY_RIGHT:
+                    if (
+                        temp_start.col < width - 2 and
+                        grid[temp_start.row][temp_start.col + 1].is_empty()
+                    ):
+                        temp_start.make_empty()
+                        temp_start = grid[temp_start.row][temp_start.col + 1]
+                        temp_start.make_start()
+                # If the user pressed ENTER, we return the start node
+                elif key_pressed.code == terminal.KEY_ENTER:
+                    return temp_start
+                # If the user pressed ESC, we make the temporary start node
+                # EMPTY, and return None
+                elif key_pressed.code == terminal.KEY_ESCAPE:
                     temp_start.make_empty()
-                    temp_start = grid[temp_start.row - 1][temp_start.col]
-                    temp_start.make_start()
-            elif key_pressed.code == terminal.KEY_DOWN:
-                if (
-                    temp_start.row < HEIGHT - 2 and
-                    grid[temp_start.row + 1][temp_start.col].is_empty()
-                ):
-                    temp_start.make_empty()
-                    temp_start = grid[temp_start.row + 1][temp_start.col]
-                    temp_start.make_start()
-            elif key_pressed.code == terminal.KEY_LEFT:
-                if (
-                    temp_start.col > 1 and
-                    grid[temp_start.row][temp_start.col - 1].is_empty()
-                ):
-                    temp_start.make_empty()
-                    temp_start = grid[temp_start.row][temp_start.col - 1]
-                    temp_start.make_start()
-            elif key_pressed.code == terminal.KEY_RIGHT:
-                if (
-                    temp_start.col < WIDTH - 2 and
-                    grid[temp_start.row][temp_start.col + 1].is_empty()
-                ):
-                    temp_start.make_empty()
-                    temp_start = grid[temp_start.row][temp_start.col + 1]
-                    temp_start.make_start()
-            # If the user pressed ENTER, we return the start node
-            elif key_pressed.code == terminal.KEY_ENTER:
-                return temp_start
-            # If the user pressed ESC, we make the temporary start node EMPTY,
-            # and return None
-            elif key_pressed.code == terminal.KEY_ESCAPE:
-                temp_start.make_empty()
-                return None
-            # For any other key, we do nothing
-            else:
-                continue
+                    return None
+                key_pressed = terminal.inkey(timeout=0)
+            if temp_start.get_position() != position:
+                renderer.viewport.focus(*temp_start.get_position())
+                display_grid(grid, footer=instructions)
 
 
 def place_end_node_manually(grid):
     """
     Allows user to place end node on the grid manually.
     """
+    height, width = grid.shape
+    # Instructions displayed under the grid
+    instructions = (
+        terminal.bold +
+        terminal.yellow +
+        "Place the end node." +
+        terminal.normal +
+        "\nUse ARROW keys to move around the grid." +
+        "\nPress ENTER to place the end node." +
+        "\nPress ESC to cancel the end node placement.\n"
+        )
     # Making sure that the end node is not on the grid
     end_node = None
-    # Creating a variable for the temporary end node.
-    temp_end = None
-    # Looping through the grid to find the first empty node.
-    for row in grid:
-        for node in row:
-            if node.is_empty():
-                temp_end = node
+    # Creating a variable for the temporary end node
+    # in the bottom right corner, or on a random empty node
+    # taken from the index of the empty nodes if the corner is taken.
+    temp_end = grid[height - 2][width - 2]
+    if not temp_end.is_empty():
+        temp_end = random_empty_node(grid)
+    # If there is no empty node left, the end node can't be placed
+    if temp_end is None:
+        return None
     # Color the temporary end node as END
     temp_end.make_end()
     # terminal.cbreak() makes the terminal read key presses instantly
     # terminal.hidden_cursor() hides the cursor from the screen
     with terminal.cbreak(), terminal.hidden_cursor():
+        # Displaying the grid with the instructions once,
+        # after that only the cells the node moved between are redrawn.
+        # The viewport follows the node on grids larger than the terminal.
+        renderer.viewport.focus(*temp_end.get_position())
+        display_grid(grid, footer=instructions)
         # While the end node is not placed on the grid
         while not end_node:
-            # Every iteration we clear the screen
-            print(terminal.home + terminal.clear)
-            # And display the grid
-            # The reason why the function display_grid() is not used here
-            # is because it contains sleep() function, which we don't need here
-            for row in grid:
-                print(" ".join(str(node) for node in row))
-            # Displaying the instructions to the user under the grid
-            print(
-                terminal.bold +
-                terminal.yellow +
-                "Place the end node." +
-                terminal.normal
-                )
-            print("Use ARROW keys to move around the grid.")
-            print("Press ENTER to place the end node.")
-            print("Press ESC to cancel the end node placement.")
-            # Variable to store the key pressed by the user
-            key_pressed = terminal.inkey(timeout=0.1)
-            # If the user pressed any of the arrow keys,
-            # we check if the node can be moved there.
-            # If it can, we make the temporary end node EMPTY,
-            # and move the temporary end node to the new position,
-            # coloring it as END.
-            if key_pressed.code == terminal.KEY_UP:
-                if (
-                    temp_end.row > 1 and
-                    grid[temp_end.row - 1][temp_end.col].is_empty()
-                ):
-                    temp_end.make_empty()
-                    temp_end = grid[temp_end.row - 1][temp_end.col]
-                    temp_end.make_end()
-            elif key_pressed.code == terminal.KEY_DOWN:
-                if (
-                    temp_end.row < HEIGHT - 2 and
-                    grid[temp_end.row + 1][temp_end.col].is_empty()
-                ):
-                    temp_end.make_empty()
-                    temp_end = grid[temp_end.row + 1][temp_end.col]
-                    temp_end.make_end()
-            elif key_pressed.code == terminal.KEY_LEFT:
-                if (
-                    temp_end.col > 1 and
-                    grid[temp_end.row][temp_end.col - 1].is_empty()
-                ):
-                    temp_end.make_empty()
-                    temp_end = grid[temp_end.row][temp_end.col - 1]
-                    temp_end.make_end()
-            elif key_pressed.code == terminal.KEY_RIGHT:
-                if (
-                    temp_end.col < WIDTH - 2 and
-                    grid[temp_end.row][temp_end.col + 1].is_empty()
-                ):
+            # Position of the node before the keys are handled
+            position = temp_end.get_position()
+            # Waiting for the next key without a timeout,
+            # so nothing is redrawn while the user is idle
+            key_pressed = terminal.inkey()
+            # Handling all keys already waiting in the input as well,
+            # so a held arrow key moves the node with a single redraw
+            while key_pressed:
+                # If the user pressed any of the arrow keys,
+                # we check if the node can be moved there.
+                # If it can, we make the temporary end node EMPTY,
+                # and move the temporary end node to the new position,
+                # coloring it as END.
+                if key_pressed.code == terminal.KEY_UP:
+                    if (
+                        temp_end.row > 1 and
+                        grid[temp_end.row - 1][temp_end.col].is_empty()
+                    ):
+                        temp_end.make_empty()
+                        temp_end = grid[temp_end.row - 1][temp_end.col]
+                        temp_end.make_end()
+                elif key_pressed.code == terminal.KEY_DOWN:
+                    if (
+                        temp_end.row < height - 2 and
+                        grid[temp_end.row + 1][temp_end.col].is_empty()
+                    ):
+                        temp_end.make_empty()
+                        temp_end = grid[temp_end.row + 1][temp_end.col]
+                        temp_end.make_end()
+                elif key_pressed.code == terminal.KEY_LEFT:
+                    if (
+                        temp_end.col > 1 and
+                        grid[temp_end.row][temp_end.col - 1].is_empty()
+                    ):
+                        temp_end.make_empty()
+                        temp_end = grid[temp_end.row][temp_end.col - 1]
+                        temp_end.make_end()
+                elif key_pressed.code == terminal.KEY_RIGHT:
+                    if (
+                        temp_end.col < width - 2 and
+                        grid[temp_end.row][temp_end.col + 1].is_empty()
+                    ):
+                        temp_end.make_empty()
+                        temp_end = grid[temp_end.row][temp_end.col + 1]
+                        temp_end.make_end()
+                # If the user pressed ENTER, we return the end node
+                elif key_pressed.code == terminal.KEY_ENTER:
+                    end_node = temp_end
+                    return end_node
+                # If the user pressed ESC, we make the temporary end node
+                # EMPTY, and return None
+                elif key_pressed.code == terminal.KEY_ESCAPE:
                     temp_end.make_empty()
-                    temp_end = grid[temp_end.row][temp_end.col + 1]
-                    temp_end.make_end()
-            # If the user pressed ENTER, we return the end node
-            elif key_pressed.code == terminal.KEY_ENTER:
-                end_node = temp_end
-                return end_node
-            # If the user pressed ESC, we make the temporary end node EMPTY,
-            # and return None
-            elif key_pressed.code == terminal.KEY_ESCAPE:
-                temp_end.make_empty()
-                return None
-            # For any other key, we do nothing
-            else:
-                continue
+                    return None
+                key_pressed = terminal.inkey(timeout=0)
+            if temp_end.get_position() != position:
+                renderer.viewport.focus(*temp_end.get_position())
+                display_grid(grid, footer=instructions)
@@ -1,212 +1,617 @@
 """
 Functions for maze generation.
+
+Every generator has an animated mode, which makes the walls one by one
+with a display step after each of them, and a compute-only mode, which
+writes the walls into a layout array with slice assignments and applies
+the layout to the grid in one bulk write per state. Both modes draw
+the same random numbers in the same order, so they give the same maze.
+The random pattern draws all its barriers at once with numpy instead.
+
+Kruskal's, Prim's, Wilson's and Eller's algorithms make perfect mazes,
+where every two cells are connected by exactly one path. They yield the
+walls they carve one by one, and carve_maze() applies them in either
+mode. Their cost grows almost linearly with the number of cells.
 """
 import random
-from constants import WIDTH, HEIGHT
-from grid_functions import display_grid
+import numpy as np
+from constants import EMPTY_STATE, WALL_STATE, RANDOM_DENSITY
+from grid_functions import display_step, reset_grid
+from pipeline import animations_enabled, run_animated
+
+# Settings of generate_random_pattern(), the density can be changed
+# with the RANDOM_DENSITY variable or the --density flag of run.py
+pattern_settings = {"density": RANDOM_DENSITY}
 
+# Value of the layout cells which keep their state
+UNCHANGED = 255
 
-def generate_horizontal_maze(grid):
+
+def new_layout(grid):
+    """
+    Returns the layout used by the compute-only mode: a 2D array
+    with the new state of every cell, or UNCHANGED.
+    """
+    return np.full(grid.shape, UNCHANGED, dtype=np.uint8)
+
+
+def apply_layout(grid, layout):
+    """
+    Writes the new states of the layout to the grid in bulk.
+    Later writes to the layout have overwritten earlier ones,
+    just like the animated mode changes the cells.
+    """
+    for state in (WALL_STATE, EMPTY_STATE):
+        grid.set_states(layout == state, state)
+
+
+def generate_horizontal_maze(grid, animated=True):
     """
     Generates a maze with horizontal walls with random passages
     """
-    for row in range(2, HEIGHT - 2, 2):
-        skip = random.randint(1, WIDTH - 2)
-        for col in range(1, WIDTH - 1):
+    height, width = grid.shape
+    if not animated:
+        layout = new_layout(grid)
+        for row in range(2, height - 2, 2):
+            skip = random.randint(1, width - 2)
+            layout[row, 1:skip] = WALL_STATE
+            layout[row, skip + 1:width - 1] = WALL_STATE
+        apply_layout(grid, layout)
+        return
+    for row in range(2, height - 2, 2):
+        skip = random.randint(1, width - 2)
+        for col in range(1, width - 1):
             if col == skip:
                 continue
             grid[row][col].make_wall()
-            display_grid(grid)
+            display_step(grid)
 
 
-def generate_vertical_maze(grid):
+def generate_vertical_maze(grid, animated=True):
     """
     Generates a maze with vertical walls with random passages
     """
-    for col in range(2, WIDTH - 2, 2):
-        skip = random.randint(1, HEIGHT - 2)
-        for i in range(1, HEIGHT - 1):
+    height, width = grid.shape
+    if not animated:
+        layout = new_layout(grid)
+        for col in range(2, width - 2, 2):
+            skip = random.randint(1, height - 2)
+            layout[1:height - 1, col] = WALL_STATE
+            layout[skip, col] = EMPTY_STATE
+        apply_layout(grid, layout)
+        return
+    for col in range(2, width - 2, 2):
+        skip = random.randint(1, height - 2)
+        for i in range(1, height - 1):
             # Using numpy slicing here to easily get the column.
             grid[:, col][i].make_wall()
-            display_grid(grid)
+            display_step(grid)
         grid[:, col][skip].reset()
 
 
-def generate_spiral_maze(grid):
+def generate_spiral_maze(grid, animated=True):
     """
     Generates a maze in a form of a spiral
     """
+    height, width = grid.shape
     left = 1  # Start from the left border
-    right = WIDTH - 2  # Finish two columns from the right border
+    right = width - 2  # Finish two columns from the right border
     top = 2  # Start two rows from the top
-    bottom = HEIGHT - 2  # Finish two rows from the bottom
+    bottom = height - 2  # Finish two rows from the bottom
+
+    if not animated:
+        # Same walls as below, every wall as one slice
+        layout = new_layout(grid)
+        while left < right and top < bottom:
+            layout[top, left:right] = WALL_STATE
+            top += 2
+            if top > bottom:
+                break
+            layout[top - 1:bottom, right - 1] = WALL_STATE
+            right -= 2
+            if right < left:
+                break
+            layout[bottom - 1, left + 1:right + 1] = WALL_STATE
+            bottom -= 2
+            if bottom < top:
+                break
+            layout[top:bottom + 1, left + 1] = WALL_STATE
+            left += 2
+        apply_layout(grid, layout)
+        return
 
     while left < right and top < bottom:
         if left > right:
             break
         for i in range(left, right):  # Drawing wall from left to right
             grid[top][i].make_wall()
-            display_grid(grid)
+            display_step(grid)
         top += 2  # Moving to the next row down leaving a gap
         if top > bottom:
             break
         for i in range(top - 1, bottom):  # Drawing wall from top to bottom
             grid[i][right - 1].make_wall()
-            display_grid(grid)
+            display_step(grid)
         right -= 2  # Moving to the next column to the left leaving a gap
         if right < left:
             break
         for i in range(right, left, -1):  # Drawing wall from right to left
             grid[bottom - 1][i].make_wall()
-            display_grid(grid)
+            display_step(grid)
         bottom -= 2  # Moving to the next row up leaving a gap
         if bottom < top:
             break
         for i in range(bottom, top - 1, -1):  # Drawing wall from bottom to top
             grid[i][left + 1].make_wall()
-            display_grid(grid)
+            display_step(grid)
         left += 2  # Moving to the next column to the right leaving a gap
 
 
-def generate_random_pattern(grid):
+def parse_density(text):
+    """
+    Parses the density of the random pattern, a fraction from 0 to 1.
+    """
+    density = float(text)
+    if not 0 <= density <= 1:
+        raise ValueError("The density must be between 0 and 1.")
+    return density
+
+
+def generate_random_pattern(grid, animated=True, density=None, seed=None):
     """
     Generates randomly placed barriers on the grid.
+    Every node inside the border becomes a barrier with the probability
+    of the density, by default the one in pattern_settings. The barriers
+    are drawn in one call of a numpy generator created from the seed,
+    so the same seed gives the same pattern on any machine.
+    Without a seed, it is taken from the random module, so seeding
+    the random module repeats the pattern too.
     """
-    for row in range(1, HEIGHT):
-        for col in range(1, WIDTH):
-            if random.random() < 0.14:  # 0.14 is the probability of a barrier
-                grid[row][col].make_wall()
-        display_grid(grid)
+    height, width = grid.shape
+    if density is None:
+        density = pattern_settings["density"]
+    if seed is None:
+        seed = random.getrandbits(64)
+    barriers = np.zeros(grid.shape, dtype=bool)
+    rng = np.random.default_rng(seed)
+    barriers[1:-1, 1:-1] = rng.random((height - 2, width - 2)) < density
+    if not animated:
+        grid.set_states(barriers, WALL_STATE)
+        return
+    for row in range(1, height - 1):
+        for col in np.flatnonzero(barriers[row]):
+            grid[row][int(col)].make_wall()
+        display_step(grid)
 
 
 def generate_maze_recursive_division(
-    grid, row_start, row_end, col_start, col_end, orientation="horizontal"
+    grid, row_start, row_end, col_start, col_end, orientation="horizontal",
+    animated=True
 ):
     """
     Generates a maze using recursive division algorithm.
     """
-    if row_end - row_start < 0 and col_end - col_start < 0:  # Stop condition
-        return
-    # Horizontal division
-    if orientation == "horizontal":
-        # Adding every second row to the list
-        possible_rows = list(range(row_start, row_end + 1, 2))
-        # Adding every second column to the list
-        possible_cols = list(range(col_start - 1, col_end + 2, 2))
-        # Randomly choosing a row for a wall
-        current_row = random.choice(possible_rows)
-        # Randomly choosing a column for a passage
-        col_to_skip = random.choice(possible_cols)
-        for col in range(col_start - 1, col_end + 2):
-            grid[current_row][col].make_wall()
-            if col == col_to_skip:
-                grid[current_row][col].make_empty()
+    # Layout of the compute-only mode
+    layout = None if animated else new_layout(grid)
+    # Chambers waiting to be divided. A list used as a stack replaces
+    # the recursive calls, so large grids don't hit the recursion limit.
+    # Chambers are divided in the same order as with recursive calls.
+    chambers = [(row_start, row_end, col_start, col_end, orientation)]
+    # Local names for the calls made for every chamber
+    push = chambers.append
+    randrange = random.randrange
+    while chambers:
+        row_start, row_end, col_start, col_end, orientation = chambers.pop()
+        # Horizontal division
+        if orientation == "horizontal":
+            if row_end < row_start or col_end + 3 <= col_start:
+                # No row for a wall or no column for a passage
                 continue
-            display_grid(grid)
-        # Checking upper and lower parts of the grid
-        # if we need to divide it horizontally or vertically
-        # and recursively calling the function
-
-        # If height of the upper part is greater than width,
-        # we divide horizontally
-        if current_row - 2 - row_start > col_end - col_start:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                current_row - 2,
-                col_start,
-                col_end,
-                "horizontal"
-            )
-        # If width of the upper part is greater than height,
-        # we divide vertically
-        else:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                current_row - 2,
-                col_start,
-                col_end,
-                "vertical"
-            )
-        # If height of the lower part is greater than width,
-        # we divide horizontally
-        if row_end - current_row - 2 > col_end - col_start:
-            generate_maze_recursive_division(
-                grid,
-                current_row + 2,
-                row_end,
-                col_start,
-                col_end,
-                "horizontal"
-            )
-        # If width of the lower part is greater than height,
-        # we divide vertically
+            # Randomly choosing every second row for a wall and every
+            # second column for a passage. randrange() with a step draws
+            # the same numbers as choosing from a list of those rows
+            # and columns, without building the list.
+            current_row = randrange(row_start, row_end + 1, 2)
+            col_to_skip = randrange(col_start - 1, col_end + 2, 2)
+            if layout is not None:
+                # The whole wall as one slice, then the passage
+                layout[current_row, col_start - 1:col_end + 2] = WALL_STATE
+                layout[current_row, col_to_skip] = EMPTY_STATE
+            else:
+                for col in range(col_start - 1, col_end + 2):
+                    grid[current_row][col].make_wall()
+                    if col == col_to_skip:
+                        grid[current_row][col].make_empty()
+                        continue
+                    display_step(grid)
+            # Checking upper and lower parts of the grid
+            # if we need to divide them horizontally or vertically.
+            # If height of the part is greater than width,
+            # we divide horizontally, otherwise vertically.
+            # Parts too small to divide are not pushed at all.
+            width = col_end - col_start
+            # Pushing the lower part first,
+            # so the upper part is divided first
+            if row_end - current_row - 2 >= 0 or width >= 0:
+                push((
+                    current_row + 2,
+                    row_end,
+                    col_start,
+                    col_end,
+                    "horizontal"
+                    if row_end - current_row - 2 > width
+                    else "vertical"
+                ))
+            if current_row - 2 - row_start >= 0 or width >= 0:
+                push((
+                    row_start,
+                    current_row - 2,
+                    col_start,
+                    col_end,
+                    "horizontal"
+                    if current_row - 2 - row_start > width
+                    else "vertical"
+                ))
+        # Vertical division
         else:
-            generate_maze_recursive_division(
-                grid, current_row + 2, row_end, col_start, col_end, "vertical"
-            )
-    # Vertical division
-    else:
-        # Adding every second row to the list
-        possible_rows = list(range(row_start - 1, row_end + 2, 2))
-        # Adding every second column to the list
-        possible_cols = list(range(col_start, col_end + 1, 2))
-        # Randomly choosing a row for a passage
-        row_to_skip = random.choice(possible_rows)
-        # Randomly choosing a column for a wall
-        current_col = random.choice(possible_cols)
-        for row in range(row_start - 1, row_end + 2):
-            grid[row][current_col].make_wall()
-            if row == row_to_skip:
-                grid[row][current_col].make_empty()
+            if col_end < col_start or row_end + 3 <= row_start:
+                # No column for a wall or no row for a passage
                 continue
-            display_grid(grid)
-        # Checking left and right parts of the grid
-        # if we need to divide it horizontally or vertically
-        # and recursively calling the function
-
-        # If height of the left part is greater than width,
-        # we divide horizontally
-        if row_end - row_start > current_col - 2 - col_start:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                row_end,
-                col_start,
-                current_col - 2,
-                "horizontal"
-            )
-        # If width of the left part is greater than height,
-        # we divide vertically
-        else:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                row_end,
-                col_start,
-                current_col - 2,
-                "vertical"
-            )
-        # If height of the right part is greater than width,
-        # we divide horizontally
-        if row_end - row_start > col_end - current_col - 2:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                row_end,
-                current_col + 2,
-                col_end,
-                "horizontal"
-            )
-        # If width of the right part is greater than height,
-        # we divide vertically
-        else:
-            generate_maze_recursive_division(
-                grid,
-                row_start,
-                row_end,
-                current_col + 2,
-                col_end,
-                "vertical"
-            )
+            # Randomly choosing every second row for a passage
+            # and every second column for a wall
+            row_to_skip = randrange(row_start - 1, row_end + 2, 2)
+            current_col = randrange(col_start, col_end + 1, 2)
+            if layout is not None:
+                # The whole wall as one slice, then the passage
+                layout[row_start - 1:row_end + 2, current_col] = WALL_STATE
+                layout[row_to_skip, current_col] = EMPTY_STATE
+            else:
+                for row in range(row_start - 1, row_end + 2):
+                    grid[row][current_col].make_wall()
+                    if row == row_to_skip:
+                        grid[row][current_col].make_empty()
+                        continue
+                    display_step(grid)
+            # Checking left and right parts of the grid
+            # if we need to divide them horizontally or vertically.
+            # If height of the part is greater than width,
+            # we divide horizontally, otherwise vertically.
+            # Parts too small to divide are not pushed at all.
+            height = row_end - row_start
+            # Pushing the right part first,
+            # so the left part is divided first
+            if col_end - current_col - 2 >= 0 or height >= 0:
+                push((
+                    row_start,
+                    row_end,
+                    current_col + 2,
+                    col_end,
+                    "horizontal"
+                    if height > col_end - current_col - 2
+                    else "vertical"
+                ))
+            if current_col - 2 - col_start >= 0 or height >= 0:
+                push((
+                    row_start,
+                    row_end,
+                    col_start,
+                    current_col - 2,
+                    "horizontal"
+                    if height > current_col - 2 - col_start
+                    else "vertical"
+                ))
+    if layout is not None:
+        apply_layout(grid, layout)
+
+
+class CellLattice:
+    """
+    Cells of a perfect maze on the grid. Cells are at odd rows and
+    columns of the grid, the walls between them are carved to connect
+    them. Cells are numbered row by row, so cell + 1 is the neighbor
+    to the right and cell + cols is the neighbor below.
+    Grids with odd sizes are filled completely, on grids with even sizes
+    the last row or column of the inside stays a wall.
+    """
+
+    def __init__(self, grid):
+        height, width = grid.shape
+        # Width of the grid, used to turn cells into grid indices
+        self.width = width
+        # Number of rows and columns of cells
+        self.rows = (height - 1) // 2
+        self.cols = (width - 1) // 2
+        self.count = self.rows * self.cols
+
+    def neighbors(self, cell):
+        """
+        Returns the cells next to the cell.
+        """
+        cols = self.cols
+        row, col = divmod(cell, cols)
+        neighbors = []
+        if row > 0:
+            neighbors.append(cell - cols)
+        if row < self.rows - 1:
+            neighbors.append(cell + cols)
+        if col > 0:
+            neighbors.append(cell - 1)
+        if col < cols - 1:
+            neighbors.append(cell + 1)
+        return neighbors
+
+    def grid_index(self, cell):
+        """
+        Returns the flat index of the cell on the grid.
+        """
+        row, col = divmod(cell, self.cols)
+        return (2 * row + 1) * self.width + 2 * col + 1
+
+    def passage(self, cell, other):
+        """
+        Returns the flat index on the grid of the wall
+        between two neighboring cells.
+        """
+        return (self.grid_index(cell) + self.grid_index(other)) // 2
+
+
+def carve_maze(grid, lattice, passages, animated=True):
+    """
+    Fills the inside of the grid with walls, leaving only the cells
+    of the lattice empty, and carves the passages, the flat indices
+    of the walls yielded by a maze algorithm, in their order.
+    Animated, every carved wall is one display step.
+    In the compute-only mode the passages are written in batches
+    of one grid row, so only the layout grows with the size of the grid.
+    """
+    height, width = grid.shape
+    walls = np.zeros(grid.shape, dtype=bool)
+    walls[1:-1, 1:-1] = True
+    walls[1:2 * lattice.rows:2, 1:2 * lattice.cols:2] = False
+    if animated:
+        grid.set_states(walls, WALL_STATE)
+        display_step(grid)
+        for index in passages:
+            row, col = divmod(index, width)
+            grid[row][col].make_empty()
+            display_step(grid)
+        return
+    layout = new_layout(grid)
+    layout[walls] = WALL_STATE
+    cells = layout.ravel()
+    batch = []
+    for index in passages:
+        batch.append(index)
+        if len(batch) == width:
+            cells[batch] = EMPTY_STATE
+            batch.clear()
+    cells[batch] = EMPTY_STATE
+    apply_layout(grid, layout)
+
+
+def find_root(parent, cell):
+    """
+    Returns the root of the set of the cell in the union-find array,
+    halving the path to the root on the way.
+    """
+    while parent[cell] != cell:
+        parent[cell] = parent[parent[cell]]
+        cell = parent[cell]
+    return cell
+
+
+def kruskal_passages(lattice):
+    """
+    Yields the passages of a maze made with randomized Kruskal's
+    algorithm: the walls between the cells are visited in random order
+    and carved if the cells are not connected yet. The sets of connected
+    cells are kept in a union-find over a flat array.
+    """
+    count = lattice.count
+    cols = lattice.cols
+    # Every wall as cell * 2 for the wall to the right of the cell
+    # and cell * 2 + 1 for the wall below it
+    walls = [cell * 2 for cell in range(count) if cell % cols < cols - 1]
+    walls.extend(cell * 2 + 1 for cell in range(count - cols))
+    random.shuffle(walls)
+    # Parent of every cell in the union-find and the size of every set
+    parent = list(range(count))
+    size = [1] * count
+    # A perfect maze has one passage less than it has cells
+    remaining = count - 1
+    for wall in walls:
+        if not remaining:
+            break
+        cell = wall // 2
+        other = cell + cols if wall % 2 else cell + 1
+        root = find_root(parent, cell)
+        other_root = find_root(parent, other)
+        if root == other_root:
+            # The cells are connected already, carving would make a loop
+            continue
+        # Joining the smaller set to the larger one
+        if size[root] < size[other_root]:
+            root, other_root = other_root, root
+        parent[other_root] = root
+        size[root] += size[other_root]
+        remaining -= 1
+        yield lattice.passage(cell, other)
+
+
+def prim_passages(lattice):
+    """
+    Yields the passages of a maze made with randomized Prim's algorithm:
+    the maze grows from a random cell, every time by a random cell
+    of the frontier connected to a random neighbor in the maze.
+    The frontier is a list, random cells are taken out of it by moving
+    the last cell into their place.
+    """
+    count = lattice.count
+    # Flags of the cells in the maze and in the frontier
+    in_maze = bytearray(count)
+    in_frontier = bytearray(count)
+    frontier = []
+    cell = random.randrange(count)
+    while True:
+        in_maze[cell] = 1
+        for neighbor in lattice.neighbors(cell):
+            if not in_maze[neighbor] and not in_frontier[neighbor]:
+                in_frontier[neighbor] = 1
+                frontier.append(neighbor)
+        if not frontier:
+            return
+        position = random.randrange(len(frontier))
+        cell = frontier[position]
+        frontier[position] = frontier[-1]
+        frontier.pop()
+        connected = [
+            neighbor for neighbor in lattice.neighbors(cell)
+            if in_maze[neighbor]
+        ]
+        yield lattice.passage(cell, random.choice(connected))
+
+
+def wilson_passages(lattice):
+    """
+    Yields the passages of a maze made with Wilson's algorithm, which
+    gives every possible maze with the same probability. From every cell
+    outside the maze a random walk runs until it hits the maze, and the
+    walk without its loops is carved. The loops are erased by keeping
+    only the last step taken from every cell.
+    """
+    count = lattice.count
+    in_maze = bytearray(count)
+    in_maze[random.randrange(count)] = 1
+    # Cell the walk moved to when it last left every cell
+    next_cell = [0] * count
+    for start in range(count):
+        cell = start
+        while not in_maze[cell]:
+            next_cell[cell] = random.choice(lattice.neighbors(cell))
+            cell = next_cell[cell]
+        cell = start
+        while not in_maze[cell]:
+            in_maze[cell] = 1
+            yield lattice.passage(cell, next_cell[cell])
+            cell = next_cell[cell]
+
+
+def eller_passages(lattice):
+    """
+    Yields the passages of a maze made with Eller's algorithm, one row
+    of cells at a time. Only the sets of the cells of the current row
+    are kept, so the memory used doesn't depend on the number of rows.
+    Neighboring cells of different sets are joined at random, then every
+    set goes down to the next row through at least one random cell.
+    The last row joins all sets which are left.
+    """
+    cols = lattice.cols
+    # Set of every cell of the current row and the cells of every set
+    sets = list(range(cols))
+    members = {col: [col] for col in range(cols)}
+    next_set = cols
+    for row in range(lattice.rows):
+        first = row * cols
+        last_row = row == lattice.rows - 1
+        for col in range(cols - 1):
+            joined, other = sets[col], sets[col + 1]
+            if joined == other or not (last_row or random.random() < 0.5):
+                continue
+            # Moving the cells of the smaller set to the larger one
+            if len(members[joined]) < len(members[other]):
+                joined, other = other, joined
+            for member in members[other]:
+                sets[member] = joined
+            members[joined].extend(members.pop(other))
+            yield lattice.passage(first + col, first + col + 1)
+        if last_row:
+            return
+        # Cells of the next row which go down from the current row
+        # keep its set, the other cells start new sets
+        next_sets = [None] * cols
+        for set_members in members.values():
+            down = [col for col in set_members if random.random() < 0.5]
+            if not down:
+                down = [random.choice(set_members)]
+            for col in down:
+                next_sets[col] = sets[col]
+                yield lattice.passage(first + col, first + col + cols)
+        for col in range(cols):
+            if next_sets[col] is None:
+                next_sets[col] = next_set
+                next_set += 1
+        sets = next_sets
+        members = {}
+        for col in range(cols):
+            members.setdefault(sets[col], []).append(col)
+
+
+def generate_kruskal_maze(grid, animated=True):
+    """
+    Generates a perfect maze using randomized Kruskal's algorithm.
+    """
+    lattice = CellLattice(grid)
+    carve_maze(grid, lattice, kruskal_passages(lattice), animated)
+
+
+def generate_prim_maze(grid, animated=True):
+    """
+    Generates a perfect maze using randomized Prim's algorithm.
+    """
+    lattice = CellLattice(grid)
+    carve_maze(grid, lattice, prim_passages(lattice), animated)
+
+
+def generate_wilson_maze(grid, animated=True):
+    """
+    Generates a perfect maze using Wilson's algorithm.
+    """
+    lattice = CellLattice(grid)
+    carve_maze(grid, lattice, wilson_passages(lattice), animated)
+
+
+def generate_eller_maze(grid, animated=True):
+    """
+    Generates a perfect maze using Eller's algorithm.
+    """
+    lattice = CellLattice(grid)
+    carve_maze(grid, lattice, eller_passages(lattice), animated)
+
+
+def generate_pattern(grid, generator=None):
+    """
+    Draws the border walls and the pattern of the generator on the grid,
+    or only the border walls without a generator. If the animations
+    are displayed, both are animated in the animation pipeline.
+    Otherwise they run in the compute-only mode and nothing is drawn,
+    the caller displays the finished grid once.
+    """
+    if animations_enabled():
+        run_animated(grid, reset_grid, grid)
+        if generator is not None:
+            run_animated(grid, generator, grid)
+        return
+    reset_grid(grid, animated=False)
+    if generator is not None:
+        generator(grid, animated=False)
+
+
+# Maze generators by name. Every generator takes the grid
+# with the border walls already drawn by reset_grid(),
+# and the flag to animate it.
+GENERATORS = {
+    "random_pattern": generate_random_pattern,
+    "vertical": generate_vertical_maze,
+    "horizontal": generate_horizontal_maze,
+    "spiral": generate_spiral_maze,
+    "recursive_division": (
+        lambda grid, animated=True: generate_maze_recursive_division(
+            grid, 2, grid.shape[0] - 2, 2, grid.shape[1] - 2, "vertical",
+            animated
+        )
+    ),
+    "kruskal": generate_kruskal_maze,
+    "prim": generate_prim_maze,
+    "wilson": generate_wilson_maze,
+    "eller": generate_eller_maze,
+}
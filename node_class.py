@@ -2,15 +2,15 @@
 Module for the Node class.
 """
 from constants import (
-    WIDTH,
-    HEIGHT,
-    START,
-    END,
-    WALL,
-    EMPTY,
-    PATH,
-    VISITED,
-    ACTIVE
+    INFINITY,
+    GLYPHS,
+    START_STATE,
+    END_STATE,
+    WALL_STATE,
+    EMPTY_STATE,
+    PATH_STATE,
+    VISITED_STATE,
+    ACTIVE_STATE
 )
 
 
@@ -19,17 +19,32 @@ class Node:
     Class that represents every cell on the grid.
     """
 
+    # Fixed set of attributes, so the nodes don't need a __dict__
+    __slots__ = (
+        "row",
+        "col",
+        "state",
+        "neighbors",
+        "distance",
+        "previous",
+        "next",
+        "manhattan_distance",
+        "total_cost",
+        "grid",
+    )
+
     def __init__(self, row, col):
         # Row and column position of the node
         self.row = row
         self.col = col
-        # Color (state) of the node. Node is empty by default.
-        self.color = EMPTY
+        # State code of the node. Node is empty by default.
+        # The state is turned into a color only when displaying the node.
+        self.state = EMPTY_STATE
         # Empty list to store neighbors of the node in the future.
         self.neighbors = []
         # Distance from the start node to the current node.
         # Infinity by default. Used in all pathfinding algorithms.
-        self.distance = float("inf")
+        self.distance = INFINITY
         # Variable to store the previous node in the path.
         # Used in all pathfinding algorithms.
         self.previous = None
@@ -38,14 +53,35 @@ class Node:
         self.next = None
         # Variable to store the manhattan distance to the end node.
         # Used in A* algorithm.
-        self.manhattan_distance = float("inf")
+        self.manhattan_distance = INFINITY
         # Variable to store the total cost of traveling through this node.
         # Used in A* algorithm.
-        self.total_cost = float("inf")
+        self.total_cost = INFINITY
+        # Grid the node belongs to. The grid is notified about
+        # every state change to keep its state array and the neighbors
+        # of the nodes up to date. Set by generate_grid().
+        self.grid = None
 
     def __str__(self):
         # Need this method to print the node.
-        return self.color
+        return GLYPHS[self.state]
+
+    @property
+    def color(self):
+        """
+        Returns the string used to display the node.
+        """
+        return GLYPHS[self.state]
+
+    def set_state(self, state):
+        """
+        Changes the state of the node to the given state code
+        and lets the grid know about the change.
+        """
+        previous_state = self.state
+        self.state = state
+        if self.grid is not None:
+            self.grid.state_changed(self, previous_state)
 
     def get_position(self):
         """
@@ -60,110 +96,118 @@ class Node:
         # reset the neighbors list
         self.neighbors = []
         row, col = self.get_position()
+        height, width = grid.shape
         # Node to the top of the current node
-        if row > 0 and not grid[row - 1][col].is_wall():
-            self.neighbors.append(grid[row - 1][col])
+        if row > 0 and not grid[row - 1, col].is_wall():
+            self.neighbors.append(grid[row - 1, col])
         # Node to the bottom of the current node
-        if row < HEIGHT - 1 and not grid[row + 1][col].is_wall():
-            self.neighbors.append(grid[row + 1][col])
+        if row < height - 1 and not grid[row + 1, col].is_wall():
+            self.neighbors.append(grid[row + 1, col])
         # Node to the left of the current node
-        if col > 0 and not grid[row][col - 1].is_wall():
-            self.neighbors.append(grid[row][col - 1])
+        if col > 0 and not grid[row, col - 1].is_wall():
+            self.neighbors.append(grid[row, col - 1])
         # Node to the right of the current node
-        if col < WIDTH - 1 and not grid[row][col + 1].is_wall():
-            self.neighbors.append(grid[row][col + 1])
+        if col < width - 1 and not grid[row, col + 1].is_wall():
+            self.neighbors.append(grid[row, col + 1])
 
     def is_end(self):
         """
         Returns True if the node is the end node.
         """
-        return self.color == END
+        return self.state == END_STATE
 
     def is_start(self):
         """
         Returns True if the node is the start node.
         """
-        return self.color == START
+        return self.state == START_STATE
 
     def is_wall(self):
         """
         Returns True if the node is a wall.
         """
-        return self.color == WALL
+        return self.state == WALL_STATE
 
     def is_empty(self):
         """
         Returns True if the node is empty.
         """
-        return self.color == EMPTY
+        return self.state == EMPTY_STATE
 
     def is_visited(self):
         """
         Returns True if the node has been visited.
         """
-        return self.color == VISITED
+        return self.state == VISITED_STATE
 
     def is_path(self):
         """
         Returns True if the node is a path.
         """
-        return self.color == PATH
+        return self.state == PATH_STATE
 
     def is_active(self):
         """
         Returns True if the node is the active node.
         """
-        return self.color == ACTIVE
+        return self.state == ACTIVE_STATE
 
     def make_start(self):
         """
         Makes the node the start node.
         """
-        self.color = START
+        self.set_state(START_STATE)
 
     def make_end(self):
         """
         Makes the node the end node.
         """
-        self.color = END
+        self.set_state(END_STATE)
 
     def make_wall(self):
         """
         Makes the node a wall.
         """
-        self.color = WALL
+        self.set_state(WALL_STATE)
 
     def make_empty(self):
         """
         Makes the node empty.
         """
-        self.color = EMPTY
+        self.set_state(EMPTY_STATE)
 
     def make_visited(self):
         """
         Makes the node visited.
         """
-        self.color = VISITED
+        self.set_state(VISITED_STATE)
 
     def make_active(self):
         """
         Makes the node active.
         """
-        self.color = ACTIVE
+        self.set_state(ACTIVE_STATE)
 
     def make_path(self):
         """
         Makes the node a path.
         """
-        self.color = PATH
+        self.set_state(PATH_STATE)
 
     def reset(self):
         """
         Resets the node to its initial state.
         """
-        self.color = EMPTY
-        self.distance = float("inf")
-        self.manhattan_distance = float("inf")
-        self.total_cost = float("inf")
+        self.set_state(EMPTY_STATE)
+        self.reset_search()
+
+    def reset_search(self):
+        """
+        Resets the values used by the pathfinding algorithms
+        without changing the state of the node.
+        """
+        self.distance = INFINITY
+        self.manhattan_distance = INFINITY
+        self.total_cost = INFINITY
         self.previous = None
         self.next = None
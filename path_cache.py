@@ -0,0 +1,181 @@
+"""
+Module for the cache of search results.
+
+Results are stored in compact numpy arrays and keyed by a hash of the
+wall layout of the grid, the positions of the start and end nodes and
+the name of the algorithm. The least recently used results are evicted
+when the total size of the cache goes over its limit.
+"""
+from collections import OrderedDict
+from hashlib import blake2b
+import numpy as np
+from constants import WALL_STATE
+
+# Default limit of the total size of the cached arrays in bytes
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Estimated size of one entry without its arrays in bytes
+ENTRY_OVERHEAD = 256
+
+
+def wall_layout_hash(states):
+    """
+    Returns a short hash of the walls on the 2D states array.
+    Walls are packed into bits first, so hashing is cheap
+    even for very large grids.
+    """
+    digest = blake2b(digest_size=16)
+    digest.update(np.array(states.shape, dtype=np.int64).tobytes())
+    digest.update(np.packbits(states == WALL_STATE).tobytes())
+    return digest.digest()
+
+
+class CachedResult:
+    """
+    Class that stores a search result in compact numpy arrays.
+    """
+
+    def __init__(self, result, width):
+        self.algorithm = result.algorithm
+        self.width = width
+        self.expanded = result.expanded
+        self.peak_frontier = result.peak_frontier
+        # Flat indices of the path cells
+        self.path = np.array(
+            [row * width + col for row, col in result.path],
+            dtype=np.int32
+            )
+        # Flat indices of the cells and their new states for every event
+        self.event_cells = None
+        self.event_states = None
+        if result.events is not None:
+            self.event_cells = np.array(
+                [row * width + col for row, col, _ in result.events],
+                dtype=np.int32
+                )
+            self.event_states = np.array(
+                [state for _, _, state in result.events],
+                dtype=np.uint8
+                )
+
+    @property
+    def has_events(self):
+        """
+        Returns True if the events of the search were recorded.
+        """
+        return self.event_cells is not None
+
+    @property
+    def nbytes(self):
+        """
+        Returns the estimated size of the entry in bytes.
+        """
+        size = ENTRY_OVERHEAD + self.path.nbytes
+        if self.has_events:
+            size += self.event_cells.nbytes + self.event_states.nbytes
+        return size
+
+    def path_positions(self):
+        """
+        Returns the path as a list of (row, col) positions.
+        """
+        rows, cols = np.divmod(self.path, self.width)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def events(self):
+        """
+        Returns the events as a list of (row, col, state) tuples,
+        or None if they were not recorded.
+        """
+        if not self.has_events:
+            return None
+        rows, cols = np.divmod(self.event_cells, self.width)
+        return list(zip(
+            rows.tolist(),
+            cols.tolist(),
+            self.event_states.tolist()
+            ))
+
+
+class PathCache:
+    """
+    Least recently used cache of search results with a size limit.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # Entries in the order of use, the least recently used first
+        self.entries = OrderedDict()
+        # Total size of all entries in bytes
+        self.size = 0
+        # Counters for the statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def make_key(states, start_position, end_position, algorithm):
+        """
+        Returns the key of a search on the grid with the given states.
+        """
+        return (
+            wall_layout_hash(states),
+            tuple(start_position),
+            tuple(end_position),
+            algorithm
+        )
+
+    def get(self, key, need_events=False):
+        """
+        Returns the CachedResult stored under the key, or None.
+        If the events are needed, entries without them count as misses.
+        """
+        entry = self.entries.get(key)
+        if entry is None or (need_events and not entry.has_events):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores the CachedResult under the key and evicts
+        the least recently used entries if the cache is too large.
+        """
+        if key in self.entries:
+            self.size -= self.entries.pop(key).nbytes
+        if entry.nbytes > self.max_bytes:
+            # The entry would evict everything else, so it is not stored
+            return
+        self.entries[key] = entry
+        self.size += entry.nbytes
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dictionary with the statistics of the cache.
+        """
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
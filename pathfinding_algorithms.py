@@ -1,382 +1,794 @@
 """
 Module for pathfinding algorithms.
+
+Every algorithm has a headless search function (search_*) which runs
+at full speed and returns a SearchResult, and a visual function which
+animates the events recorded by the headless search on the grid.
+The visual functions keep their results in a cache, so running the same
+algorithm on the same maze and endpoints again only replays the events.
+A search between nodes in different components of the grid returns
+at once, without expanding any node.
 """
-from constants import terminal
+from heapq import heappush, heappop
+from itertools import count
+from constants import (
+    terminal,
+    DIJKSTRA_BACKEND,
+    ACTIVE_STATE,
+    VISITED_STATE,
+    PATH_STATE
+)
 from grid_functions import (
     display_grid,
+    display_step,
+    grid_states,
     reset_grid_partially,
     update_all_neighbors,
 )
+from components import connected
+from path_cache import PathCache, CachedResult
+from pipeline import run_animated
+from wavefront import wavefront
+
+
+class SearchResult:
+    """
+    Class that stores the outcome of a headless search.
+    """
+
+    def __init__(
+        self, algorithm, path, expanded, events=None, peak_frontier=0
+    ):
+        # Name of the algorithm that produced the result
+        self.algorithm = algorithm
+        # List of (row, col) positions from the start node
+        # to the end node. Empty if the path was not found.
+        self.path = path
+        # Number of nodes taken from the frontier and expanded
+        self.expanded = expanded
+        # Largest number of nodes waiting in the frontier at once
+        self.peak_frontier = peak_frontier
+        # List of (row, col, state) tuples in the order the cells
+        # changed their state. None if the events were not recorded.
+        self.events = events
+
+    @property
+    def path_found(self):
+        """
+        Returns True if the path was found.
+        """
+        return bool(self.path)
 
+    @property
+    def path_length(self):
+        """
+        Returns the number of steps from the start node to the end node.
+        """
+        return max(len(self.path) - 1, 0)
 
-def draw_path(grid, end_node):
+
+def reset_search_state(nodes):
     """
-    Draws path from the end node to the start node on the grid.
+    Resets the values used by the search on the given nodes,
+    so the next search starts from a clean grid.
     """
+    for node in nodes:
+        node.reset_search()
+
+
+def path_positions(end_node):
+    """
+    Returns the positions of the path from the start node
+    to the end node following the previous nodes.
+    """
+    positions = []
     current_node = end_node
+    while current_node:
+        positions.append(current_node.get_position())
+        current_node = current_node.previous
+    positions.reverse()
+    return positions
+
+
+def record_path(events, end_node):
+    """
+    Records the path from the end node to the start node
+    as PATH events, skipping the end and the start node.
+    """
+    current_node = end_node.previous
     # Keep calling the previous node until we reach the start node
     while current_node.previous:
-        # Skipping the end node
-        if current_node == end_node:
-            end_node.make_end()
-            current_node = current_node.previous
-            continue
-        # Drawing the path from current node to the previous node
-        current_node.make_path()
-        # Changing the current node to the previous node
+        events.append((current_node.row, current_node.col, PATH_STATE))
         current_node = current_node.previous
-        # Displaying the grid every iteration to animate the process
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.blue +
-            "Path found!" +
-            terminal.normal
-            )
 
 
-def dijkstra(grid, start_node, end_node):
+def search_dijkstra(
+    grid, start_node, end_node, record_events=False, backend=DIJKSTRA_BACKEND
+):
     """
     Searches for the shortest path from the start node to the end node
-    using Dijkstra's algorithm.
+    using Dijkstra's algorithm without displaying anything.
+    The "wavefront" backend runs the vectorized numpy engine instead.
+    Returns a SearchResult.
     """
-    # Flag to check if the path was found
-    path_found = False
-    # Resetting the grid from previous searches
-    reset_grid_partially(grid)
+    if backend == "wavefront":
+        return search_dijkstra_wavefront(
+            grid,
+            start_node,
+            end_node,
+            record_events
+            )
     # Updating neighbors of all nodes
     update_all_neighbors(grid)
+    # List to store events, only if we were asked to record them
+    events = [] if record_events else None
     # Checking if the start node and the end node are neighbors
     if start_node in end_node.neighbors:
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.blue +
-            "The start and the end node are neighbors!" +
-            terminal.normal
+        return SearchResult(
+            "dijkstra",
+            [start_node.get_position(), end_node.get_position()],
+            0,
+            events
             )
-        return
-    # Setting distance of the start node to 0
-    start_node.distance = 0
-    # Resetting the distance of the end node to infinity
-    end_node.distance = float("inf")
-    # Setting the previous node of the start node to None
-    start_node.previous = None
-    # Creating a list of nodes we need to visit
-    # and placing the start node in it
-    nodes_to_visit = [start_node]
-
-    # While we still have nodes to visit
-    while nodes_to_visit:
-        # Choosing the first node in the list as the current node
-        # and removing it from the list
-        current_node = nodes_to_visit.pop(0)
-
-        for neighbor in current_node.neighbors:
-            # Creating a variable for the distance from the start node
-            # and setting it to the distance of the current node + 1
-            distance_from_start = current_node.distance + 1
-            # If the distance is less than the distance of the neighbor
-            if distance_from_start < neighbor.distance:
-                # Setting current node as the previous node of the neighbor
-                neighbor.previous = current_node
-                # Setting the distance of the neighbor
-                # to the distance from the start node
-                neighbor.distance = distance_from_start
-                if neighbor not in nodes_to_visit:
-                    # Adding the neighbor to the list of nodes to visit
-                    nodes_to_visit.append(neighbor)
-                    if neighbor == end_node:
-                        # If the neighbor is the end node,
-                        # we found the path and we call the function to draw it
-                        draw_path(grid, neighbor)
-                        path_found = True
-                        return  # Empty return statement to exit the function
-                    # If the neighbor is not the end node,
-                    # we color it as ACTIVE
-                    neighbor.make_active()
-
-        if current_node != start_node:
-            # After visiting the node, we color it as VISITED
-            current_node.make_visited()
-            # Displaying the grid every iteration to animate the process
-            display_grid(grid)
-    if not path_found:
+    # Checking if the end node can be reached from the start node,
+    # the labels of the components tell it without searching
+    if not connected(grid, start_node, end_node):
+        return SearchResult("dijkstra", [], 0, events)
+    # List of nodes with changed search values, reset after the search
+    touched_nodes = [start_node]
+    # Number of expanded nodes and the largest size of the frontier
+    expanded = 0
+    peak_frontier = 0
+    try:
+        # Setting distance of the start node to 0
+        start_node.distance = 0
+        # Creating a priority queue (binary heap) of nodes we need to visit.
+        # Every entry is (distance, order, node), the order counter keeps
+        # nodes with equal distance in the order they were discovered,
+        # so the heap pops nodes exactly like a first-in first-out list.
+        order = count()
+        nodes_to_visit = [(0, next(order), start_node)]
+        # Set of nodes currently in the heap for O(1) membership checks
+        nodes_in_queue = {start_node}
+
+        # While we still have nodes to visit
+        while nodes_to_visit:
+            if len(nodes_in_queue) > peak_frontier:
+                peak_frontier = len(nodes_in_queue)
+            # Choosing the node with minimal distance as the current node
+            # and removing it from the heap
+            current_node = heappop(nodes_to_visit)[2]
+            nodes_in_queue.discard(current_node)
+            expanded += 1
+
+            for neighbor in current_node.neighbors:
+                # Creating a variable for the distance from the start node
+                # and setting it to the distance of the current node + 1
+                distance_from_start = current_node.distance + 1
+                # If the distance is less than the distance of the neighbor
+                if distance_from_start < neighbor.distance:
+                    # Setting current node as the previous node
+                    # of the neighbor
+                    neighbor.previous = current_node
+                    # Setting the distance of the neighbor
+                    # to the distance from the start node
+                    neighbor.distance = distance_from_start
+                    touched_nodes.append(neighbor)
+                    if neighbor not in nodes_in_queue:
+                        # Adding the neighbor to the heap of nodes to visit
+                        heappush(
+                            nodes_to_visit,
+                            (distance_from_start, next(order), neighbor)
+                            )
+                        nodes_in_queue.add(neighbor)
+                        if neighbor == end_node:
+                            # If the neighbor is the end node,
+                            # we found the path
+                            if events is not None:
+                                record_path(events, neighbor)
+                            return SearchResult(
+                                "dijkstra",
+                                path_positions(neighbor),
+                                expanded,
+                                events,
+                                peak_frontier
+                                )
+                        # If the neighbor is not the end node,
+                        # we color it as ACTIVE
+                        if events is not None:
+                            events.append(
+                                (neighbor.row, neighbor.col, ACTIVE_STATE)
+                                )
+
+            if current_node != start_node and events is not None:
+                # After visiting the node, we color it as VISITED
+                events.append(
+                    (current_node.row, current_node.col, VISITED_STATE)
+                    )
         # If after the loop the path was not found,
-        # we let the user know about it
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.red +
-            "No path found. The end or the start node is blocked." +
-            terminal.normal
+        # we return an empty path
+        return SearchResult(
+            "dijkstra",
+            [],
+            expanded,
+            events,
+            peak_frontier
             )
+    finally:
+        reset_search_state(touched_nodes)
 
 
-def manhattan_distance(node1, node2):
+def search_dijkstra_wavefront(
+    grid, start_node, end_node, record_events=False
+):
     """
-    Calculates the manhattan distance between two nodes.
+    Searches for the shortest path from the start node to the end node
+    with the vectorized wavefront engine. All moves cost 1, so it finds
+    the same path and records the same events as Dijkstra's algorithm.
+    Returns a SearchResult.
     """
-    return abs(node1.row - node2.row) + abs(node1.col - node2.col)
+    # List to store events, only if we were asked to record them
+    events = [] if record_events else None
+    # Checking if the start node and the end node are neighbors
+    if manhattan_distance(start_node, end_node) == 1:
+        return SearchResult(
+            "dijkstra",
+            [start_node.get_position(), end_node.get_position()],
+            0,
+            events
+            )
+    # Checking if the end node can be reached from the start node,
+    # the labels of the components tell it without searching
+    if not connected(grid, start_node, end_node):
+        return SearchResult("dijkstra", [], 0, events)
+    field = wavefront(
+        grid_states(grid),
+        [start_node.get_position()],
+        end_node.get_position(),
+        record_frames=record_events
+        )
+    path = field.path_to(end_node.row, end_node.col)
+    if events is not None:
+        width = grid.shape[1]
+        start_index = start_node.row * width + start_node.col
+        for expanded, discovered, counts in field.frames:
+            discovered = discovered.tolist()
+            position = 0
+            for index, discovered_count in zip(
+                expanded.tolist(), counts.tolist()
+            ):
+                # Cells discovered by the expanded cell become ACTIVE
+                # and after that the expanded cell becomes VISITED
+                for cell in discovered[position:position + discovered_count]:
+                    events.append((*divmod(cell, width), ACTIVE_STATE))
+                position += discovered_count
+                if index != start_index:
+                    events.append((*divmod(index, width), VISITED_STATE))
+            # Cells discovered right before the end node
+            for cell in discovered[position:]:
+                events.append((*divmod(cell, width), ACTIVE_STATE))
+        # Path from the end node to the start node,
+        # skipping the end and the start node
+        for row, col in reversed(path[1:-1]):
+            events.append((row, col, PATH_STATE))
+    return SearchResult(
+        "dijkstra",
+        path,
+        field.expanded,
+        events,
+        field.peak_frontier
+        )
 
 
-def closest_node(nodes):
+def manhattan_distance(node1, node2):
     """
-    Returns the node in the list of nodes with minimal total cost.
+    Calculates the manhattan distance between two nodes.
     """
-    # Using lambda function to easily access the total cost of the node.
-    return min(nodes, key=lambda node: node.total_cost)
+    return abs(node1.row - node2.row) + abs(node1.col - node2.col)
 
 
-def a_star(grid, start_node, end_node):
+def search_a_star(grid, start_node, end_node, record_events=False):
     """
     Searches for the shortest path from the start node to the end node
-    using A* algorithm.
+    using A* algorithm without displaying anything.
+    Returns a SearchResult.
     """
-    # Flag to check if the path was found
-    path_found = False
-    # Resetting the grid from previous searches
-    reset_grid_partially(grid)
     # Updating neighbors of all nodes
     update_all_neighbors(grid)
+    # List to store events, only if we were asked to record them
+    events = [] if record_events else None
     # Checking if the start node and the end node are neighbors
     if start_node in end_node.neighbors:
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.blue +
-            "The start and the end node are neighbors!" +
-            terminal.normal
+        return SearchResult(
+            "a_star",
+            [start_node.get_position(), end_node.get_position()],
+            0,
+            events
             )
-        return
-    # Setting distance of the start node to 0
-    start_node.distance = 0
-    # Calculating the manhattan distance from the start node to the end node
-    start_node.manhattan_distance = manhattan_distance(start_node, end_node)
-    # Setting the total cost of the start node
-    # to sum of its distance and manhattan distance
-    start_node.total_cost = start_node.distance + start_node.manhattan_distance
-    # Resetting the distance of the end node to infinity
-    end_node.distance = float("inf")
-    # Setting the previous node of the start node to None
-    start_node.previous = None
-    # Creating a list of nodes we need to visit
-    nodes_to_visit = [start_node]
-    # While we still have nodes to visit
-    while nodes_to_visit:
-        # Choosing the node with minimal total cost as the current node
-        current_node = closest_node(nodes_to_visit)
-        # and removing it from the list
-        nodes_to_visit.remove(current_node)
-
-        for neighbor in current_node.neighbors:
-            # Creating variables for the distance from the start node,
-            # manhattan distance and total cost
-            distance_from_start = current_node.distance + 1
-            manhattan_distance_from_end = manhattan_distance(
-                neighbor,
-                end_node
-                )
-            total_cost = distance_from_start + manhattan_distance_from_end
-            # If the distance is less than the distance of the neighbor
-            if distance_from_start < neighbor.distance:
-                # Setting current node as the previous node of the neighbor
-                neighbor.previous = current_node
-                # Setting the distance, manhattan distance
-                # and total cost of the neighbor
-                neighbor.distance = distance_from_start
-                neighbor.manhattan_distance = manhattan_distance_from_end
-                neighbor.total_cost = total_cost
-                if neighbor not in nodes_to_visit:
-                    # Adding the neighbor to the list of nodes to visit
-                    nodes_to_visit.append(neighbor)
-                    if neighbor == end_node:
-                        # If the neighbor is the end node,
-                        # we found the path and we call the function to draw it
-                        draw_path(grid, neighbor)
-                        path_found = True
-                        return
-                    # If the neighbor is not the end node,
-                    # we color it as ACTIVE
-                    neighbor.make_active()
-
-        if current_node != start_node:
-            # After visiting the node, we color it as VISITED
-            current_node.make_visited()
-            # Displaying the grid every iteration to animate the process
-            display_grid(grid)
-    if not path_found:
-        # If after the loop the path was not found,
-        # we let the user know about it
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.red +
-            "No path found. The end or the start node is blocked." +
-            terminal.normal
+    # Checking if the end node can be reached from the start node,
+    # the labels of the components tell it without searching
+    if not connected(grid, start_node, end_node):
+        return SearchResult("a_star", [], 0, events)
+    # List of nodes with changed search values, reset after the search
+    touched_nodes = [start_node]
+    # Number of expanded nodes and the largest size of the frontier
+    expanded = 0
+    peak_frontier = 0
+    try:
+        # Setting distance of the start node to 0
+        start_node.distance = 0
+        # Calculating the manhattan distance
+        # from the start node to the end node
+        start_node.manhattan_distance = manhattan_distance(
+            start_node,
+            end_node
+            )
+        # Setting the total cost of the start node
+        # to sum of its distance and manhattan distance
+        start_node.total_cost = (
+            start_node.distance + start_node.manhattan_distance
             )
+        # Creating a priority queue (binary heap) of nodes we need to visit.
+        # Every entry is (total cost, order, node). A node keeps its order
+        # while it stays in the open set, so ties are broken the same way
+        # as a linear search for the minimum over a list.
+        order = count()
+        nodes_to_visit = [(start_node.total_cost, next(order), start_node)]
+        # Dictionary of nodes currently in the open set and their order,
+        # used for O(1) membership checks and to skip outdated heap entries
+        # (lazy deletion) after the total cost of a node has decreased.
+        nodes_in_queue = {start_node: nodes_to_visit[0][1]}
+        # While we still have nodes to visit
+        while nodes_to_visit:
+            if len(nodes_in_queue) > peak_frontier:
+                peak_frontier = len(nodes_in_queue)
+            # Choosing the node with minimal total cost as the current node
+            # and removing it from the heap
+            total_cost, node_order, current_node = heappop(nodes_to_visit)
+            if (
+                nodes_in_queue.get(current_node) != node_order or
+                total_cost != current_node.total_cost
+            ):
+                # Outdated entry, the node was updated or visited already
+                continue
+            del nodes_in_queue[current_node]
+            expanded += 1
+
+            for neighbor in current_node.neighbors:
+                # Creating variables for the distance from the start node,
+                # manhattan distance and total cost
+                distance_from_start = current_node.distance + 1
+                manhattan_distance_from_end = manhattan_distance(
+                    neighbor,
+                    end_node
+                    )
+                total_cost = distance_from_start + manhattan_distance_from_end
+                # If the distance is less than the distance of the neighbor
+                if distance_from_start < neighbor.distance:
+                    # Setting current node as the previous node
+                    # of the neighbor
+                    neighbor.previous = current_node
+                    # Setting the distance, manhattan distance
+                    # and total cost of the neighbor
+                    neighbor.distance = distance_from_start
+                    neighbor.manhattan_distance = manhattan_distance_from_end
+                    neighbor.total_cost = total_cost
+                    touched_nodes.append(neighbor)
+                    if neighbor in nodes_in_queue:
+                        # The neighbor is already in the open set,
+                        # so we push a new entry with the decreased cost
+                        # keeping its original order
+                        heappush(
+                            nodes_to_visit,
+                            (total_cost, nodes_in_queue[neighbor], neighbor)
+                            )
+                    else:
+                        # Adding the neighbor to the heap of nodes to visit
+                        nodes_in_queue[neighbor] = next(order)
+                        heappush(
+                            nodes_to_visit,
+                            (total_cost, nodes_in_queue[neighbor], neighbor)
+                            )
+                        if neighbor == end_node:
+                            # If the neighbor is the end node,
+                            # we found the path
+                            if events is not None:
+                                record_path(events, neighbor)
+                            return SearchResult(
+                                "a_star",
+                                path_positions(neighbor),
+                                expanded,
+                                events,
+                                peak_frontier
+                                )
+                        # If the neighbor is not the end node,
+                        # we color it as ACTIVE
+                        if events is not None:
+                            events.append(
+                                (neighbor.row, neighbor.col, ACTIVE_STATE)
+                                )
+
+            if current_node != start_node and events is not None:
+                # After visiting the node, we color it as VISITED
+                events.append(
+                    (current_node.row, current_node.col, VISITED_STATE)
+                    )
+        # If after the loop the path was not found,
+        # we return an empty path
+        return SearchResult("a_star", [], expanded, events, peak_frontier)
+    finally:
+        reset_search_state(touched_nodes)
+
+
+def bidirectional_path_positions(intersection_node):
+    """
+    Returns the positions of the path from the start node
+    to the end node going through the intersection node.
+    """
+    # Positions from the start node to the intersection node
+    positions = path_positions(intersection_node)
+    # Positions from the intersection node to the end node
+    current_node = intersection_node.next
+    while current_node:
+        positions.append(current_node.get_position())
+        current_node = current_node.next
+    return positions
 
 
-def draw_path_bidirectional(grid, intersection_node):
+def record_path_bidirectional(events, intersection_node):
     """
-    Draws the path from the intersection node
-    to the start and end nodes simultaneously.
+    Records the path from the intersection node
+    to the start and end nodes simultaneously as PATH events.
     """
     # First we make the intersection node the path.
-    intersection_node.make_path()
+    events.append((intersection_node.row, intersection_node.col, PATH_STATE))
     # Accessing the previous node of the intersection node.
     forward = intersection_node.previous
     # Accessing the next node of the intersection node.
     backward = intersection_node.next
-    # Flag to continue drawing the path
-    drawing = True
-    while drawing:
+    # We stop when the forward node has no previous node
+    # and the backward node has no next node
+    while forward.previous or backward.next:
         # Check if the forward node has a previous node
         if forward.previous:
             # If so, we make it the path
-            forward.make_path()
+            events.append((forward.row, forward.col, PATH_STATE))
             # And we access the previous node of the forward node
             forward = forward.previous
         # Check if the backward node has a next node
         if backward.next:
             # If so, we make it the path
-            backward.make_path()
+            events.append((backward.row, backward.col, PATH_STATE))
             # And we access the next node of the backward node
             backward = backward.next
-        # We stop if the forward node has no previous node
-        # and the backward node has no next node
-        if not forward.previous and not backward.next:
-            drawing = False
-        # Displaying the grid every iteration to animate the process
-        display_grid(grid)
-        print(
-            terminal.underline +
-            terminal.blue +
-            "Path found!" +
-            terminal.normal
-            )
 
 
-def bidirectional_breadth_first_search(grid, start_node, end_node):
+def search_bidirectional_bfs(grid, start_node, end_node, record_events=False):
     """
     Searches for the shortest path from the start node to the end node
-    using bidirectional breadth-first search algorithm.
+    using bidirectional breadth-first search algorithm
+    without displaying anything.
+    Returns a SearchResult.
     """
-    # Flag to check if the path was found
-    path_found = False
-    # Resetting the grid from previous searches
-    reset_grid_partially(grid)
     # Updating neighbors of all nodes
     update_all_neighbors(grid)
+    # List to store events, only if we were asked to record them
+    events = [] if record_events else None
     # Checking if the start node and the end node are neighbors
     if start_node in end_node.neighbors:
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
+        return SearchResult(
+            "bidirectional_bfs",
+            [start_node.get_position(), end_node.get_position()],
+            0,
+            events
+            )
+    # Checking if the end node can be reached from the start node,
+    # the labels of the components tell it without searching
+    if not connected(grid, start_node, end_node):
+        return SearchResult("bidirectional_bfs", [], 0, events)
+    # List of nodes with changed search values, reset after the search
+    touched_nodes = [start_node, end_node]
+    # Number of expanded nodes and the largest size of the frontier
+    expanded = 0
+    peak_frontier = 0
+    # Variable for the node where both searches meet
+    intersection_node = None
+    try:
+        # Setting distance of the start node to 0
+        start_node.distance = 0
+        # Setting distance of the end node to 0
+        end_node.distance = 0
+        # Creating two lists of nodes we need to visit from both directions
+        # and sets of the same nodes for O(1) membership checks.
+        # Both searches visit nodes in first-in first-out order,
+        # read positions move forward instead of popping from the front.
+        nodes_to_visit = [start_node]
+        nodes_to_visit_reverse = [end_node]
+        nodes_in_queue = {start_node}
+        nodes_in_queue_reverse = {end_node}
+        position = 0
+        while (
+            position < len(nodes_to_visit) and
+            position < len(nodes_to_visit_reverse)
+        ):
+            # Creating variables for current nodes from both lists
+            frontier_size = (
+                len(nodes_to_visit) + len(nodes_to_visit_reverse) -
+                2 * position
+                )
+            if frontier_size > peak_frontier:
+                peak_frontier = frontier_size
+            current_node_forward = nodes_to_visit[position]
+            current_node_reverse = nodes_to_visit_reverse[position]
+            position += 1
+            expanded += 2
+
+            for neighbor in current_node_forward.neighbors:
+                # Creating variable for the distance from the start node
+                distance_from_start = current_node_forward.distance + 1
+                if neighbor.next:
+                    # If the neighbor has a next node, it means
+                    # that it has been visited from the backward direction
+                    # Setting neighbor's previous node
+                    # to the current node forward
+                    neighbor.previous = current_node_forward
+                    # Setting the next node of the current node forward
+                    # as the neighbor.
+                    current_node_forward.next = neighbor
+                    intersection_node = neighbor
+                    break
+                # If the distance from the start node is less
+                # than the distance of the neighbor
+                if distance_from_start < neighbor.distance:
+                    # Setting the previous node of the neighbor
+                    neighbor.previous = current_node_forward
+                    # Setting the distance of the neighbor
+                    neighbor.distance = distance_from_start
+                    touched_nodes.append(neighbor)
+                    # If the neighbor is not in the list of nodes to visit
+                    if neighbor not in nodes_in_queue:
+                        # Adding the neighbor to the list of nodes to visit
+                        nodes_to_visit.append(neighbor)
+                        nodes_in_queue.add(neighbor)
+                        # Color the neighbor as ACTIVE
+                        if events is not None:
+                            events.append(
+                                (neighbor.row, neighbor.col, ACTIVE_STATE)
+                                )
+            if intersection_node:
+                break
+
+            for neighbor in current_node_reverse.neighbors:
+                # Creating variable for the distance from the end node
+                distance_from_end = current_node_reverse.distance + 1
+                if neighbor.previous:
+                    # If the neighbor has a previous node, it means
+                    # that it has been visited from the forward direction.
+                    # Setting neighbor's next node to the current node reverse
+                    neighbor.next = current_node_reverse
+                    # Setting the previous node of the current node reverse
+                    # as the neighbor.
+                    current_node_reverse.previous = neighbor
+                    intersection_node = neighbor
+                    break
+                # If the distance from the end node is less
+                # than the distance of the neighbor
+                if distance_from_end < neighbor.distance:
+                    # Setting the next node of the neighbor
+                    neighbor.next = current_node_reverse
+                    # Setting the distance of the neighbor
+                    neighbor.distance = distance_from_end
+                    touched_nodes.append(neighbor)
+                    # If the neighbor is not in the list of nodes to visit
+                    if neighbor not in nodes_in_queue_reverse:
+                        # Adding the neighbor to the list of nodes to visit
+                        nodes_to_visit_reverse.append(neighbor)
+                        nodes_in_queue_reverse.add(neighbor)
+                        # Color the neighbor as ACTIVE
+                        if events is not None:
+                            events.append(
+                                (neighbor.row, neighbor.col, ACTIVE_STATE)
+                                )
+            if intersection_node:
+                break
+
+            # Color all nodes we visited as VISITED,
+            # except the start and end nodes
+            if events is not None:
+                if current_node_forward != start_node:
+                    events.append((
+                        current_node_forward.row,
+                        current_node_forward.col,
+                        VISITED_STATE
+                        ))
+                if current_node_reverse != end_node:
+                    events.append((
+                        current_node_reverse.row,
+                        current_node_reverse.col,
+                        VISITED_STATE
+                        ))
+        if intersection_node:
+            # Both searches met, so we found the path
+            if events is not None:
+                record_path_bidirectional(events, intersection_node)
+            return SearchResult(
+                "bidirectional_bfs",
+                bidirectional_path_positions(intersection_node),
+                expanded,
+                events,
+                peak_frontier
+                )
+        # If after the loop the path was not found,
+        # we return an empty path
+        return SearchResult(
+            "bidirectional_bfs",
+            [],
+            expanded,
+            events,
+            peak_frontier
+            )
+    finally:
+        reset_search_state(touched_nodes)
+
+
+# Headless search functions by the name of the algorithm
+SEARCH_FUNCTIONS = {
+    "dijkstra": search_dijkstra,
+    "dijkstra_wavefront": search_dijkstra_wavefront,
+    "a_star": search_a_star,
+    "bidirectional_bfs": search_bidirectional_bfs,
+}
+
+# Cache of search results shared by the visual algorithms
+search_cache = PathCache()
+
+
+def cached_search(grid, start_node, end_node, algorithm, record_events=False):
+    """
+    Returns the result of the headless search of the algorithm,
+    taking it from the cache if the same search was done before
+    on a grid with the same walls.
+    """
+    key = search_cache.make_key(
+        grid_states(grid),
+        start_node.get_position(),
+        end_node.get_position(),
+        algorithm
+        )
+    entry = search_cache.get(key, need_events=record_events)
+    if entry is None:
+        result = SEARCH_FUNCTIONS[algorithm](
+            grid,
+            start_node,
+            end_node,
+            record_events
+            )
+        search_cache.put(key, CachedResult(result, grid.shape[1]))
+        return result
+    return SearchResult(
+        entry.algorithm,
+        entry.path_positions(),
+        entry.expanded,
+        entry.events(),
+        entry.peak_frontier
+        )
+
+
+def replay_search(grid, result):
+    """
+    Applies the events recorded by a headless search to the grid
+    with a display step after every visited and path node.
+    """
+    if result.path_length == 1:
+        # The start and the end node are neighbors,
+        # nothing to animate
+        return
+    for row, col, state in result.events:
+        grid[row][col].set_state(state)
+        if state in (VISITED_STATE, PATH_STATE):
+            # Displaying the grid after every visited and path node
+            # to animate the search and drawing the path
+            display_step(grid)
+
+
+def search_and_replay(grid, start_node, end_node, algorithm):
+    """
+    Runs the headless search of the algorithm, or takes its result
+    from the cache, and replays its events on the grid.
+    Returns the SearchResult.
+    """
+    result = cached_search(
+        grid,
+        start_node,
+        end_node,
+        algorithm,
+        record_events=True
+        )
+    replay_search(grid, result)
+    return result
+
+
+def display_search_outcome(grid, result):
+    """
+    Displays the grid and lets the user know about the outcome
+    of the search.
+    """
+    # Drawing the last steps of the animation
+    display_grid(grid)
+    if result.path_length == 1:
         print(
             terminal.underline +
             terminal.blue +
             "The start and the end node are neighbors!" +
             terminal.normal
             )
-        return
-    # Setting distance of the start node to 0
-    start_node.distance = 0
-    # Setting distance of the end node to 0
-    end_node.distance = 0
-    # Resetting the previous and next nodes
-    # of the start node and the end node
-    start_node.previous = None
-    start_node.next = None
-    end_node.previous = None
-    end_node.next = None
-    # Creating two lists of nodes we need to visit from both directions
-    nodes_to_visit = [start_node]
-    nodes_to_visit_reverse = [end_node]
-    while nodes_to_visit and nodes_to_visit_reverse:
-        # Creating variables for current nodes from both lists
-        current_node_forward = nodes_to_visit.pop(0)
-        current_node_reverse = nodes_to_visit_reverse.pop(0)
-
-        for neighbor in current_node_forward.neighbors:
-            # Creating variable for the distance from the start node
-            distance_from_start = current_node_forward.distance + 1
-            if neighbor.next:
-                # If the neighbor has a next node, it means
-                # that it has been visited from the backward direction
-                # Setting neighbor's previous node to the current node forward
-                neighbor.previous = current_node_forward
-                # Setting the next node of the current node forward
-                # as the neighbor.
-                current_node_forward.next = neighbor
-                # And calling the function to draw the path
-                draw_path_bidirectional(grid, neighbor)
-                path_found = True
-                # Empty return statement to break the loop
-                return
-            # If the distance from the start node is less
-            # than the distance of the neighbor
-            if distance_from_start < neighbor.distance:
-                # Setting the previous node of the neighbor
-                neighbor.previous = current_node_forward
-                # Setting the distance of the neighbor
-                neighbor.distance = distance_from_start
-                # If the neighbor is not in the list of nodes to visit
-                if neighbor not in nodes_to_visit:
-                    # Adding the neighbor to the list of nodes to visit
-                    nodes_to_visit.append(neighbor)
-                    # Color the neighbor as ACTIVE
-                    neighbor.make_active()
-
-        for neighbor in current_node_reverse.neighbors:
-            # Creating variable for the distance from the end node
-            distance_from_end = current_node_reverse.distance + 1
-            if neighbor.previous:
-                # If the neighbor has a previous node, it means
-                # that it has been visited from the forward direction.
-                # Setting neighbor's next node to the current node reverse
-                neighbor.next = current_node_reverse
-                # Setting the previous node of the current node reverse
-                # as the neighbor.
-                current_node_reverse.previous = neighbor
-                # And calling the function to draw the path
-                draw_path_bidirectional(grid, neighbor)
-                path_found = True
-                # Empty return statement to break the loop
-                return
-            # If the distance from the end node is less
-            # than the distance of the neighbor
-            if distance_from_end < neighbor.distance:
-                # Setting the next node of the neighbor
-                neighbor.next = current_node_reverse
-                # Setting the distance of the neighbor
-                neighbor.distance = distance_from_end
-                # If the neighbor is not in the list of nodes to visit
-                if neighbor not in nodes_to_visit_reverse:
-                    # Adding the neighbor to the list of nodes to visit
-                    nodes_to_visit_reverse.append(neighbor)
-                    # Color the neighbor as ACTIVE
-                    neighbor.make_active()
-
-        # Color all nodes we visited as VISITED,
-        # except the start and end nodes
-        if current_node_forward != start_node:
-            current_node_forward.make_visited()
-        if current_node_reverse != end_node:
-            current_node_reverse.make_visited()
-        # Displaying the grid every iteration to animate the process
-        display_grid(grid)
-    # If after the loop the path was not found,
-    # we let the user know about it.
-    if not path_found:
-        print(terminal.home + terminal.clear)
-        display_grid(grid)
+    elif result.path_found:
+        print(
+            terminal.underline +
+            terminal.blue +
+            "Path found!" +
+            terminal.normal
+            )
+    else:
+        # If the path was not found,
+        # we let the user know about it
         print(
             terminal.underline +
             terminal.red +
             "No path found. The end or the start node is blocked." +
             terminal.normal
             )
+
+
+def display_search(grid, result):
+    """
+    Animates the events recorded by a headless search on the grid
+    and lets the user know about the outcome of the search.
+    """
+    run_animated(grid, replay_search, grid, result)
+    display_search_outcome(grid, result)
+
+
+def animate_search(grid, start_node, end_node, algorithm):
+    """
+    Searches for the shortest path from the start node to the end node
+    with the algorithm and animates the search. The search runs in the
+    worker thread of the animation pipeline, so it doesn't wait
+    for the terminal.
+    """
+    # Resetting the grid from previous searches
+    reset_grid_partially(grid)
+    result = run_animated(
+        grid,
+        search_and_replay,
+        grid,
+        start_node,
+        end_node,
+        algorithm
+        )
+    display_search_outcome(grid, result)
+
+
+def dijkstra(grid, start_node, end_node):
+    """
+    Searches for the shortest path from the start node to the end node
+    using Dijkstra's algorithm and animates the search.
+    """
+    animate_search(grid, start_node, end_node, "dijkstra")
+
+
+def a_star(grid, start_node, end_node):
+    """
+    Searches for the shortest path from the start node to the end node
+    using A* algorithm and animates the search.
+    """
+    animate_search(grid, start_node, end_node, "a_star")
+
+
+def bidirectional_breadth_first_search(grid, start_node, end_node):
+    """
+    Searches for the shortest path from the start node to the end node
+    using bidirectional breadth-first search algorithm
+    and animates the search.
+    """
+    animate_search(grid, start_node, end_node, "bidirectional_bfs")
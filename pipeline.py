@@ -0,0 +1,200 @@
+"""
+Module for the animation pipeline.
+
+Animated functions, like the maze generators and the replay of the
+search events, run as producers in a worker thread. Every display_step()
+call of the producer ends one step: the state changes made since the
+previous step are taken from the change log of the grid and pushed into
+a bounded queue. The main thread consumes the queue, applies the changes
+to its own copy of the states and draws it at the display rate. Steps
+are merged into frames by the frame scheduler in this one place, and the
+bounded queue makes the producer wait when the display is far behind.
+The main thread keeps reading the keyboard while the producer works:
+the viewport keys move the view and any other key skips the rest
+of the animation.
+"""
+import threading
+from queue import Queue, Empty
+from constants import terminal
+from grid_functions import (
+    display_disabled,
+    display_listeners,
+    display_settings,
+    grid_states,
+    renderer,
+    scheduler
+)
+
+# Largest number of steps waiting in the queue
+QUEUE_STEPS = 1024
+# Text displayed under the grid while the animation is running
+SKIP_HINT = "Press any key to skip the animation.\n"
+
+
+class AnimationStopped(Exception):
+    """
+    Raised in the worker thread when the main thread stops the animation.
+    """
+
+
+class AnimationPipeline:
+    """
+    Class that runs an animated function in a worker thread
+    and displays its steps in the main thread.
+    """
+
+    def __init__(self, grid, max_steps=QUEUE_STEPS):
+        self.grid = grid
+        # Lists of (flat index, new state) changes of every step,
+        # None marks the end of the animation
+        self.queue = Queue(max_steps)
+        # Return value and exception of the animated function
+        self.result = None
+        self.error = None
+        # Set by the main thread when the display fails,
+        # the producer stops at its next step
+        self.stopping = threading.Event()
+
+    def push_step(self, grid):
+        """
+        Listener of the display calls. Pushes the changes made since
+        the last call as one step, waiting while the queue is full.
+        """
+        if grid is not self.grid:
+            return
+        if self.stopping.is_set():
+            raise AnimationStopped()
+        if not grid.change_log:
+            return
+        changes = grid.change_log
+        grid.change_log = []
+        self.queue.put(changes)
+
+    def produce(self, function, arguments):
+        """
+        Runs the animated function in the worker thread.
+        """
+        try:
+            self.result = function(*arguments)
+        except Exception as error:  # pylint: disable=broad-except
+            # Raised again in the main thread
+            self.error = error
+        finally:
+            try:
+                # Pushing the last changes and the end of the animation
+                self.push_step(self.grid)
+                self.queue.put(None)
+            except AnimationStopped:
+                pass
+
+    def run(self, function, *arguments):
+        """
+        Runs function(*arguments) in a worker thread and displays
+        its steps until it returns. Returns what the function returns.
+        """
+        grid = self.grid
+        # States displayed by the main thread
+        frame = grid_states(grid).copy()
+        grid.change_log = []
+        display_listeners.append(self.push_step)
+        worker = threading.Thread(
+            target=self.produce,
+            args=(function, arguments),
+            daemon=True
+            )
+        # The producer must not draw, only the main thread does
+        with display_disabled():
+            try:
+                worker.start()
+                self.consume(frame)
+                worker.join()
+            except BaseException as error:
+                # The display failed or was interrupted, the producer
+                # must stop before the grid is released
+                self.stop(worker)
+                if (
+                    isinstance(error, Exception) and
+                    self.error is not None and
+                    not isinstance(self.error, AnimationStopped)
+                ):
+                    # The error of the producer is raised too, not lost
+                    raise self.error from error
+                raise
+            finally:
+                display_listeners.remove(self.push_step)
+                grid.change_log = None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def stop(self, worker):
+        """
+        Stops the producer and waits for it to end, taking its steps
+        from the queue, so it never waits for a full queue.
+        """
+        self.stopping.set()
+        while worker.is_alive():
+            try:
+                self.queue.get(timeout=1 / scheduler.frame_rate)
+            except Empty:
+                pass
+        worker.join()
+
+    def consume(self, frame):
+        """
+        Applies the steps from the queue to the frame and draws it
+        until the end of the animation.
+        """
+        cells = frame.ravel()
+        width = frame.shape[1]
+        viewport = renderer.viewport
+        skipping = False
+        scheduler.reset()
+        with terminal.cbreak(), terminal.hidden_cursor():
+            renderer.draw(frame, footer=SKIP_HINT + viewport.hint)
+            while True:
+                try:
+                    changes = self.queue.get(timeout=1 / scheduler.frame_rate)
+                except Empty:
+                    # The producer is slow, reading the keyboard
+                    # while waiting for the next step
+                    changes = ()
+                if changes is None:
+                    return
+                for index, state in changes:
+                    cells[index] = state
+                if skipping:
+                    continue
+                if changes:
+                    # The viewport follows the last changed cell
+                    viewport.focus(*divmod(changes[-1][0], width))
+                    if scheduler.step(frame.size):
+                        renderer.draw(frame, footer=SKIP_HINT + viewport.hint)
+                key = terminal.inkey(timeout=0)
+                if key and viewport.handle_key(key):
+                    renderer.draw(frame, footer=SKIP_HINT + viewport.hint)
+                elif key:
+                    # Any other key skips the rest of the animation,
+                    # the producer runs on without waiting
+                    skipping = True
+
+
+def animations_enabled():
+    """
+    Returns True if the animations are displayed. Without the display
+    or in instant mode there is nothing to animate.
+    """
+    return display_settings["enabled"] and not scheduler.instant
+
+
+def run_animated(grid, function, *arguments):
+    """
+    Runs function(*arguments), which changes the grid and calls
+    display_step(), in the animation pipeline.
+    If the animations are not displayed, the function runs right away
+    in the current thread.
+    Returns what the function returns.
+    """
+    if not animations_enabled():
+        return function(*arguments)
+    return AnimationPipeline(grid).run(function, *arguments)
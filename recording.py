@@ -0,0 +1,347 @@
+"""
+Module for recording and replaying traces.
+
+A trace is the list of state changes made on the grid, recorded step by
+step as (cell index, new state) events, where a step is everything that
+changed between two display_step() or display_grid() calls. Traces are
+stored in a compact binary file: a fixed header with the size of the
+grid, the random seed and the number of events, followed by a zlib
+compressed body with the states of the grid when the recording started,
+the flat cell indices of the events as uint32 and their new states as
+uint8. The high bit of the state marks the last event of every step.
+
+Replaying a trace only applies the recorded events, the maze generators
+and the pathfinding algorithms are not run again.
+"""
+import struct
+import zlib
+import numpy as np
+from constants import terminal
+from grid_functions import (
+    display_listeners,
+    grid_states,
+    renderer,
+    scheduler
+)
+
+# Magic bytes at the start of every trace file
+MAGIC = b"PFTR"
+# Version of the file format
+VERSION = 1
+# Header: magic, version, 3 padding bytes, height, width, seed
+# and number of events, all little-endian
+HEADER = struct.Struct("<4sB3xIIqI")
+# Seed stored when the run was not seeded
+NO_SEED = -1
+# Largest seed the header can store, negative seeds are reserved
+MAX_SEED = 2 ** 63 - 1
+# Bit of the state byte which marks the last event of a step
+STEP_END = 0x80
+
+
+class Trace:
+    """
+    Class that stores a recorded trace.
+    """
+
+    def __init__(self, initial, cells, states, seed=NO_SEED):
+        # 2D uint8 array with the states when the recording started
+        self.initial = initial
+        # Flat index of the cell of every event
+        self.cells = cells
+        # New state of every event with the STEP_END bit
+        self.states = states
+        # Seed of the random generator used by the run
+        self.seed = seed
+        # New state of every event without the STEP_END bit
+        self.new_states = states & ~np.uint8(STEP_END)
+        # Index after the last event of every step
+        self.step_ends = np.flatnonzero(states & STEP_END) + 1
+        # State of the cell before every event, used to step backwards
+        self.previous = previous_states(initial, cells, self.new_states)
+
+    @property
+    def shape(self):
+        """
+        Returns the (height, width) of the grid.
+        """
+        return self.initial.shape
+
+    @property
+    def steps(self):
+        """
+        Returns the number of steps of the trace.
+        """
+        return len(self.step_ends)
+
+    def save(self, path):
+        """
+        Writes the trace to the file.
+        """
+        height, width = self.shape
+        body = zlib.compress(
+            self.initial.tobytes() +
+            self.cells.astype("<u4").tobytes() +
+            self.states.tobytes()
+            )
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(
+                MAGIC,
+                VERSION,
+                height,
+                width,
+                self.seed,
+                len(self.cells)
+                ))
+            file.write(body)
+
+
+def previous_states(initial, cells, new_states):
+    """
+    Returns the state of the cell before every event.
+    """
+    # Sorting the events by cell, keeping the order of the events
+    # of every cell, so the previous state of an event is the new
+    # state of the event before it, or the initial state of the cell
+    order = np.argsort(cells, kind="stable")
+    sorted_cells = cells[order]
+    sorted_previous = np.empty_like(new_states)
+    sorted_previous[1:] = new_states[order][:-1]
+    first = np.ones(len(cells), dtype=bool)
+    first[1:] = sorted_cells[1:] != sorted_cells[:-1]
+    sorted_previous[first] = initial.ravel()[sorted_cells[first]]
+    previous = np.empty_like(new_states)
+    previous[order] = sorted_previous
+    return previous
+
+
+def load_trace(path):
+    """
+    Reads the trace from the file.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a trace file.")
+    magic, version, height, width, seed, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a trace file.")
+    if version != VERSION:
+        raise ValueError(
+            f"{path} has version {version} of the trace format, "
+            f"only version {VERSION} is supported."
+        )
+    body = zlib.decompress(data[HEADER.size:])
+    size = height * width
+    initial = np.frombuffer(body, np.uint8, size).reshape(height, width)
+    cells = np.frombuffer(body, "<u4", count, size).astype(np.intp)
+    states = np.frombuffer(body, np.uint8, count, size + 4 * count)
+    return Trace(initial.copy(), cells, states.copy(), seed)
+
+
+class TraceRecorder:
+    """
+    Class that records the state changes of the grid as a trace.
+    Once started, every display_step() and display_grid() call
+    records the cells changed since the last call as one step.
+    """
+
+    def __init__(self, grid, seed=NO_SEED):
+        self.seed = seed
+        self.initial = grid_states(grid).copy()
+        # States of the grid after the last recorded step
+        self.last = self.initial.copy()
+        # Cells and states of the events of every step
+        self.cells = []
+        self.states = []
+
+    def __call__(self, grid):
+        self.record_step(grid)
+
+    def start(self):
+        """
+        Starts recording the display calls.
+        """
+        display_listeners.append(self)
+
+    def stop(self):
+        """
+        Stops recording the display calls.
+        """
+        if self in display_listeners:
+            display_listeners.remove(self)
+
+    def record_step(self, grid):
+        """
+        Records the cells changed since the last step as one step.
+        """
+        states = grid_states(grid)
+        changed = np.flatnonzero(states != self.last)
+        if not changed.size:
+            return
+        new_states = states.ravel()[changed]
+        self.last.ravel()[changed] = new_states
+        step_states = new_states.copy()
+        step_states[-1] |= STEP_END
+        self.cells.append(changed)
+        self.states.append(step_states)
+
+    def trace(self):
+        """
+        Returns the Trace recorded so far.
+        """
+        if not self.cells:
+            return Trace(
+                self.initial.copy(),
+                np.empty(0, dtype=np.intp),
+                np.empty(0, dtype=np.uint8),
+                self.seed
+                )
+        return Trace(
+            self.initial.copy(),
+            np.concatenate(self.cells),
+            np.concatenate(self.states),
+            self.seed
+            )
+
+
+class TracePlayer:
+    """
+    Class that applies the steps of a trace to a states array,
+    forwards and backwards.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        # 2D uint8 array with the states after the current step
+        self.states = trace.initial.copy()
+        # Number of steps applied to the states
+        self.step = 0
+
+    def event_index(self, step):
+        """
+        Returns the index of the first event after the step.
+        """
+        return 0 if step == 0 else int(self.trace.step_ends[step - 1])
+
+    def seek(self, step):
+        """
+        Moves to the step, clamped to the steps of the trace.
+        All events between the current and the new step
+        are applied at once.
+        """
+        trace = self.trace
+        step = min(max(step, 0), trace.steps)
+        current = self.event_index(self.step)
+        target = self.event_index(step)
+        states = self.states.ravel()
+        if target > current:
+            # The last event of every cell gives its new state
+            cells = trace.cells[current:target][::-1]
+            cells, last = np.unique(cells, return_index=True)
+            states[cells] = trace.new_states[current:target][::-1][last]
+        elif target < current:
+            # The first event of every cell gives its state before them
+            cells = trace.cells[target:current]
+            cells, first = np.unique(cells, return_index=True)
+            states[cells] = trace.previous[target:current][first]
+        self.step = step
+
+    def last_position(self):
+        """
+        Returns the (row, col) of the last cell changed by the current
+        step, or None at the start of the trace.
+        """
+        if self.step == 0:
+            return None
+        index = self.trace.cells[self.event_index(self.step) - 1]
+        return divmod(int(index), self.trace.shape[1])
+
+
+def draw_player(player):
+    """
+    Draws the states of the player with the status under them.
+    The viewport follows the last changed cell.
+    """
+    position = player.last_position()
+    if position is not None:
+        renderer.viewport.focus(*position)
+    renderer.draw(player.states, footer=replay_status(player))
+
+
+def replay_status(player):
+    """
+    Returns the status line and the controls displayed under the grid.
+    """
+    trace = player.trace
+    speed = "instant" if scheduler.instant else f"{scheduler.speed:g}/s"
+    seed = "" if trace.seed == NO_SEED else f"    Seed {trace.seed}"
+    return (
+        terminal.bold +
+        terminal.yellow +
+        f"Step {player.step}/{trace.steps}    Speed {speed}{seed}" +
+        terminal.normal +
+        "\nSPACE play/pause, LEFT/RIGHT step, [ ] seek, HOME/END jump," +
+        "\n+ - change the speed, Q quit.\n" +
+        renderer.viewport.hint
+        )
+
+
+def replay_trace(trace):
+    """
+    Plays the trace back in the terminal with keyboard controls.
+    """
+    player = TracePlayer(trace)
+    # Seeking jumps over a tenth of the trace
+    jump = max(1, trace.steps // 10)
+    playing = True
+    renderer.invalidate()
+    scheduler.reset()
+    with terminal.cbreak(), terminal.hidden_cursor():
+        draw_player(player)
+        while True:
+            at_end = player.step == trace.steps
+            # Waiting for a key only when there is nothing to play
+            key = terminal.inkey(timeout=0 if playing and not at_end else None)
+            if key:
+                if key.lower() == "q" or key.code == terminal.KEY_ESCAPE:
+                    return
+                if renderer.viewport.handle_key(key):
+                    # The view moved, the player did not
+                    pass
+                elif key == " ":
+                    playing = not playing
+                    if playing and at_end:
+                        # Playing again from the start
+                        player.seek(0)
+                elif key.code == terminal.KEY_RIGHT:
+                    playing = False
+                    player.seek(player.step + 1)
+                elif key.code == terminal.KEY_LEFT:
+                    playing = False
+                    player.seek(player.step - 1)
+                elif key == "]" or key.code == terminal.KEY_PGDOWN:
+                    player.seek(player.step + jump)
+                elif key == "[" or key.code == terminal.KEY_PGUP:
+                    player.seek(player.step - jump)
+                elif key.code == terminal.KEY_HOME:
+                    player.seek(0)
+                elif key.code == terminal.KEY_END:
+                    player.seek(trace.steps)
+                elif key == "+" and not scheduler.instant:
+                    scheduler.speed *= 2
+                elif key == "-" and not scheduler.instant:
+                    scheduler.speed /= 2
+                # Restarting the clock of the animation after any key
+                scheduler.reset()
+            elif scheduler.instant:
+                player.seek(trace.steps)
+            else:
+                player.seek(player.step + 1)
+                if (
+                    not scheduler.step(trace.steps) and
+                    player.step < trace.steps
+                ):
+                    # The step is drawn with the next frame
+                    continue
+            draw_player(player)
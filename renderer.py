@@ -0,0 +1,147 @@
+"""
+Module for the differential terminal renderer.
+
+The renderer remembers the last frame it has drawn. The next frames only
+move the cursor to the cells which changed and redraw them, the whole
+grid is repainted only when the terminal was resized or when asked to.
+Every frame is composed in one buffer from the cached glyph strings and
+written to the terminal with a single write. The strings of the rows
+are cached too, so a repaint only rebuilds the rows which changed.
+"""
+import sys
+import numpy as np
+from constants import GLYPHS
+from viewport import Viewport
+
+# Glyphs as a numpy array, so a whole row can be looked up at once
+GLYPH_ARRAY = np.array(GLYPHS, dtype=object)
+
+
+class TerminalRenderer:
+    """
+    Class that draws 2D arrays of state codes in the terminal.
+    """
+
+    def __init__(self, terminal, top=1):
+        self.terminal = terminal
+        # Screen row of the first row of the grid,
+        # the line above the grid stays empty
+        self.top = top
+        # Part of the grid drawn when it doesn't fit in the terminal
+        self.viewport = Viewport(terminal, top)
+        # Screen columns taken by every glyph and the space after it
+        self.cell_widths = np.array(
+            [terminal.length(glyph) + 1 for glyph in GLYPHS],
+            dtype=np.intp
+            )
+        # Copy of the states drawn in the last frame
+        self.frame = None
+        # Cached strings of the rows of the last frame,
+        # None for the rows which changed since they were built
+        self.rows = []
+        # Text drawn under the grid in the last frame
+        self.footer = ""
+        # Size of the terminal when the last frame was drawn
+        self.screen_size = None
+
+    def invalidate(self):
+        """
+        Makes the next frame repaint everything.
+        Must be called when something else has drawn over the grid.
+        """
+        self.screen_size = None
+
+    def draw(self, states, full_repaint=False, footer=""):
+        """
+        Draws the part of the 2D array of state codes chosen by the
+        viewport and remembers it. The footer is text drawn under
+        the grid in the same write, it is redrawn only when it changes.
+        """
+        states = self.viewport.view(states)
+        screen_size = (self.terminal.width, self.terminal.height)
+        output = []
+        if (
+            full_repaint or
+            self.frame is None or
+            self.frame.shape != states.shape or
+            self.screen_size != screen_size
+        ):
+            self.repaint(states, output)
+            self.footer = ""
+        else:
+            self.update(states, output)
+        if footer != self.footer:
+            output.append(self.terminal.clear_eos + footer)
+            self.footer = footer
+        self.frame = states.copy()
+        self.screen_size = screen_size
+        sys.stdout.write("".join(output))
+        sys.stdout.flush()
+
+    def row_strings(self, states):
+        """
+        Returns the strings of all rows,
+        rebuilding only the rows which changed since the last frame.
+        """
+        if self.frame is None or self.frame.shape != states.shape:
+            self.rows = [None] * len(states)
+        else:
+            for row in np.flatnonzero((states != self.frame).any(axis=1)):
+                self.rows[row] = None
+        rows = self.rows
+        for row, cached in enumerate(rows):
+            if cached is None:
+                rows[row] = " ".join(GLYPH_ARRAY[states[row]].tolist())
+        return rows
+
+    def repaint(self, states, output):
+        """
+        Adds the output which clears the screen and draws all rows
+        to the output list.
+        """
+        output.append(
+            self.terminal.home +
+            self.terminal.clear +
+            "\n" * self.top
+            )
+        output.append("\n".join(self.row_strings(states)))
+        output.append("\n")
+
+    def update(self, states, output):
+        """
+        Adds the output which redraws only the changed cells
+        and leaves the cursor under the grid to the output list.
+        """
+        terminal = self.terminal
+        frame = self.frame
+        cell_widths = self.cell_widths
+        changed = states != frame
+        for row in np.flatnonzero(changed.any(axis=1)):
+            # The cached string of the row is rebuilt on the next repaint
+            self.rows[row] = None
+            cols = np.flatnonzero(changed[row])
+            new_states = states[row]
+            # Screen column of every cell in the row. Glyphs don't have
+            # the same width, so the cells after a glyph of another width
+            # move and the rest of the row must be redrawn.
+            positions = np.zeros(len(new_states), dtype=np.intp)
+            np.cumsum(cell_widths[new_states][:-1], out=positions[1:])
+            moved = np.flatnonzero(
+                cell_widths[new_states[cols]] != cell_widths[frame[row, cols]]
+                )
+            first_moved = cols[moved[0]] if moved.size else len(new_states)
+            y = self.top + int(row)
+            for col in cols[cols < first_moved]:
+                output.append(
+                    terminal.move_xy(int(positions[col]), y) +
+                    GLYPHS[new_states[col]]
+                    )
+            if first_moved < len(new_states):
+                output.append(
+                    terminal.move_xy(int(positions[first_moved]), y) +
+                    " ".join(GLYPH_ARRAY[new_states[first_moved:]].tolist()) +
+                    terminal.clear_eol
+                    )
+        # Leaving the cursor on the line under the grid,
+        # where the messages are printed
+        output.append(terminal.move_xy(0, self.top + len(states)))
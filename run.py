@@ -1,21 +1,57 @@
+import argparse
+import json
 import random
+import sys
+from contextlib import redirect_stdout
 from simple_term_menu import TerminalMenu
-from constants import HEIGHT, WIDTH, terminal
+from constants import (
+    HEIGHT,
+    WIDTH,
+    GRID_BACKEND,
+    FRAME_RATE,
+    ANIMATION_SPEED,
+    ANIMATION_SECONDS,
+    VIEW_MODE,
+    RANDOM_DENSITY,
+    terminal
+    )
 from grid_functions import (
+    MIN_GRID_SIZE,
     generate_grid,
-    reset_grid,
     display_grid,
     reset_grid_partially,
     display_prepared_grid,
+    invalidate_display,
     place_start_node_manually,
-    place_end_node_manually
+    place_end_node_manually,
+    renderer,
+    scheduler
     )
 from maze_functions import (
+    GENERATORS,
+    generate_pattern,
+    parse_density,
+    pattern_settings,
     generate_random_pattern,
     generate_vertical_maze,
     generate_horizontal_maze,
-    generate_maze_recursive_division,
-    generate_spiral_maze
+    generate_spiral_maze,
+    generate_kruskal_maze,
+    generate_prim_maze,
+    generate_wilson_maze,
+    generate_eller_maze
+    )
+from scheduler import parse_speed
+from viewport import VIEW_MODES
+from recording import TraceRecorder, load_trace, replay_trace, MAX_SEED
+from grid_files import load_grid, save_grid
+from components import random_connected_nodes
+from batch_mode import (
+    GENERATOR_NAMES,
+    RENDER_MODES,
+    parse_algorithms,
+    parse_placement,
+    run_batch
     )
 from pathfinding_algorithms import (
     dijkstra,
@@ -32,6 +68,14 @@ options_main = [
     "Pathfinder algorithms",
     "Exit",
 ]
+# Options for the perfect mazes in the grid options menu
+# and their generators
+options_perfect_mazes = {
+    "Maze with Kruskal's algorithm": generate_kruskal_maze,
+    "Maze with Prim's algorithm": generate_prim_maze,
+    "Maze with Wilson's algorithm": generate_wilson_maze,
+    "Maze with Eller's algorithm": generate_eller_maze,
+}
 # List of options for the grid options menu
 options_grid = [
     "Empty grid",
@@ -40,6 +84,7 @@ options_grid = [
     "Maze with horizontal walls",
     "Maze with spiral pattern",
     "Maze recursive division",
+    *options_perfect_mazes,
     "Go back",
 ]
 # List of options for the start and end node placement menu
@@ -56,37 +101,270 @@ options_pathfinder = [
     "Bi-directional BFS",
     "Go back",
 ]
-# Variable for all menus.
-main_menu = TerminalMenu(
-    options_main,
-    title="Main menu"
-    )
-grid_menu = TerminalMenu(
-    options_grid,
-    title="Grid menu"
-    )
-start_end_menu = TerminalMenu(
-    options_start_end,
-    title="Start and end node menu"
-    )
-pathfinder_menu = TerminalMenu(
-    options_pathfinder,
-    title="Pathfinder menu"
-    )
 
 
-def main():
+def create_menus():
+    """
+    Creates all menus. The menus need a terminal,
+    so they are only created for the interactive mode.
+    Returns the main, grid, start and end node and pathfinder menus.
+    """
+    main_menu = TerminalMenu(
+        options_main,
+        title="Main menu"
+        )
+    grid_menu = TerminalMenu(
+        options_grid,
+        title="Grid menu"
+        )
+    start_end_menu = TerminalMenu(
+        options_start_end,
+        title="Start and end node menu"
+        )
+    pathfinder_menu = TerminalMenu(
+        options_pathfinder,
+        title="Pathfinder menu"
+        )
+    return main_menu, grid_menu, start_end_menu, pathfinder_menu
+
+
+def show_menu(menu):
+    """
+    Shows the menu and returns the index of the chosen option.
+    The menu is drawn over the grid, so the next frame repaints it.
+    """
+    user_choice = menu.show()
+    invalidate_display()
+    return user_choice
+
+
+def parse_arguments():
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Pathfinding algorithms visualizer."
+        )
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=WIDTH,
+        help="number of columns of the grid (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--height",
+        type=int,
+        default=HEIGHT,
+        help="number of rows of the grid (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--backend",
+        choices=["node", "array"],
+        default=GRID_BACKEND,
+        help="grid backend (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=FRAME_RATE,
+        help="largest number of frames drawn in one second "
+        "(default: %(default)s)"
+        )
+    parser.add_argument(
+        "--speed",
+        type=parse_speed,
+        default=parse_speed(ANIMATION_SPEED),
+        help="animation steps played in one second, "
+        "or 'instant' to skip the animations (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--animation-seconds",
+        type=float,
+        default=ANIMATION_SECONDS,
+        help="time limit of one animation in seconds, the speed is raised "
+        "on large grids to stay under it (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--view",
+        choices=VIEW_MODES,
+        default=VIEW_MODE,
+        help="viewport mode for grids larger than the terminal "
+        "(default: %(default)s)"
+        )
+    parser.add_argument(
+        "--density",
+        type=parse_density,
+        default=RANDOM_DENSITY,
+        help="probability of every node to become a barrier "
+        "in the random pattern (default: %(default)s)"
+        )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed of the random generator from 0 to 2**63-1, "
+        "stored in the recorded trace"
+        )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="record every change of the grid during the session "
+        "and save the trace to the file on exit"
+        )
+    parser.add_argument(
+        "--load-grid",
+        metavar="FILE",
+        help="start with the grid saved in the file, "
+        "in the batch mode instead of the generator"
+        )
+    parser.add_argument(
+        "--save-grid",
+        metavar="FILE",
+        help="save the walls and the start and end nodes of the grid "
+        "to the file on exit"
+        )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="play back a recorded trace instead of starting the menu"
+        )
+    batch = parser.add_argument_group(
+        "batch mode",
+        "Runs without the menu and prints a JSON summary. "
+        "Any of these flags starts the batch mode."
+        )
+    batch.add_argument(
+        "--batch",
+        action="store_true",
+        help="start the batch mode with the default settings"
+        )
+    batch.add_argument(
+        "--generator",
+        choices=GENERATOR_NAMES,
+        help="pattern generated on the grid (default: recursive_division)"
+        )
+    batch.add_argument(
+        "--start",
+        type=parse_placement,
+        help="start node placement: default, random or ROW,COL "
+        "(default: default)"
+        )
+    batch.add_argument(
+        "--end",
+        type=parse_placement,
+        help="end node placement: default, random or ROW,COL "
+        "(default: default)"
+        )
+    batch.add_argument(
+        "--algorithm",
+        type=parse_algorithms,
+        help="comma separated algorithms to run, or all: "
+        "dijkstra, dijkstra_wavefront, a_star, bidirectional_bfs "
+        "(default: all)"
+        )
+    batch.add_argument(
+        "--render",
+        choices=RENDER_MODES,
+        help="what is drawn: none, the final grid or every step "
+        "(default: none)"
+        )
+    arguments = parser.parse_args()
+    batch_flags = (
+        arguments.generator,
+        arguments.start,
+        arguments.end,
+        arguments.algorithm,
+        arguments.render
+        )
+    if any(flag is not None for flag in batch_flags):
+        arguments.batch = True
+    # Defaults of the batch mode, set here so it can tell
+    # which flags were given
+    if arguments.generator is None:
+        arguments.generator = "recursive_division"
+    if arguments.start is None:
+        arguments.start = "default"
+    if arguments.end is None:
+        arguments.end = "default"
+    if arguments.algorithm is None:
+        arguments.algorithm = parse_algorithms("all")
+    if arguments.render is None:
+        arguments.render = "none"
+    if arguments.batch and arguments.replay:
+        parser.error("--replay can't be used in the batch mode")
+    # Checking the size before the grid is generated, in both modes
+    if min(arguments.width, arguments.height) < MIN_GRID_SIZE:
+        parser.error(f"--width and --height must be at least {MIN_GRID_SIZE}")
+    # Checking the seed before the run, so the trace can always be saved
+    if arguments.seed is not None and not 0 <= arguments.seed <= MAX_SEED:
+        parser.error(f"--seed must be from 0 to {MAX_SEED}")
+    return arguments
+
+
+def main(arguments):
     """
     Main function.
     """
-    # Variable for the grid
-    grid = generate_grid()
+    # Settings of the animations
+    scheduler.frame_rate = arguments.fps
+    scheduler.speed = arguments.speed
+    scheduler.max_seconds = arguments.animation_seconds
+    renderer.viewport.mode = arguments.view
+    # Settings of the random pattern
+    pattern_settings["density"] = arguments.density
+    if arguments.replay:
+        # Playing back the trace without running any algorithm
+        replay_trace(load_trace(arguments.replay))
+        return 0
+    if arguments.batch:
+        # Running without the menu and printing the summary.
+        # The rendered grids go to stderr, so stdout is only the JSON.
+        try:
+            with redirect_stdout(sys.stderr):
+                summary = run_batch(arguments)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 2
+        print(json.dumps(summary, indent=1))
+        return 0
+    # Variables for all menus
+    main_menu, grid_menu, start_end_menu, pathfinder_menu = create_menus()
+    seed = arguments.seed
+    if seed is None and arguments.record:
+        # Recorded runs are always seeded, so they can be repeated
+        seed = random.randrange(2 ** 31)
+    if seed is not None:
+        random.seed(seed)
     # Variable for the start node
     start_node = None
     # Variable for the end node
     end_node = None
     # Flag to check if any patter has been generated on the grid.
     pattern_generated = False
+    if arguments.load_grid:
+        # Starting with the saved grid and its start and end nodes
+        try:
+            grid, start_node, end_node = load_grid(
+                arguments.load_grid,
+                arguments.backend
+                )
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 2
+        pattern_generated = True
+    else:
+        # Variable for the grid
+        grid = generate_grid(
+            arguments.height,
+            arguments.width,
+            arguments.backend
+            )
+    # Variable for the trace recorder
+    recorder = None
+    if arguments.record:
+        recorder = TraceRecorder(grid, seed)
+        recorder.start()
+    # Size of the grid
+    height, width = grid.shape
 
     # Flag to check if the app is running.
     app_running = True
@@ -112,60 +390,54 @@ def main():
     while app_running:
         # First we show the main menu to the user,
         # and store the user's choice to the variable.
-        user_choice = main_menu.show()
+        user_choice = show_menu(main_menu)
         # We check what the user chose and change the menu accordingly
         if options_main[user_choice] == "Grid options":
-            user_choice = grid_menu.show()
+            user_choice = show_menu(grid_menu)
             if options_grid[user_choice] == "Empty grid":
-                # For empty grid, we just call reset_grid function
-                # to draw a border wall on the grid.
-                reset_grid(grid)
+                # For empty grid, we just draw a border wall on the grid.
+                generate_pattern(grid)
                 start_node = None
                 end_node = None
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Random pattern":
-                reset_grid(grid)
                 start_node = None
                 end_node = None
                 # For random pattern, we call generate_random_pattern function
-                generate_random_pattern(grid)
+                generate_pattern(grid, generate_random_pattern)
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Maze with vertical walls":
-                reset_grid(grid)
                 start_node = None
                 end_node = None
                 # For maze with vertical walls,
                 # we call generate_maze_vertical_walls function
-                generate_vertical_maze(grid)
+                generate_pattern(grid, generate_vertical_maze)
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Maze with horizontal walls":
-                reset_grid(grid)
                 start_node = None
                 end_node = None
                 # For maze with horizontal walls,
                 # we call generate_maze_horizontal_walls function
-                generate_horizontal_maze(grid)
+                generate_pattern(grid, generate_horizontal_maze)
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Maze with spiral pattern":
-                reset_grid(grid)
                 start_node = None
                 end_node = None
                 # For maze with spiral pattern,
                 # we call generate_maze_spiral_pattern function
-                generate_spiral_maze(grid)
+                generate_pattern(grid, generate_spiral_maze)
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Maze recursive division":
-                reset_grid(grid)
                 start_node = None
                 end_node = None
                 # For maze with recursive division,
@@ -175,23 +447,33 @@ def main():
                 # start_row and start_col equal to 2,
                 # because we want not to touch the border walls and
                 # first row and column.
-                # end_row equal to HEIGHT - 2,
-                # end_col equal to WIDTH - 2,
+                # end_row equal to height - 2,
+                # end_col equal to width - 2,
                 # because we want not to touch the border walls and
                 # last row and column,
                 # orientation equal to "vertical",
                 # because we want to start with creating a vertical wall.
-                generate_maze_recursive_division(
-                    grid, 2, HEIGHT - 2, 2, WIDTH - 2, "vertical"
+                generate_pattern(grid, GENERATORS["recursive_division"])
+                display_grid(grid)
+                # Changing the flag to True
+                pattern_generated = True
+            elif options_grid[user_choice] in options_perfect_mazes:
+                start_node = None
+                end_node = None
+                # For perfect mazes, we call the generator
+                # of the chosen algorithm
+                generate_pattern(
+                    grid,
+                    options_perfect_mazes[options_grid[user_choice]]
                 )
                 display_grid(grid)
                 # Changing the flag to True
                 pattern_generated = True
             elif options_grid[user_choice] == "Go back":
                 # If the user chose to go back, we display the main menu again.
-                user_choice = main_menu.show()
+                user_choice = show_menu(main_menu)
         elif options_main[user_choice] == "Place start and end node":
-            user_choice = start_end_menu.show()
+            user_choice = show_menu(start_end_menu)
             if (
                 options_start_end[user_choice] != "Go back" and not
                 pattern_generated
@@ -221,7 +503,7 @@ def main():
                 # By default, we place the start node at the top left corner
                 # and the end node at the bottom right corner.
                 start_node = grid[1][1]
-                end_node = grid[HEIGHT - 2][WIDTH - 2]
+                end_node = grid[height - 2][width - 2]
                 # Calling the function to draw the start and end node
                 # and display the grid.
                 display_prepared_grid(start_node, end_node, grid)
@@ -230,8 +512,6 @@ def main():
                 # to clean it after the previous pathfinding algorithm runs
                 # but not touching the pattern.
                 reset_grid_partially(grid)
-                # Creating variable to store possible nodes.
-                possible_nodes = []
                 # If start and end already exist, we reset them.
                 if start_node:
                     start_node.reset()
@@ -239,20 +519,24 @@ def main():
                 if end_node:
                     end_node.reset()
                     end_node = None
-                # Loop to add all empty nodes to the list.
-                for row in grid:
-                    for node in row:
-                        if node.is_empty():
-                            possible_nodes.append(node)
-                # Randomly choosing start node from the list.
-                start_node = random.choice(possible_nodes)
-                # Removing the start node from the list.
-                possible_nodes.remove(start_node)
-                # Randomly choosing end node from the list.
-                end_node = random.choice(possible_nodes)
-                # Calling the function to draw the start and end node
-                # and display the grid.
-                display_prepared_grid(start_node, end_node, grid)
+                # Randomly choosing the start and end node
+                # from the same component, so the path always exists.
+                nodes = random_connected_nodes(grid)
+                if nodes is None:
+                    # If no two empty nodes are connected,
+                    # we let the user know about it.
+                    display_grid(grid)
+                    print(
+                        terminal.red +
+                        terminal.underline +
+                        "No connected empty nodes to place the nodes on." +
+                        terminal.normal
+                        )
+                else:
+                    start_node, end_node = nodes
+                    # Calling the function to draw the start and end node
+                    # and display the grid.
+                    display_prepared_grid(start_node, end_node, grid)
             elif options_start_end[user_choice] == "Place manually":
                 # First we partially reset the grid,
                 # to clean it after the previous pathfinding algorithm runs
@@ -276,9 +560,9 @@ def main():
                     display_grid(grid)
             elif options_start_end[user_choice] == "Go back":
                 # If the user chose to go back, we display the main menu again.
-                user_choice = main_menu.show()
+                user_choice = show_menu(main_menu)
         elif options_main[user_choice] == "Pathfinder algorithms":
-            user_choice = pathfinder_menu.show()
+            user_choice = show_menu(pathfinder_menu)
             if (
                 options_pathfinder[user_choice] != "Go back" and
                 (not start_node or not end_node)
@@ -304,7 +588,7 @@ def main():
                 bidirectional_breadth_first_search(grid, start_node, end_node)
             elif options_pathfinder[user_choice] == "Go back":
                 # If the user chose to go back, we display the main menu again.
-                user_choice = main_menu.show()
+                user_choice = show_menu(main_menu)
         elif options_main[user_choice] == "Exit":
             # If the user chose to exit, we exit the program.
             app_running = False
@@ -317,9 +601,19 @@ def main():
                 "Have a nice day, bye!" +
                 terminal.normal
                 )
+    if recorder:
+        # Saving the recorded trace
+        recorder.stop()
+        recorder.trace().save(arguments.record)
+        print(f"Trace saved to {arguments.record}.")
+    if arguments.save_grid:
+        # Saving the grid
+        save_grid(grid, arguments.save_grid)
+        print(f"Grid saved to {arguments.save_grid}.")
+    return 0
 
 
 # Checking if we are running this file directly.
 if __name__ == "__main__":
-    # Calling the main function.
-    main()
+    # Calling the main function and exiting with its status.
+    sys.exit(main(parse_arguments()))
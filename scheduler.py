@@ -0,0 +1,94 @@
+"""
+Module for the frame scheduler of the animations.
+
+Every step of an animation (a wall drawn by a maze generator, a node
+visited by a search) is counted by the scheduler. Steps are played at
+the speed setting, and the frames are drawn at most at the frame rate,
+so many steps are merged into one frame. When drawing falls behind, the
+frames in between are dropped. The speed is raised on large grids, so
+no animation takes much longer than the time limit.
+"""
+from time import perf_counter, sleep
+from constants import INFINITY
+
+
+def parse_speed(text):
+    """
+    Parses the speed setting, a number of steps per second
+    or "instant" for no animation at all.
+    """
+    if str(text).lower() == "instant":
+        return INFINITY
+    speed = float(text)
+    if speed <= 0:
+        raise ValueError("The speed must be a positive number or 'instant'.")
+    return speed
+
+
+class FrameScheduler:
+    """
+    Class that decides which steps of an animation are drawn.
+    """
+
+    def __init__(self, frame_rate, speed, max_seconds):
+        # Largest number of frames drawn in one second
+        self.frame_rate = frame_rate
+        # Number of steps played in one second, INFINITY for instant mode
+        self.speed = speed
+        # Time limit of one animation in seconds
+        self.max_seconds = max_seconds
+        # Time when the current animation started, None between animations
+        self.started = None
+        # Number of steps of the current animation
+        self.steps = 0
+        # Earliest time of the next frame
+        self.next_frame = 0.0
+        # Number of frames drawn and steps merged into other frames
+        self.frames = 0
+        self.merged = 0
+
+    @property
+    def instant(self):
+        """
+        Returns True if the steps are not animated at all.
+        """
+        return self.speed == INFINITY
+
+    def reset(self):
+        """
+        Ends the current animation. The next step starts a new one.
+        """
+        self.started = None
+
+    def step(self, total_steps):
+        """
+        Counts one step of the animation and waits until it is due.
+        total_steps is the largest number of steps the animation can
+        have, used to keep it under the time limit.
+        Returns True if a frame must be drawn for the step.
+        """
+        now = perf_counter()
+        if self.started is None:
+            self.started = now
+            self.steps = 0
+            self.next_frame = now
+        if self.instant:
+            self.merged += 1
+            return False
+        self.steps += 1
+        speed = max(self.speed, total_steps / self.max_seconds)
+        # Time when the step should appear on the screen
+        due = self.started + self.steps / speed
+        if max(due, now) < self.next_frame:
+            # Too early for the next frame,
+            # the step is drawn with the next one
+            self.merged += 1
+            return False
+        if due > now:
+            sleep(due - now)
+            now = due
+        # When drawing is behind the steps, the steps
+        # until the next frame time are merged and dropped
+        self.next_frame = now + 1 / self.frame_rate
+        self.frames += 1
+        return True
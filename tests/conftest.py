@@ -0,0 +1,36 @@
+"""
+Shared fixtures of the tests.
+"""
+import os
+import random
+import sys
+import pytest
+
+# The modules of the project are at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# pylint: disable=wrong-import-position
+from grid_functions import (  # noqa: E402
+    display_disabled,
+    generate_grid,
+    reset_grid
+)
+from maze_functions import GENERATORS  # noqa: E402
+
+
+@pytest.fixture
+def build_maze():
+    """
+    Returns a function which generates a maze without animations:
+    build_maze(generator, height, width, seed, backend) -> grid.
+    The "empty" generator leaves the grid with only the wall border.
+    """
+    def build(generator, height=21, width=25, seed=1, backend="node"):
+        random.seed(seed)
+        grid = generate_grid(height, width, backend)
+        with display_disabled():
+            reset_grid(grid, animated=False)
+            if generator != "empty":
+                GENERATORS[generator](grid, animated=False)
+        return grid
+    return build
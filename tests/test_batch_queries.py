@@ -0,0 +1,147 @@
+"""
+Tests of the batch shortest path queries.
+"""
+import random
+import numpy as np
+import pytest
+from batch_queries import (
+    ShortestPathTree,
+    flow_field,
+    many_to_one,
+    nearest_goal,
+    one_to_many
+)
+from constants import WALL_STATE
+from grid_functions import grid_states
+from pathfinding_algorithms import search_dijkstra
+
+GENERATORS = ["random_pattern", "kruskal", "recursive_division"]
+
+
+def open_positions(grid, count, seed):
+    """
+    Returns count random positions of the grid which are not walls.
+    """
+    rows, cols = np.nonzero(grid_states(grid) != WALL_STATE)
+    picked = random.Random(seed).sample(range(rows.size), count)
+    return [(int(rows[index]), int(cols[index])) for index in picked]
+
+
+def dijkstra_length(grid, source, target):
+    """
+    Returns the length of the path found by search_dijkstra,
+    -1 if there is none.
+    """
+    result = search_dijkstra(
+        grid,
+        grid[source],
+        grid[target],
+        backend="heap"
+        )
+    return result.path_length if result.path_found else -1
+
+
+def assert_walk(grid, path, source, target):
+    """
+    Checks that the path goes from the source to the target
+    in steps of one cell over open cells.
+    """
+    states = grid_states(grid)
+    assert path[0] == source
+    assert path[-1] == target
+    for row, col in path:
+        assert states[row, col] != WALL_STATE
+    for (row, col), (next_row, next_col) in zip(path, path[1:]):
+        assert abs(row - next_row) + abs(col - next_col) == 1
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("seed", [1, 2])
+def test_one_to_many_matches_dijkstra(build_maze, generator, seed):
+    grid = build_maze(generator, seed=seed)
+    source, *targets = open_positions(grid, 9, seed)
+    paths = one_to_many(grid, source, targets)
+    assert len(paths) == len(targets)
+    for target, path in zip(targets, paths):
+        length = dijkstra_length(grid, source, target)
+        if length < 0:
+            assert path == []
+            continue
+        assert len(path) - 1 == length
+        assert_walk(grid, path, source, target)
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("seed", [1, 2])
+def test_many_to_one_matches_dijkstra(build_maze, generator, seed):
+    grid = build_maze(generator, seed=seed)
+    target, *sources = open_positions(grid, 9, seed)
+    paths = many_to_one(grid, sources, target)
+    for source, path in zip(sources, paths):
+        length = dijkstra_length(grid, source, target)
+        if length < 0:
+            assert path == []
+            continue
+        assert len(path) - 1 == length
+        assert_walk(grid, path, source, target)
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("seed", [1, 2])
+def test_nearest_goal_matches_dijkstra(build_maze, generator, seed):
+    grid = build_maze(generator, seed=seed)
+    source, *goals = open_positions(grid, 6, seed)
+    lengths = [dijkstra_length(grid, source, goal) for goal in goals]
+    reachable = [length for length in lengths if length >= 0]
+    path = nearest_goal(grid, source, goals)
+    if not reachable:
+        assert path == []
+        return
+    assert len(path) - 1 == min(reachable)
+    assert path[-1] in goals
+    assert_walk(grid, path, source, path[-1])
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_flow_field_steps_towards_the_goal(build_maze, generator):
+    grid = build_maze(generator)
+    goal, *positions = open_positions(grid, 9, 3)
+    field = flow_field(grid, goal)
+    assert field.next_step(goal) is None
+    for position in positions:
+        length = dijkstra_length(grid, position, goal)
+        assert field.distances([position])[0] == length
+        assert field.is_reachable(position) == (length >= 0)
+        if length < 0:
+            assert field.next_step(position) is None
+            continue
+        # Following the next steps reaches the goal in length steps
+        path = [position]
+        while path[-1] != goal:
+            path.append(field.next_step(path[-1]))
+        assert len(path) - 1 == length
+        assert_walk(grid, path, position, goal)
+
+
+def test_distances_accept_numpy_positions(build_maze):
+    grid = build_maze("kruskal")
+    source, *targets = open_positions(grid, 4, 5)
+    tree = ShortestPathTree(grid, [source])
+    as_list = tree.distances(targets)
+    assert np.array_equal(tree.distances(np.array(targets)), as_list)
+    assert tree.distances(np.empty((0, 2), dtype=int)).size == 0
+    position, distance = tree.nearest(np.array(targets))
+    assert distance == as_list.min()
+    assert tree.distances([position])[0] == distance
+
+
+def test_roots_must_be_open_cells_inside_the_grid(build_maze):
+    grid = build_maze("kruskal")
+    states = grid_states(grid)
+    wall = tuple(int(index) for index in np.argwhere(states == WALL_STATE)[0])
+    with pytest.raises(ValueError):
+        ShortestPathTree(grid, [wall])
+    height, width = states.shape
+    for root in [(-1, 0), (0, width), (height, 0)]:
+        with pytest.raises(ValueError):
+            ShortestPathTree(grid, [root])
@@ -0,0 +1,205 @@
+"""
+Tests of the connected component labels.
+"""
+import random
+from collections import deque
+import numpy as np
+import pytest
+from components import (
+    NO_COMPONENT,
+    connected,
+    grid_components,
+    label_components,
+    random_connected_nodes
+)
+from constants import WALL_STATE
+from grid_functions import generate_grid, grid_states
+from node_class import Node
+from pathfinding_algorithms import SEARCH_FUNCTIONS
+
+
+def bfs_labels(open_cells):
+    """
+    Returns the component of every node found by a breadth-first
+    search, numbered in the order the components are found.
+    """
+    height, width = open_cells.shape
+    labels = np.full(open_cells.shape, NO_COMPONENT)
+    count = 0
+    for row, col in zip(*np.nonzero(open_cells)):
+        if labels[row, col] != NO_COMPONENT:
+            continue
+        labels[row, col] = count
+        queue = deque([(row, col)])
+        while queue:
+            current_row, current_col = queue.popleft()
+            for next_row, next_col in (
+                (current_row - 1, current_col),
+                (current_row + 1, current_col),
+                (current_row, current_col - 1),
+                (current_row, current_col + 1)
+            ):
+                if (
+                    0 <= next_row < height and 0 <= next_col < width and
+                    open_cells[next_row, next_col] and
+                    labels[next_row, next_col] == NO_COMPONENT
+                ):
+                    labels[next_row, next_col] = count
+                    queue.append((next_row, next_col))
+        count += 1
+    return labels.ravel()
+
+
+def assert_same_partition(labels, expected):
+    """
+    Checks that both label arrays split the nodes the same way.
+    """
+    labels = np.asarray(labels)
+    assert np.array_equal(labels == NO_COMPONENT, expected == NO_COMPONENT)
+    open_nodes = expected != NO_COMPONENT
+    pairs = set(zip(labels[open_nodes].tolist(),
+                    expected[open_nodes].tolist()))
+    assert len(pairs) == len(set(labels[open_nodes].tolist()))
+    assert len(pairs) == len(set(expected[open_nodes].tolist()))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_labels_match_breadth_first_search(seed):
+    generator = np.random.default_rng(seed)
+    open_cells = generator.random((17, 23)) < 0.55
+    labels = label_components(open_cells)
+    assert_same_partition(labels, bfs_labels(open_cells))
+    # Every component is labeled with its smallest flat index
+    for label in np.unique(labels[labels != NO_COMPONENT]):
+        assert label == np.flatnonzero(labels == label)[0]
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("generator", ["random_pattern", "kruskal"])
+def test_labels_follow_wall_edits(build_maze, generator, backend):
+    grid = build_maze(generator, height=15, width=17, backend=backend)
+    components = grid_components(grid)
+    components.refresh()
+    edits = random.Random(7)
+    for step in range(300):
+        node = grid[edits.randrange(15)][edits.randrange(17)]
+        if node.is_wall():
+            node.reset()
+        else:
+            node.make_wall()
+        if step % 10 == 0:
+            labels = [
+                components.component(index)
+                for index in range(15 * 17)
+            ]
+            assert_same_partition(
+                labels,
+                bfs_labels(grid_states(grid) != WALL_STATE)
+            )
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_bulk_writes_relabel_the_grid(backend):
+    grid = generate_grid(7, 9, backend)
+    start_node, end_node = grid[1][1], grid[5][7]
+    assert connected(grid, start_node, end_node)
+    wall = np.zeros((7, 9), dtype=bool)
+    wall[:, 4] = True
+    grid.set_states(wall, WALL_STATE)
+    assert not connected(grid, start_node, end_node)
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_unreachable_searches_expand_nothing(backend):
+    grid = generate_grid(7, 9, backend)
+    for row in range(7):
+        grid[row][4].make_wall()
+    start_node, end_node = grid[1][1], grid[5][7]
+    start_node.make_start()
+    end_node.make_end()
+    for search in SEARCH_FUNCTIONS.values():
+        result = search(grid, start_node, end_node, True)
+        assert not result.path_found
+        assert result.expanded == 0 and result.events == []
+    # Opening one node of the wall joins both sides
+    grid[3][4].reset()
+    for search in SEARCH_FUNCTIONS.values():
+        assert search(grid, start_node, end_node).path_length == 10
+
+
+def test_plain_node_arrays_are_supported():
+    grid = np.array(
+        [[Node(row, col) for col in range(5)] for row in range(3)],
+        dtype=object
+    )
+    grid[1, 2].make_wall()
+    grid[0, 2].make_wall()
+    assert connected(grid, grid[0, 0], grid[2, 4])
+    grid[2, 2].make_wall()
+    assert not connected(grid, grid[0, 0], grid[2, 4])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_nodes_are_connected(build_maze, seed):
+    grid = build_maze("random_pattern", height=15, width=17, seed=seed)
+    random.seed(seed)
+    for _ in range(20):
+        first, second = random_connected_nodes(grid)
+        assert first.is_empty() and second.is_empty()
+        assert first is not second
+        assert connected(grid, first, second)
+
+
+def test_random_nodes_need_two_connected_empty_nodes():
+    grid = generate_grid(3, 5, "array")
+    # The only open nodes are split by a wall
+    for col in (0, 2, 4):
+        for row in range(3):
+            grid[row][col].make_wall()
+    grid[0][1].make_wall()
+    grid[2][1].make_wall()
+    grid[0][3].make_wall()
+    grid[2][3].make_wall()
+    assert random_connected_nodes(grid) is None
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_walls_joined_around_keep_the_labels(backend):
+    grid = generate_grid(9, 11, backend)
+    components = grid_components(grid)
+    components.refresh()
+    # A line of walls from the top leaves the nodes around every wall
+    # joined around its end, so nothing is labeled again
+    for row in range(8):
+        grid[row][5].make_wall()
+        assert not components.dirty
+        assert connected(grid, grid[0][0], grid[0][10])
+    # The last wall of the line splits the grid in two
+    grid[8][5].make_wall()
+    assert components.dirty
+    assert not connected(grid, grid[0][0], grid[0][10])
+    assert_same_partition(
+        components.current_labels(),
+        bfs_labels(grid_states(grid) != WALL_STATE)
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_single_walls_match_breadth_first_search(seed):
+    grid = generate_grid(11, 13)
+    components = grid_components(grid)
+    edits = random.Random(seed)
+    for _ in range(120):
+        components.refresh()
+        node = grid[edits.randrange(11)][edits.randrange(13)]
+        node.make_wall()
+        # Clean labels after a wall was placed must be right as they are
+        if not components.dirty:
+            labels = [
+                components.component(index)
+                for index in range(11 * 13)
+            ]
+            assert_same_partition(
+                labels,
+                bfs_labels(grid_states(grid) != WALL_STATE)
+            )
@@ -0,0 +1,86 @@
+"""
+Tests of the index of the empty nodes.
+"""
+import random
+import numpy as np
+import pytest
+from constants import EMPTY_STATE, WALL_STATE
+from empty_cells import NO_SLOT, grid_empty_cells, random_empty_node
+from grid_functions import generate_grid, grid_states
+
+
+def assert_index_matches(empty_cells, grid):
+    """
+    Checks the index against a full scan of the states.
+    """
+    empty_cells.refresh()
+    indices = empty_cells.indices[:empty_cells.count]
+    expected = np.flatnonzero(grid_states(grid).ravel() == EMPTY_STATE)
+    assert sorted(indices.tolist()) == expected.tolist()
+    # Every empty node knows its slot, the rest have none
+    slots = np.full(grid_states(grid).size, NO_SLOT)
+    slots[indices] = np.arange(indices.size)
+    np.testing.assert_array_equal(empty_cells.slots, slots)
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_index_follows_state_changes(build_maze, backend):
+    grid = build_maze("random_pattern", height=13, width=19, backend=backend)
+    empty_cells = grid_empty_cells(grid)
+    empty_cells.refresh()
+    edits = random.Random(3)
+    for step in range(500):
+        node = grid[edits.randrange(13)][edits.randrange(19)]
+        edits.choice([
+            node.make_wall,
+            node.make_empty,
+            node.make_start,
+            node.make_end,
+            node.make_visited,
+            node.make_path,
+            node.reset
+        ])()
+        if step % 100 == 50:
+            # Bulk writes rebuild the index
+            mask = np.random.default_rng(step).random((13, 19)) < 0.2
+            grid.set_states(mask, WALL_STATE)
+        if step % 10 == 0:
+            assert_index_matches(empty_cells, grid)
+
+
+def test_samples_are_empty_nodes(build_maze):
+    grid = build_maze("kruskal", height=15, width=17)
+    random.seed(1)
+    for _ in range(50):
+        node = random_empty_node(grid)
+        assert node.is_empty()
+        node.make_start()
+        assert len(grid_empty_cells(grid)) == np.count_nonzero(
+            grid_states(grid) == EMPTY_STATE
+        )
+
+
+def test_sampled_pairs_are_different_empty_nodes(build_maze):
+    grid = build_maze("eller", height=15, width=17)
+    firsts, seconds = grid_empty_cells(grid).sample_pairs(1000, seed=5)
+    assert firsts.size == seconds.size == 1000
+    assert (firsts != seconds).all()
+    states = grid_states(grid).ravel()
+    assert (states[firsts] == EMPTY_STATE).all()
+    assert (states[seconds] == EMPTY_STATE).all()
+    # The same seed draws the same pairs
+    again = grid_empty_cells(grid).sample_pairs(1000, seed=5)
+    np.testing.assert_array_equal(again[0], firsts)
+    np.testing.assert_array_equal(again[1], seconds)
+
+
+def test_full_grid_has_nothing_to_sample():
+    grid = generate_grid(3, 3, "array")
+    grid.set_states(np.ones((3, 3), dtype=bool), WALL_STATE)
+    assert random_empty_node(grid) is None
+    firsts, seconds = grid_empty_cells(grid).sample_pairs(10)
+    assert firsts.size == seconds.size == 0
+    # A single empty node can't make a pair
+    grid[1][1].reset()
+    assert random_empty_node(grid).get_position() == (1, 1)
+    assert grid_empty_cells(grid).sample_pairs(10)[0].size == 0
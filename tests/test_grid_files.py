@@ -0,0 +1,92 @@
+"""
+Tests of the grid file format.
+"""
+import struct
+import numpy as np
+import pytest
+from constants import START_STATE, END_STATE, WALL_STATE
+from grid_files import (
+    HEADER,
+    MAGIC,
+    VERSION,
+    grid_map,
+    load_grid,
+    load_grid_map,
+    save_grid
+)
+from grid_functions import grid_states
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("generator", ["random_pattern", "kruskal", "spiral"])
+def test_round_trip_keeps_walls_and_nodes(
+    tmp_path, build_maze, generator, backend
+):
+    grid = build_maze(generator, height=23, width=31, backend=backend)
+    grid[1][1].make_start()
+    grid[21][29].make_end()
+    path = tmp_path / "maze.grid"
+    save_grid(grid, path)
+    loaded, start_node, end_node = load_grid(path, backend)
+    np.testing.assert_array_equal(grid_states(loaded), grid_states(grid))
+    assert start_node.get_position() == (1, 1)
+    assert end_node.get_position() == (21, 29)
+
+
+def test_round_trip_without_nodes(tmp_path, build_maze):
+    grid = build_maze("prim", height=9, width=13)
+    path = tmp_path / "maze.grid"
+    save_grid(grid, path)
+    loaded, start_node, end_node = load_grid(path, "array")
+    assert start_node is None and end_node is None
+    np.testing.assert_array_equal(grid_states(loaded), grid_states(grid))
+
+
+def test_is_wall_reads_the_same_bits_as_walls(build_maze):
+    # 7x11 grid, so the bits don't fill the last byte
+    grid = build_maze("random_pattern", height=7, width=11)
+    saved = grid_map(grid)
+    walls = saved.walls()
+    np.testing.assert_array_equal(walls, grid_states(grid) == WALL_STATE)
+    for row in range(7):
+        for col in range(11):
+            assert saved.is_wall(row, col) == walls[row, col]
+
+
+def test_save_stores_start_and_end_indices(tmp_path, build_maze):
+    grid = build_maze("vertical", height=9, width=13)
+    grid[1][1].make_start()
+    grid[7][11].make_end()
+    path = tmp_path / "maze.grid"
+    save_grid(grid, path)
+    loaded = load_grid_map(path)
+    assert loaded.shape == (9, 13)
+    assert loaded.start_position == (1, 1)
+    assert loaded.end_position == (7, 11)
+    states = grid_states(grid)
+    assert states[1, 1] == START_STATE and states[7, 11] == END_STATE
+
+
+def write_file(path, header, body=b""):
+    with open(path, "wb") as file:
+        file.write(header + body)
+
+
+@pytest.mark.parametrize("header, message", [
+    (b"", "not a grid file"),
+    (HEADER.pack(b"XXXX", VERSION, 3, 3, -1, -1), "not a grid file"),
+    (HEADER.pack(MAGIC, VERSION + 1, 3, 3, -1, -1), "version"),
+    (HEADER.pack(MAGIC, VERSION, 3, 3, -1, -1), "truncated"),
+    (HEADER.pack(MAGIC, VERSION, 3, 3, 9, -1), "outside the grid"),
+])
+def test_invalid_files_are_rejected(tmp_path, header, message):
+    path = tmp_path / "bad.grid"
+    # Two bytes hold the 9 bits of a 3x3 grid
+    body = b"\0\0" if message == "outside the grid" else b""
+    write_file(path, header, body)
+    with pytest.raises(ValueError, match=message):
+        load_grid_map(path)
+
+
+def test_header_size_is_fixed():
+    assert HEADER.size == struct.calcsize("<4sB3xIIqq") == 32
@@ -0,0 +1,74 @@
+"""
+Tests of the neighbors kept up to date by the grids.
+"""
+import random
+import numpy as np
+from constants import WALL_STATE, EMPTY_STATE
+from grid_functions import generate_grid, update_all_neighbors
+
+
+def neighbor_positions(grid):
+    """
+    Returns the positions of the neighbors of every node.
+    """
+    return [
+        [neighbor.get_position() for neighbor in node.neighbors]
+        for row in grid for node in row
+    ]
+
+
+def rebuilt_neighbor_positions(grid):
+    """
+    Returns the positions of the neighbors of every node
+    after rebuilding the neighbors of all nodes.
+    """
+    for row in grid:
+        for node in row:
+            node.update_neighbors(grid)
+    return neighbor_positions(grid)
+
+
+def test_incremental_neighbors_match_a_full_rebuild(build_maze):
+    grid = build_maze("random_pattern", height=13, width=17)
+    update_all_neighbors(grid)
+    assert not grid.neighbors_dirty
+    edits = random.Random(11)
+    for step in range(400):
+        node = grid[edits.randrange(13)][edits.randrange(17)]
+        edits.choice([node.make_wall, node.reset, node.make_visited])()
+        if step % 50 == 25:
+            # Small bulk writes update the nodes around the flipped nodes,
+            # large ones leave the neighbors to be rebuilt
+            mask = np.random.default_rng(step).random((13, 17)) < 0.3
+            grid.set_states(mask, edits.choice([WALL_STATE, EMPTY_STATE]))
+            update_all_neighbors(grid)
+        if step % 20 == 0:
+            incremental = neighbor_positions(grid)
+            assert incremental == rebuilt_neighbor_positions(grid)
+
+
+def test_bulk_writes_update_or_invalidate_the_neighbors():
+    grid = generate_grid(33, 33)
+    update_all_neighbors(grid)
+    # A few flipped nodes are updated right away
+    few = np.zeros((33, 33), dtype=bool)
+    few[5, 5:9] = True
+    grid.set_states(few, WALL_STATE)
+    assert not grid.neighbors_dirty
+    assert neighbor_positions(grid) == rebuilt_neighbor_positions(grid)
+    # Most of the grid flipped at once is rebuilt on the next use
+    many = np.zeros((33, 33), dtype=bool)
+    many[10:30] = True
+    grid.set_states(many, WALL_STATE)
+    assert grid.neighbors_dirty
+    update_all_neighbors(grid)
+    assert not grid.neighbors_dirty
+    assert neighbor_positions(grid) == rebuilt_neighbor_positions(grid)
+
+
+def test_array_backend_has_the_same_neighbors(build_maze):
+    node_grid = build_maze("wilson", height=13, width=17, backend="node")
+    array_grid = generate_grid(13, 17, "array")
+    array_grid.set_states(node_grid.states == WALL_STATE, WALL_STATE)
+    update_all_neighbors(node_grid)
+    assert neighbor_positions(array_grid) == neighbor_positions(node_grid)
@@ -0,0 +1,59 @@
+"""
+Tests of the maze generators.
+"""
+import random
+import numpy as np
+import pytest
+from components import label_components, NO_COMPONENT
+from constants import WALL_STATE
+from grid_functions import display_disabled, generate_grid, reset_grid
+from maze_functions import GENERATORS
+
+
+def generate(generator, height, width, seed, animated, backend="node"):
+    """
+    Returns the states of a grid generated in the mode.
+    """
+    random.seed(seed)
+    grid = generate_grid(height, width, backend)
+    with display_disabled():
+        reset_grid(grid, animated=animated)
+        GENERATORS[generator](grid, animated=animated)
+    return grid.states.copy()
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_compute_only_mode_draws_the_same_maze(generator, seed, backend):
+    np.testing.assert_array_equal(
+        generate(generator, 23, 31, seed, True, backend),
+        generate(generator, 23, 31, seed, False, backend)
+    )
+
+
+@pytest.mark.parametrize("size", [(5, 5), (21, 25), (101, 151)])
+@pytest.mark.parametrize("seed", range(3))
+def test_recursive_division_keeps_one_open_region(size, seed):
+    states = generate("recursive_division", *size, seed, False)
+    walls = states == WALL_STATE
+    # The border stays a wall
+    assert walls[0].all() and walls[-1].all()
+    assert walls[:, 0].all() and walls[:, -1].all()
+    # Every wall has a gap, so all open nodes are connected
+    labels = label_components(~walls)
+    assert np.unique(labels[labels != NO_COMPONENT]).size == 1
+
+
+@pytest.mark.parametrize("generator", ["kruskal", "prim", "wilson", "eller"])
+def test_perfect_mazes_are_trees(generator):
+    states = generate(generator, 21, 25, 4, False)
+    open_cells = states != WALL_STATE
+    labels = label_components(open_cells)
+    assert np.unique(labels[labels != NO_COMPONENT]).size == 1
+    # A connected graph is a tree when it has one edge less than nodes
+    edges = (
+        np.count_nonzero(open_cells[:, :-1] & open_cells[:, 1:]) +
+        np.count_nonzero(open_cells[:-1] & open_cells[1:])
+    )
+    assert edges == np.count_nonzero(open_cells) - 1
@@ -0,0 +1,122 @@
+"""
+Tests of the cache of search results.
+"""
+import pytest
+import pathfinding_algorithms
+from constants import ACTIVE_STATE, PATH_STATE, VISITED_STATE
+from grid_functions import grid_states
+from path_cache import CachedResult, PathCache, wall_layout_hash
+from pathfinding_algorithms import SearchResult, cached_search
+
+
+def make_entry(events=True, length=3):
+    """
+    Returns a CachedResult of a straight path along the first row.
+    """
+    path = [(1, col) for col in range(1, length + 1)]
+    recorded = None
+    if events:
+        recorded = [(2, 1, ACTIVE_STATE), (1, 1, VISITED_STATE)]
+        recorded += [(row, col, PATH_STATE) for row, col in path[1:-1]]
+    return CachedResult(SearchResult("dijkstra", path, 4, recorded, 2), 10)
+
+
+def test_entries_keep_the_path_and_the_events():
+    entry = make_entry()
+    assert entry.path_positions() == [(1, 1), (1, 2), (1, 3)]
+    assert entry.events() == [
+        (2, 1, ACTIVE_STATE),
+        (1, 1, VISITED_STATE),
+        (1, 2, PATH_STATE)
+    ]
+    assert (entry.expanded, entry.peak_frontier) == (4, 2)
+    assert make_entry(events=False).events() is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    entry_size = make_entry().nbytes
+    cache = PathCache(max_bytes=2 * entry_size)
+    cache.put("first", make_entry())
+    cache.put("second", make_entry())
+    # Using the first entry makes the second the least recently used
+    assert cache.get("first") is not None
+    cache.put("third", make_entry())
+    assert list(cache.entries) == ["first", "third"]
+    assert cache.get("second") is None
+    assert cache.size == 2 * entry_size
+    assert cache.stats() == {
+        "entries": 2,
+        "bytes": 2 * entry_size,
+        "max_bytes": 2 * entry_size,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_replacing_an_entry_keeps_the_size():
+    cache = PathCache()
+    cache.put("key", make_entry(length=3))
+    cache.put("key", make_entry(length=8))
+    assert len(cache) == 1
+    assert cache.size == make_entry(length=8).nbytes
+    assert cache.evictions == 0
+
+
+def test_entries_larger_than_the_limit_are_not_stored():
+    cache = PathCache(max_bytes=make_entry().nbytes - 1)
+    cache.put("key", make_entry())
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_entries_without_events_miss_when_events_are_needed():
+    cache = PathCache()
+    cache.put("key", make_entry(events=False))
+    assert cache.get("key", need_events=True) is None
+    assert cache.get("key") is not None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 0, 0)
+
+
+def test_wall_edits_change_the_key(build_maze):
+    grid = build_maze("empty", height=9, width=9)
+    key = PathCache.make_key(grid_states(grid), (1, 1), (7, 7), "a_star")
+    grid[4][4].make_wall()
+    states = grid_states(grid)
+    assert PathCache.make_key(states, (1, 1), (7, 7), "a_star") != key
+    walled = wall_layout_hash(states)
+    assert walled != key[0]
+    # Other states than walls don't change the key
+    grid[5][5].make_visited()
+    assert wall_layout_hash(grid_states(grid)) == walled
+    grid[4][4].reset()
+    assert wall_layout_hash(grid_states(grid)) == key[0]
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_cached_search_after_a_wall_edit_searches_again(
+    build_maze, monkeypatch, backend
+):
+    cache = PathCache()
+    monkeypatch.setattr(pathfinding_algorithms, "search_cache", cache)
+    grid = build_maze("empty", height=7, width=9, backend=backend)
+    start_node, end_node = grid[3][1], grid[3][7]
+    first = cached_search(grid, start_node, end_node, "a_star", True)
+    again = cached_search(grid, start_node, end_node, "a_star", True)
+    assert again.path == first.path
+    assert again.events == first.events
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Walling the straight path makes the cached one stale
+    grid[3][4].make_wall()
+    edited = cached_search(grid, start_node, end_node, "a_star", True)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert (3, 4) not in edited.path
+    assert edited.path_length > first.path_length
+    # Removing the wall hits the first entry again
+    grid[3][4].reset()
+    restored = cached_search(grid, start_node, end_node, "a_star", True)
+    assert restored.path == first.path
+    assert (cache.hits, cache.misses) == (2, 2)
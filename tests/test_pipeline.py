@@ -0,0 +1,217 @@
+"""
+Tests of the animation pipeline.
+"""
+import threading
+import time
+from contextlib import nullcontext
+import pytest
+import pipeline
+from grid_functions import (
+    display_listeners,
+    display_step,
+    generate_grid,
+    grid_states
+)
+from pipeline import AnimationPipeline
+from scheduler import FrameScheduler
+
+
+class FakeTerminal:
+    """
+    Terminal which reads the keys from a list.
+    """
+
+    def __init__(self, keys=()):
+        self.keys = list(keys)
+
+    @staticmethod
+    def cbreak():
+        """
+        Returns a context manager which does nothing.
+        """
+        return nullcontext()
+
+    hidden_cursor = cbreak
+
+    def inkey(self, timeout=None):  # pylint: disable=unused-argument
+        """
+        Returns the next key, or an empty string if there is none.
+        """
+        return self.keys.pop(0) if self.keys else ""
+
+
+class FakeViewport:
+    """
+    Viewport which shows the whole grid and handles no keys.
+    """
+
+    hint = ""
+
+    def focus(self, row, col):
+        """
+        Ignores the focus.
+        """
+
+    @staticmethod
+    def handle_key(key):  # pylint: disable=unused-argument
+        """
+        Handles no keys.
+        """
+        return False
+
+
+class FakeRenderer:
+    """
+    Renderer which keeps copies of the drawn frames.
+    """
+
+    def __init__(self):
+        self.viewport = FakeViewport()
+        self.frames = []
+        # Called before every draw, can raise to make the display fail
+        self.before_draw = None
+
+    def draw(self, states, full_repaint=False, footer=""):
+        """
+        Keeps a copy of the states.
+        """
+        # pylint: disable=unused-argument
+        if self.before_draw is not None:
+            self.before_draw()
+        self.frames.append(states.copy())
+
+
+@pytest.fixture(name="display")
+def fixture_display(monkeypatch):
+    """
+    Replaces the terminal, the renderer and the scheduler
+    of the pipeline, so the animations run fast without a terminal.
+    Returns the fake renderer.
+    """
+    fake_renderer = FakeRenderer()
+    monkeypatch.setattr(pipeline, "terminal", FakeTerminal())
+    monkeypatch.setattr(pipeline, "renderer", fake_renderer)
+    monkeypatch.setattr(
+        pipeline,
+        "scheduler",
+        FrameScheduler(1000, 100000.0, 15)
+        )
+    return fake_renderer
+
+
+def draw_walls(grid, count, progress=None):
+    """
+    Animated function which makes count nodes walls,
+    one step for every node. Returns the number of steps.
+    """
+    width = grid.shape[1]
+    for index in range(count):
+        if progress is not None:
+            progress.append(index)
+        grid[index // width][index % width].make_wall()
+        display_step(grid)
+    return count
+
+
+def assert_step_frames(frames):
+    """
+    Checks that every drawn frame shows the walls of a number of
+    whole steps of draw_walls(), and no frame goes back.
+    """
+    drawn = [int(frame.sum()) for frame in frames]
+    for frame, walls in zip(frames, drawn):
+        assert frame.ravel()[:walls].all()
+    assert drawn == sorted(drawn)
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_steps_are_displayed_and_the_result_returned(display, backend):
+    grid = generate_grid(9, 9, backend)
+    result = AnimationPipeline(grid).run(draw_walls, grid, 30)
+    assert result == 30
+    assert len(display.frames) > 1
+    assert_step_frames(display.frames)
+    assert grid_states(grid).ravel()[:30].all()
+    assert grid.change_log is None
+    assert not display_listeners
+
+
+def test_producer_error_reaches_the_caller(display):
+    grid = generate_grid(9, 9)
+    workers = []
+
+    def failing(grid):
+        workers.append(threading.current_thread())
+        draw_walls(grid, 10)
+        raise RuntimeError("generator failed")
+
+    with pytest.raises(RuntimeError, match="generator failed"):
+        AnimationPipeline(grid).run(failing, grid)
+    assert workers[0] is not threading.main_thread()
+    assert not workers[0].is_alive()
+    assert_step_frames(display.frames)
+    assert grid.change_log is None
+    assert not display_listeners
+
+
+def test_display_error_stops_and_joins_the_producer(display):
+    grid = generate_grid(9, 9)
+    animation = AnimationPipeline(grid, max_steps=2)
+    workers = []
+
+    def endless(grid):
+        workers.append(threading.current_thread())
+        while True:
+            draw_walls(grid, 5)
+
+    def failing_draw():
+        if len(display.frames) == 3:
+            raise KeyboardInterrupt()
+
+    display.before_draw = failing_draw
+    with pytest.raises(KeyboardInterrupt):
+        animation.run(endless, grid)
+    # The producer was stopped at its next step and joined
+    assert animation.stopping.is_set()
+    assert isinstance(animation.error, pipeline.AnimationStopped)
+    assert not workers[0].is_alive()
+    assert not display_listeners
+
+
+def test_any_key_skips_the_animation(display, monkeypatch):
+    grid = generate_grid(15, 15)
+    monkeypatch.setattr(pipeline, "terminal", FakeTerminal(["x"]))
+    result = AnimationPipeline(grid).run(draw_walls, grid, 200)
+    assert result == 200
+    # Nothing is drawn after the key, but every change is applied
+    # and the producer runs to the end
+    assert len(display.frames) <= 2
+    assert grid_states(grid).ravel()[:200].all()
+
+
+def test_full_queue_makes_the_producer_wait(display):
+    grid = generate_grid(9, 9)
+    max_steps = 4
+    progress = []
+    waiting = []
+
+    def slow_first_draw():
+        if display.frames:
+            return
+        # The consumer doesn't take steps while the first frame is
+        # drawn, so the producer fills the queue and waits
+        time.sleep(0.2)
+        waiting.append(len(progress))
+
+    display.before_draw = slow_first_draw
+    result = AnimationPipeline(grid, max_steps).run(
+        draw_walls,
+        grid,
+        40,
+        progress
+        )
+    assert result == 40
+    # The queue holds max_steps steps, the producer waits
+    # to push the next one
+    assert waiting == [max_steps + 1]
+    assert len(progress) == 40
@@ -0,0 +1,93 @@
+"""
+Tests of the recorded traces.
+"""
+import random
+import numpy as np
+import pytest
+from grid_functions import (
+    display_disabled,
+    display_listeners,
+    generate_grid,
+    grid_states,
+    reset_grid
+)
+from maze_functions import GENERATORS
+from recording import TracePlayer, TraceRecorder, load_trace
+
+
+@pytest.fixture(name="recorded")
+def fixture_recorded():
+    """
+    Returns a trace of an animated maze generation
+    and the states of the grid after every step.
+    """
+    random.seed(2)
+    grid = generate_grid(11, 13)
+    with display_disabled():
+        reset_grid(grid, animated=False)
+    recorder = TraceRecorder(grid, seed=2)
+    snapshots = [grid_states(grid).copy()]
+
+    def snapshot(changed_grid):
+        snapshots.append(grid_states(changed_grid).copy())
+
+    recorder.start()
+    with display_disabled():
+        # The recorder is the first listener,
+        # so every snapshot follows a recorded step
+        display_listeners.append(snapshot)
+        try:
+            GENERATORS["prim"](grid, animated=True)
+        finally:
+            display_listeners.remove(snapshot)
+            recorder.stop()
+    # Steps without changes are not recorded
+    steps = [snapshots[0]]
+    for states in snapshots[1:]:
+        if not np.array_equal(states, steps[-1]):
+            steps.append(states)
+    return recorder.trace(), steps
+
+
+def test_recorded_steps_match_the_grid(recorded):
+    trace, steps = recorded
+    assert trace.steps == len(steps) - 1
+    player = TracePlayer(trace)
+    for step, states in enumerate(steps):
+        player.seek(step)
+        np.testing.assert_array_equal(player.states, states)
+
+
+def test_seeking_backwards_and_jumping(recorded):
+    trace, steps = recorded
+    player = TracePlayer(trace)
+    jumps = random.Random(5)
+    for _ in range(50):
+        step = jumps.randrange(trace.steps + 1)
+        player.seek(step)
+        np.testing.assert_array_equal(player.states, steps[step])
+    # Seeking is clamped to the steps of the trace
+    player.seek(trace.steps + 10)
+    np.testing.assert_array_equal(player.states, steps[-1])
+    player.seek(-5)
+    np.testing.assert_array_equal(player.states, steps[0])
+    assert player.last_position() is None
+
+
+def test_save_and_load_round_trip(tmp_path, recorded):
+    trace, _ = recorded
+    path = tmp_path / "run.trace"
+    trace.save(path)
+    loaded = load_trace(path)
+    assert loaded.seed == 2
+    np.testing.assert_array_equal(loaded.initial, trace.initial)
+    np.testing.assert_array_equal(loaded.cells, trace.cells)
+    np.testing.assert_array_equal(loaded.states, trace.states)
+    np.testing.assert_array_equal(loaded.previous, trace.previous)
+
+
+def test_invalid_files_are_rejected(tmp_path):
+    path = tmp_path / "bad.trace"
+    path.write_bytes(b"PFGR")
+    with pytest.raises(ValueError, match="not a trace file"):
+        load_trace(path)
@@ -0,0 +1,170 @@
+"""
+Tests of the differential terminal renderer.
+"""
+import numpy as np
+import pytest
+from constants import (
+    EMPTY,
+    EMPTY_STATE,
+    GLYPHS,
+    PATH_STATE,
+    VISITED_STATE,
+    WALL_STATE
+)
+from renderer import TerminalRenderer
+
+
+class FakeTerminal:
+    """
+    Terminal which writes its sequences as readable tags.
+    """
+
+    home = "<home>"
+    clear = "<clear>"
+    clear_eos = "<eos>"
+    clear_eol = "<eol>"
+
+    def __init__(self, width=80, height=24):
+        self.width = width
+        self.height = height
+
+    @staticmethod
+    def length(text):
+        """
+        Returns the screen columns of the text, two for every emoji.
+        """
+        return 1 if text == EMPTY else 2
+
+    @staticmethod
+    def move_xy(x, y):
+        """
+        Returns the tag of a cursor move.
+        """
+        return f"<{x},{y}>"
+
+
+def row_string(states):
+    """
+    Returns the string of a row of states.
+    """
+    return " ".join(GLYPHS[state] for state in states)
+
+
+@pytest.fixture
+def drawn(capsys):
+    """
+    Returns a renderer on a fake terminal which has drawn a 3x4 grid,
+    the grid and a function returning what was written since.
+    """
+    renderer = TerminalRenderer(FakeTerminal(), top=1)
+    states = np.full((3, 4), WALL_STATE, dtype=np.uint8)
+    states[1, 1:3] = EMPTY_STATE
+    renderer.draw(states)
+
+    def written():
+        return capsys.readouterr().out
+
+    return renderer, states, written
+
+
+def test_first_frame_repaints_everything(drawn):
+    renderer, states, written = drawn
+    repaint = (
+        "<home><clear>\n" +
+        "\n".join(row_string(row) for row in states) +
+        "\n"
+    )
+    assert written() == repaint
+    renderer.draw(states, full_repaint=True)
+    assert written() == repaint
+
+
+def test_unchanged_frame_only_moves_the_cursor(drawn):
+    renderer, states, written = drawn
+    written()
+    renderer.draw(states.copy())
+    assert written() == "<0,4>"
+
+
+def test_single_cell_is_redrawn_in_place(drawn):
+    renderer, states, written = drawn
+    written()
+    states = states.copy()
+    # Walls and path cells take the same width
+    states[2, 2] = PATH_STATE
+    renderer.draw(states)
+    # Two cells of three columns before the cell
+    assert written() == "<6,3>" + GLYPHS[PATH_STATE] + "<0,4>"
+
+
+def test_width_change_redraws_the_rest_of_the_row(drawn):
+    renderer, states, written = drawn
+    written()
+    states = states.copy()
+    # The first change keeps the width, the second makes the cell wider
+    # and moves the cells after it
+    states[1, 0] = PATH_STATE
+    states[1, 2] = VISITED_STATE
+    renderer.draw(states)
+    assert written() == (
+        "<0,2>" + GLYPHS[PATH_STATE] +
+        # A wall and an empty cell before the wider cell
+        "<5,2>" + row_string(states[1, 2:]) + "<eol>" +
+        "<0,4>"
+    )
+
+
+def test_narrower_cell_redraws_the_rest_of_the_row(drawn):
+    renderer, states, written = drawn
+    written()
+    states = states.copy()
+    states[0, 1] = EMPTY_STATE
+    renderer.draw(states)
+    assert written() == (
+        "<3,1>" + row_string(states[0, 1:]) + "<eol>" + "<0,4>"
+    )
+
+
+def test_footer_is_drawn_only_when_it_changes(drawn):
+    renderer, states, written = drawn
+    written()
+    renderer.draw(states, footer="Searching...\n")
+    assert written() == "<0,4><eos>Searching...\n"
+    renderer.draw(states, footer="Searching...\n")
+    assert written() == "<0,4>"
+    renderer.draw(states)
+    assert written() == "<0,4><eos>"
+
+
+def test_repaint_clears_the_footer(drawn):
+    renderer, states, written = drawn
+    renderer.draw(states, footer="Done.\n")
+    written()
+    renderer.draw(states, full_repaint=True, footer="Done.\n")
+    assert written().endswith("\n<eos>Done.\n")
+
+
+def test_resized_terminal_repaints_everything(drawn):
+    renderer, states, written = drawn
+    written()
+    renderer.terminal.width = 60
+    renderer.draw(states)
+    assert written().startswith("<home><clear>")
+    renderer.draw(states)
+    assert written() == "<0,4>"
+
+
+def test_repaint_rebuilds_only_the_changed_rows(drawn):
+    renderer, states, written = drawn
+    cached = list(renderer.rows)
+    states = states.copy()
+    states[1, 1] = PATH_STATE
+    renderer.draw(states)
+    assert renderer.rows[1] is None
+    renderer.draw(states, full_repaint=True)
+    assert renderer.rows[0] is cached[0]
+    assert renderer.rows[2] is cached[2]
+    assert renderer.rows[1] == row_string(states[1])
+    assert written().endswith(
+        "\n".join(row_string(row) for row in states) + "\n"
+    )
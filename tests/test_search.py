@@ -0,0 +1,159 @@
+"""
+Tests of the headless search functions.
+"""
+import random
+import numpy as np
+import pytest
+from components import random_connected_nodes
+from constants import (
+    ACTIVE_STATE,
+    PATH_STATE,
+    VISITED_STATE,
+    WALL_STATE
+)
+from grid_functions import grid_states
+from pathfinding_algorithms import SEARCH_FUNCTIONS, SearchResult
+
+GENERATORS = ["empty", "random_pattern", "kruskal", "spiral", "prim"]
+
+
+def assert_valid_walk(grid, result, start_node, end_node):
+    """
+    Checks that the path goes from the start node to the end node
+    in steps of one cell over open cells.
+    """
+    states = grid_states(grid)
+    path = result.path
+    assert path[0] == start_node.get_position()
+    assert path[-1] == end_node.get_position()
+    assert len(set(path)) == len(path)
+    for row, col in path:
+        assert states[row, col] != WALL_STATE
+    for (row, col), (next_row, next_col) in zip(path, path[1:]):
+        assert abs(row - next_row) + abs(col - next_col) == 1
+
+
+def assert_event_order(result):
+    """
+    Checks that the nodes are visited after they were discovered
+    and that the path is drawn after the search, without the start
+    and the end node.
+    """
+    states = [state for _, _, state in result.events]
+    # The path events come last, one for every node inside the path
+    first_path = states.index(PATH_STATE)
+    assert set(states[:first_path]) <= {ACTIVE_STATE, VISITED_STATE}
+    assert set(states[first_path:]) == {PATH_STATE}
+    drawn = [(row, col) for row, col, _ in result.events[first_path:]]
+    assert sorted(drawn) == sorted(result.path[1:-1])
+    endpoints = {result.path[0], result.path[-1]}
+    discovered = set()
+    for row, col, state in result.events[:first_path]:
+        assert (row, col) not in endpoints
+        if state == ACTIVE_STATE:
+            assert (row, col) not in discovered
+            discovered.add((row, col))
+        else:
+            assert (row, col) in discovered
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("seed", range(3))
+def test_engines_agree_on_the_path_length(
+    build_maze, backend, generator, seed
+):
+    grid = build_maze(generator, seed=seed, backend=backend)
+    before = grid_states(grid).copy()
+    random.seed(seed)
+    for _ in range(4):
+        start_node, end_node = random_connected_nodes(grid)
+        lengths = set()
+        for algorithm, search in SEARCH_FUNCTIONS.items():
+            result = search(grid, start_node, end_node, record_events=True)
+            assert isinstance(result, SearchResult)
+            assert result.path_found, algorithm
+            assert_valid_walk(grid, result, start_node, end_node)
+            lengths.add(result.path_length)
+            if result.path_length > 1:
+                assert result.expanded > 0
+                assert result.peak_frontier > 0
+                assert_event_order(result)
+            # Without the events the search finds the same path
+            silent = search(grid, start_node, end_node)
+            assert silent.events is None
+            assert silent.path == result.path
+            assert silent.expanded == result.expanded
+        assert len(lengths) == 1
+    # The headless searches don't change the grid
+    assert np.array_equal(grid_states(grid), before)
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("algorithm", SEARCH_FUNCTIONS)
+def test_adjacent_start_and_end(build_maze, backend, algorithm):
+    grid = build_maze("empty", backend=backend)
+    start_node, end_node = grid[4][6], grid[5][6]
+    result = SEARCH_FUNCTIONS[algorithm](
+        grid,
+        start_node,
+        end_node,
+        record_events=True
+        )
+    assert result.path == [(4, 6), (5, 6)]
+    assert result.path_length == 1
+    assert result.expanded == 0
+    assert result.events == []
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("algorithm", SEARCH_FUNCTIONS)
+def test_unreachable_end(build_maze, backend, algorithm):
+    grid = build_maze("empty", backend=backend)
+    # Splitting the grid in two with a vertical wall
+    for row in range(1, 20):
+        grid[row][12].make_wall()
+    result = SEARCH_FUNCTIONS[algorithm](
+        grid,
+        grid[3][3],
+        grid[3][20],
+        record_events=True
+        )
+    assert not result.path_found
+    assert result.path == []
+    assert result.path_length == 0
+    assert result.expanded == 0
+    assert result.events == []
+
+
+@pytest.mark.parametrize("algorithm", SEARCH_FUNCTIONS)
+def test_path_length_is_the_breadth_first_distance(build_maze, algorithm):
+    grid = build_maze("random_pattern", seed=5)
+    open_cells = grid_states(grid) != WALL_STATE
+    start = tuple(int(index) for index in np.argwhere(open_cells)[0])
+    start_node = grid[start[0]][start[1]]
+    # Distances of all cells from the start node
+    distance = np.full(open_cells.shape, -1)
+    distance[start] = 0
+    frontier = [start]
+    while frontier:
+        following = []
+        for row, col in frontier:
+            for next_row, next_col in (
+                (row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)
+            ):
+                if (
+                    open_cells[next_row, next_col] and
+                    distance[next_row, next_col] < 0
+                ):
+                    distance[next_row, next_col] = distance[row, col] + 1
+                    following.append((next_row, next_col))
+        frontier = following
+    for row, col in [(19, 23), (10, 12), (1, 23), (19, 1)]:
+        if not open_cells[row, col] or (row, col) == start:
+            continue
+        result = SEARCH_FUNCTIONS[algorithm](grid, start_node, grid[row][col])
+        if distance[row, col] < 0:
+            assert not result.path_found
+            continue
+        assert result.path_length == distance[row, col]
@@ -0,0 +1,95 @@
+"""
+Tests of the vectorized wavefront engine against Dijkstra's algorithm.
+"""
+import random
+import pytest
+from components import random_connected_nodes
+from constants import WALL_STATE
+from grid_functions import grid_states
+from pathfinding_algorithms import (
+    search_dijkstra,
+    search_dijkstra_wavefront
+)
+from wavefront import wavefront
+
+GENERATORS = ["empty", "random_pattern", "kruskal", "recursive_division"]
+
+
+def assert_same_search(grid, start_node, end_node):
+    """
+    Checks that both engines find the same path, expand the same
+    number of nodes and record the same events.
+    """
+    expected = search_dijkstra(
+        grid,
+        start_node,
+        end_node,
+        record_events=True,
+        backend="heap"
+        )
+    result = search_dijkstra_wavefront(
+        grid,
+        start_node,
+        end_node,
+        record_events=True
+        )
+    assert result.path == expected.path
+    assert result.expanded == expected.expanded
+    assert result.events == expected.events
+    return result
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("seed", range(4))
+def test_wavefront_matches_dijkstra(build_maze, backend, generator, seed):
+    grid = build_maze(generator, seed=seed, backend=backend)
+    height, width = grid_states(grid).shape
+    random.seed(seed)
+    pairs = [random_connected_nodes(grid) for _ in range(5)]
+    # The corners, where the end is found in the middle of a wave
+    # on the grids with loops
+    pairs.append((grid[1][1], grid[height - 2][width - 2]))
+    for start_node, end_node in pairs:
+        if not start_node.is_empty() or not end_node.is_empty():
+            continue
+        assert_same_search(grid, start_node, end_node)
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_wavefront_matches_dijkstra_on_adjacent_nodes(build_maze, backend):
+    grid = build_maze("empty", backend=backend)
+    result = assert_same_search(grid, grid[3][4], grid[3][5])
+    assert result.path == [(3, 4), (3, 5)]
+    assert result.expanded == 0
+
+
+@pytest.mark.parametrize("backend", ["node", "array"])
+def test_wavefront_matches_dijkstra_on_unreachable_end(build_maze, backend):
+    grid = build_maze("empty", backend=backend)
+    # Walling the end node in
+    for row, col in [(9, 12), (11, 12), (10, 11), (10, 13)]:
+        grid[row][col].make_wall()
+    result = assert_same_search(grid, grid[2][2], grid[10][12])
+    assert result.path == []
+    assert result.expanded == 0
+    assert result.events == []
+
+
+def test_wavefront_without_reaching_the_target_expands_the_component(
+    build_maze
+):
+    grid = build_maze("random_pattern", seed=3)
+    states = grid_states(grid)
+    start_node, _ = random_connected_nodes(grid)
+    # A target in a wall is never discovered, so the search runs
+    # until the whole component of the start node is expanded
+    wall = next(
+        (row, col) for row in range(states.shape[0])
+        for col in range(states.shape[1])
+        if states[row, col] == WALL_STATE
+    )
+    field = wavefront(states, [start_node.get_position()], wall)
+    reached = int((field.distance >= 0).sum())
+    assert field.expanded == reached
+    assert not field.is_reached(*wall)
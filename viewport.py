@@ -0,0 +1,167 @@
+"""
+Module for the viewport of the renderer.
+
+Grids larger than the terminal are shown through a viewport, a window
+of the grid which can be scrolled or which follows the cells changed
+last, like the frontier of a search. In the overview mode the whole grid
+is zoomed out instead, and every block of cells is shown as one glyph
+computed with one vectorized counting pass over the states.
+Only the visible window or the zoomed out grid is drawn, so the Python
+and terminal work of a frame depends on the size of the terminal,
+not on the size of the grid.
+"""
+import numpy as np
+from constants import (
+    GLYPHS,
+    EMPTY_STATE,
+    WALL_STATE,
+    VISITED_STATE,
+    ACTIVE_STATE,
+    PATH_STATE,
+    END_STATE,
+    START_STATE
+)
+
+# Screen columns of one cell, a glyph two columns wide and a space
+CELL_COLUMNS = 3
+# Screen lines kept free under the grid for the messages
+RESERVED_LINES = 4
+# Modes of the viewport
+VIEW_MODES = ("follow", "scroll", "overview")
+# States of which a zoomed out block shows the most common one
+BACKGROUND_STATES = (EMPTY_STATE, WALL_STATE, VISITED_STATE)
+# States a zoomed out block shows if any of its cells has them,
+# from the least to the most important
+MARKER_STATES = (ACTIVE_STATE, PATH_STATE, END_STATE, START_STATE)
+
+
+def overview(states, block):
+    """
+    Returns the 2D states array zoomed out, every block x block cells
+    shown as one cell. A block shows the most important marker state
+    of its cells, or else the most common background state.
+    """
+    height, width = states.shape
+    rows = -(-height // block)
+    cols = -(-width // block)
+    state_count = len(GLYPHS)
+    # Counting the cells of every state in every block in one pass,
+    # every cell adds one to the count of its block and state
+    block_rows = np.arange(height) // block
+    block_cols = np.arange(width) // block
+    keys = (block_rows[:, None] * cols + block_cols) * state_count + states
+    counts = np.bincount(
+        keys.ravel(),
+        minlength=rows * cols * state_count
+        ).reshape(rows, cols, state_count)
+    background = np.array(BACKGROUND_STATES, dtype=np.uint8)
+    zoomed = background[counts[:, :, background].argmax(axis=2)]
+    for state in MARKER_STATES:
+        zoomed[counts[:, :, state] > 0] = state
+    return zoomed
+
+
+class Viewport:
+    """
+    Class that chooses the part of the grid which is drawn.
+    """
+
+    def __init__(self, terminal, top=1, mode="follow"):
+        self.terminal = terminal
+        # Screen row of the first row of the grid
+        self.top = top
+        # One of VIEW_MODES
+        self.mode = mode
+        # Row and column of the top left cell of the window
+        self.row = 0
+        self.col = 0
+        # Cell the window follows in the follow mode
+        self.focus_position = None
+        # Flag to check if the whole grid fitted in the last frame
+        self.fits = True
+
+    def size(self):
+        """
+        Returns the number of rows and columns of cells
+        which fit in the terminal.
+        """
+        rows = self.terminal.height - self.top - RESERVED_LINES
+        cols = self.terminal.width // CELL_COLUMNS
+        return max(rows, 1), max(cols, 1)
+
+    def focus(self, row, col):
+        """
+        Sets the cell the window follows in the follow mode.
+        """
+        self.focus_position = (row, col)
+
+    def scroll(self, rows, cols):
+        """
+        Moves the window by a number of its heights and widths
+        and stops following the focus.
+        """
+        height, width = self.size()
+        self.mode = "scroll"
+        self.row += int(rows * height)
+        self.col += int(cols * width)
+
+    def handle_key(self, key):
+        """
+        Handles the viewport keys: W, A, S and D scroll the window,
+        Z switches the overview on and off, F follows the changes again.
+        Returns True if the key was handled.
+        Keys are not handled while the whole grid fits.
+        """
+        key = str(key).lower()
+        if self.fits:
+            return False
+        if key == "w":
+            self.scroll(-0.25, 0)
+        elif key == "s":
+            self.scroll(0.25, 0)
+        elif key == "a":
+            self.scroll(0, -0.25)
+        elif key == "d":
+            self.scroll(0, 0.25)
+        elif key == "z":
+            self.mode = "follow" if self.mode == "overview" else "overview"
+        elif key == "f":
+            self.mode = "follow"
+        else:
+            return False
+        return True
+
+    @property
+    def hint(self):
+        """
+        Returns the line explaining the viewport keys,
+        or an empty string while the whole grid fits.
+        """
+        if self.fits:
+            return ""
+        return "W A S D scroll, Z zooms out and in, F follows the changes.\n"
+
+    def view(self, states):
+        """
+        Returns the part of the 2D states array which is drawn.
+        """
+        height, width = states.shape
+        rows, cols = self.size()
+        self.fits = height <= rows and width <= cols
+        if self.fits:
+            # The whole grid fits in the terminal
+            return states
+        if self.mode == "overview":
+            block = max(-(-height // rows), -(-width // cols))
+            return overview(states, block)
+        if self.mode == "follow" and self.focus_position is not None:
+            # Moving the window only when the focus gets close to its
+            # edges, so it doesn't jump with every step
+            row, col = self.focus_position
+            if not self.row + rows // 4 <= row < self.row + rows - rows // 4:
+                self.row = row - rows // 2
+            if not self.col + cols // 4 <= col < self.col + cols - cols // 4:
+                self.col = col - cols // 2
+        self.row = min(max(self.row, 0), max(height - rows, 0))
+        self.col = min(max(self.col, 0), max(width - cols, 0))
+        return states[self.row:self.row + rows, self.col:self.col + cols]
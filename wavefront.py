@@ -0,0 +1,155 @@
+"""
+Module for the vectorized wavefront (breadth-first search) engine.
+
+Every move on the grid costs 1, so the shortest distances can be found
+one wave at a time: all cells of the frontier are expanded at once with
+numpy operations on arrays of flat cell indices. The grid is padded with
+a border of walls, so no bounds checks are needed.
+"""
+import numpy as np
+from constants import WALL_STATE
+
+# Directions in the same order as Node.update_neighbors():
+# up, down, left and right, as (row, column) steps.
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class DistanceField:
+    """
+    Class that stores the outcome of a wavefront search.
+    """
+
+    def __init__(self, distance, direction, expanded, peak_frontier, frames):
+        # 2D int32 array with the distance from the nearest source.
+        # -1 for walls and unreachable cells.
+        self.distance = distance
+        # 2D uint8 array with the direction of the move into every cell,
+        # 1 + index in DIRECTIONS. 0 for the sources and unreached cells.
+        self.direction = direction
+        # Number of cells taken from the frontier and expanded
+        self.expanded = expanded
+        # Largest number of cells in one wave
+        self.peak_frontier = peak_frontier
+        # List of (expanded cells, discovered cells, counts) tuples
+        # for every wave. Cells are flat indices in the order they were
+        # expanded or discovered, counts are the numbers of cells
+        # discovered by every expanded cell. None if not recorded.
+        self.frames = frames
+
+    def is_reached(self, row, col):
+        """
+        Returns True if the cell can be reached from a source.
+        """
+        return self.distance[row, col] >= 0
+
+    def path_to(self, row, col):
+        """
+        Returns the positions of the path from the nearest source
+        to the given cell, or an empty list if it can't be reached.
+        """
+        if self.distance[row, col] < 0:
+            return []
+        positions = [(row, col)]
+        direction = self.direction
+        # Stepping back against the directions until we reach a source
+        while direction[row, col]:
+            row_step, col_step = DIRECTIONS[direction[row, col] - 1]
+            row -= row_step
+            col -= col_step
+            positions.append((row, col))
+        positions.reverse()
+        return positions
+
+
+def wavefront(states, sources, target=None, record_frames=False):
+    """
+    Computes distances and directions from the source positions
+    to every reachable cell of the 2D states array.
+    Cells are discovered in the same order as the first-in first-out
+    search of dijkstra(), so the directions give the same paths.
+    If the target position is given, stops as soon as it is discovered.
+    Returns a DistanceField.
+    """
+    height, width = states.shape
+    padded_width = width + 2
+    # Flat array of passable cells with a border of walls around it
+    passable = np.zeros((height + 2, padded_width), dtype=bool)
+    passable[1:-1, 1:-1] = states != WALL_STATE
+    passable = passable.ravel()
+    # Flat index steps for every direction
+    offsets = np.array(
+        [row * padded_width + col for row, col in DIRECTIONS],
+        dtype=np.intp
+        )
+    distance = np.full(passable.size, -1, dtype=np.int32)
+    direction = np.zeros(passable.size, dtype=np.uint8)
+
+    frontier = np.array(
+        [(row + 1) * padded_width + col + 1 for row, col in sources],
+        dtype=np.intp
+        )
+    distance[frontier] = 0
+    target_index = None
+    if target is not None:
+        target_index = (target[0] + 1) * padded_width + target[1] + 1
+    frames = [] if record_frames else None
+    expanded = 0
+    peak_frontier = 0
+    wave = 0
+    while frontier.size:
+        wave += 1
+        peak_frontier = max(peak_frontier, frontier.size)
+        # Every frontier cell with its four neighbors in one row,
+        # flattened in the order the cells would leave a queue
+        candidates = (frontier[:, None] + offsets).ravel()
+        positions = np.flatnonzero(
+            passable[candidates] & (distance[candidates] < 0)
+            )
+        # Keeping only the first time every cell is discovered
+        first = np.unique(candidates[positions], return_index=True)[1]
+        positions = positions[np.sort(first)]
+        discovered = candidates[positions]
+        distance[discovered] = wave
+        direction[discovered] = positions % 4 + 1
+        if target_index is not None and distance[target_index] >= 0:
+            # Stopping at the frontier cell which discovered the target,
+            # the cells after it would not be expanded by dijkstra()
+            found = np.flatnonzero(discovered == target_index)[0]
+            last = positions[found] // 4
+            expanded += last + 1
+            if frames is not None:
+                # Cells discovered by the last cell before the target
+                # are left over after the counts
+                frames.append((
+                    unpad(frontier[:last], padded_width, width),
+                    unpad(discovered[:found], padded_width, width),
+                    np.bincount(positions[:found] // 4, minlength=last + 1)
+                    [:last]
+                    ))
+            break
+        expanded += frontier.size
+        if frames is not None:
+            frames.append((
+                unpad(frontier, padded_width, width),
+                unpad(discovered, padded_width, width),
+                np.bincount(positions // 4, minlength=frontier.size)
+                ))
+        frontier = discovered
+
+    distance = distance.reshape(height + 2, padded_width)[1:-1, 1:-1]
+    direction = direction.reshape(height + 2, padded_width)[1:-1, 1:-1]
+    return DistanceField(
+        distance,
+        direction,
+        int(expanded),
+        int(peak_frontier),
+        frames
+        )
+
+
+def unpad(indices, padded_width, width):
+    """
+    Converts flat indices of the padded grid to flat indices of the grid.
+    """
+    rows, cols = np.divmod(indices, padded_width)
+    return (rows - 1) * width + cols - 1